@@ -726,10 +726,6 @@ class AudioEZAdaptiveIntegration:
         e_t = {f: t for f, t in zip(end_eq.get('bands', []), end_eq.get('filter_types', []))}
         f_t = [e_t.get(f, 'PK') for f in all_freqs]
 
-        # Throttle APO writes: only at start, every ~120ms, and at the end.
-        last_apo_write = 0.0
-        APO_INTERVAL = 0.12
-
         for i in range(steps + 1):
             if stop_event.is_set():
                 return
@@ -743,13 +739,8 @@ class AudioEZAdaptiveIntegration:
                 self.audio_engine.q_values = np.array(s_q + (e_q - s_q) * p, dtype=float)
                 self.audio_engine.filter_types = list(f_t)
                 self.audio_engine.send_full_ui_update()
-
-                now = time.time()
-                is_last = (i == steps)
-                if getattr(self.audio_engine, 'is_playing', False):
-                    if is_last or (now - last_apo_write) >= APO_INTERVAL:
-                        self.audio_engine._apply_apo_config()
-                        last_apo_write = now
+                # Rate limited by the engine's APO scheduler; the final step is always written
+                self.audio_engine._schedule_apo_write()
             except Exception as e:
                 log.debug("Transition step failed: %s", e)
             time.sleep(interval)
@@ -0,0 +1,230 @@
+import os, threading
+from collections import Counter
+import numpy as np
+
+from eq_response import FILTER_TYPES, band_responses_db, log_grid
+
+# Types APO → types AudioEZ (LPQ/HPQ sont les passe-bas/haut avec Q explicite) ;
+# tous les autres types de FILTER_TYPES (ceux de l'UI et des exports AudioEZ) sont repris tels quels
+TYPE_ALIASES = {'LPQ': 'LP', 'HPQ': 'HP', 'PEQ': 'PK'}
+DEFAULT_Q = {'LP': 0.707, 'HP': 0.707, 'LS': 0.707, 'HS': 0.707, 'LSC': 0.707, 'HSC': 0.707,
+             'LSD': 0.707, 'HSD': 0.707, 'BWLP': 0.707, 'BWHP': 0.707, 'LRLP': 0.707, 'LRHP': 0.707, 'NO': 30.0}
+GRAPHIC_FIT_BANDS = 31
+MAX_INCLUDE_DEPTH = 16
+
+
+def bandwidth_to_q(octaves):
+    factor = 2 ** octaves
+    return float(np.sqrt(factor) / (factor - 1))
+
+
+def tokenize(text):
+    """Lignes d'une config APO → [(commande, arguments, numéro de ligne)].
+
+    ``Filter 3: ON PK ...`` et ``Filter: ON PK ...`` donnent tous deux la
+    commande 'FILTER'. Les commentaires (#) et lignes vides sont retirés.
+    """
+    commands = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.split('#', 1)[0].strip()
+        head, sep, args = line.partition(':')
+        if not sep:
+            continue
+        words = head.split()
+        if words:
+            commands.append((words[0].upper(), args.strip(), line_number))
+    return commands
+
+
+class ApoParseCache:
+    """Commandes tokenisées par fichier, clé (chemin, mtime, taille) : un Include déjà lu n'est pas relu"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def commands(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                text = f.read()
+        except UnicodeDecodeError:
+            with open(path, 'r', encoding='latin1') as f:
+                text = f.read()
+        commands = tokenize(text)
+        with self._lock:
+            self.misses += 1
+            self._entries.pop(path, None)
+            self._entries[path] = (key, commands)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        return commands
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = ApoParseCache()
+
+
+class ApoConfig:
+    """Résultat du parsing, vu depuis un canal (le gauche par défaut)"""
+
+    def __init__(self):
+        self.preamp_db = 0.0
+        self.filters = []       # [(type, fc, gain, q)]
+        self.graphic_eqs = []   # [(frequences, gains dB)] en tableaux numpy
+        self.includes = []
+        self.ignored = Counter()  # commandes non gérées (Convolution, Delay, Copy...) ou filtres OFF
+        self.unknown_types = Counter()  # filtres ON d'un type qu'AudioEZ ne sait pas reproduire
+
+    @property
+    def empty(self):
+        return not self.filters and not self.graphic_eqs
+
+
+def _parse_filter(args):
+    """'ON PK Fc 100 Hz Gain -3 dB Q 1.41' → (type, fc, gain, q) ; None si OFF ou illisible.
+
+    Un type hors FILTER_TYPES est rendu même sans Fc (IIR, ...) pour être signalé.
+    """
+    tokens = args.split()
+    if len(tokens) < 2 or tokens[0].upper() != 'ON':
+        return None
+    filter_type = TYPE_ALIASES.get(tokens[1].upper(), tokens[1].upper())
+    fc, gain, q = None, 0.0, DEFAULT_Q.get(filter_type, 1.41)
+    i = 2
+    while i < len(tokens):
+        key = tokens[i].upper()
+        try:
+            if key == 'FC':
+                fc = float(tokens[i + 1])
+            elif key == 'GAIN':
+                gain = float(tokens[i + 1])
+            elif key == 'Q':
+                q = float(tokens[i + 1])
+            elif key == 'BW' and tokens[i + 1].upper() == 'OCT':
+                q = bandwidth_to_q(float(tokens[i + 2]))
+                i += 1
+        except (IndexError, ValueError):
+            return None
+        i += 1
+    if fc is None and filter_type in FILTER_TYPES:
+        return None
+    return filter_type, fc, gain, q
+
+
+def _parse_graphic_eq(args):
+    values = np.array(args.replace(';', ' ').split(), dtype=float)
+    if len(values) < 4 or len(values) % 2:
+        raise ValueError("Invalid GraphicEQ point list.")
+    points = values.reshape(-1, 2)
+    order = np.argsort(points[:, 0], kind='stable')
+    return points[order, 0], points[order, 1]
+
+
+def _evaluate(path, result, channel, active, depth, cache):
+    if depth > MAX_INCLUDE_DEPTH:
+        raise ValueError(f"Include depth exceeded at {path}")
+    for command, args, line_number in cache.commands(path):
+        if command == 'CHANNEL':
+            selection = {token.upper() for token in args.split()}
+            active = 'ALL' in selection or channel in selection
+        elif command == 'INCLUDE':
+            include_path = os.path.join(os.path.dirname(path), args)
+            if not os.path.isfile(include_path):
+                print(f"ApoParser: Include introuvable ({path}:{line_number}) : {args}")
+                continue
+            result.includes.append(include_path)
+            # La sélection de canaux d'un fichier inclus ne déborde pas sur l'appelant
+            _evaluate(include_path, result, channel, active, depth + 1, cache)
+        elif not active:
+            continue
+        elif command == 'PREAMP':
+            try:
+                result.preamp_db += float(args.split()[0])
+            except (IndexError, ValueError):
+                print(f"ApoParser: Preamp invalide ({path}:{line_number})")
+        elif command == 'FILTER':
+            parsed = _parse_filter(args)
+            if parsed is None:
+                result.ignored['Filter'] += 1
+            elif parsed[0] not in FILTER_TYPES:
+                result.unknown_types[parsed[0]] += 1
+            else:
+                result.filters.append(parsed)
+        elif command == 'GRAPHICEQ':
+            result.graphic_eqs.append(_parse_graphic_eq(args))
+        else:
+            result.ignored[command.title()] += 1
+
+
+def parse_file(path, channel='L', cache=None):
+    """Parse une config Equalizer APO (Include résolus) telle qu'appliquée au canal ``channel``"""
+    result = ApoConfig()
+    _evaluate(path, result, channel.upper(), True, 0, cache or _cache)
+    return result
+
+
+def graphic_eq_db(graphic_eqs, frequency):
+    """Somme des GraphicEQ interpolées (en log f) sur ``frequency``"""
+    log_frequency = np.log10(frequency)
+    total = np.zeros(len(frequency))
+    for freqs, gains in graphic_eqs:
+        total += np.interp(log_frequency, np.log10(np.maximum(freqs, 1e-3)), gains)
+    return total
+
+
+def fit_peaking_bands(grid, target_db, band_count=GRAPHIC_FIT_BANDS, iterations=3):
+    """Approche ``target_db`` par ``band_count`` filtres PK fixes (log, Q selon l'espacement).
+
+    Moindres carrés sur la réponse d'un PK de 1 dB par bande (quasi linéaire
+    en gain), puis quelques corrections sur le résidu réel.
+    """
+    bands = np.round(np.logspace(np.log10(20), np.log10(20000), band_count)).astype(int).tolist()
+    q = bandwidth_to_q(np.log2(20000 / 20) / (band_count - 1))
+    types, q_values = ['PK'] * band_count, [q] * band_count
+    basis = band_responses_db(types, bands, np.ones(band_count), q_values, grid).T
+    # Légère régularisation : évite des gains voisins opposés là où la cible est peu contrainte
+    system = basis.T @ basis + 1e-3 * np.eye(band_count)
+    gains = np.zeros(band_count)
+    for _ in range(iterations):
+        residual = target_db - band_responses_db(types, bands, gains, q_values, grid).sum(axis=0)
+        gains += np.linalg.solve(system, basis.T @ residual)
+    return bands, np.round(gains, 2).tolist(), [round(q, 3)] * band_count
+
+
+def to_audioez(parsed, band_count=GRAPHIC_FIT_BANDS):
+    """ApoConfig → dictionnaire de preset AudioEZ.
+
+    Sans GraphicEQ, les filtres sont repris tels quels. Une GraphicEQ n'a
+    pas d'équivalent paramétrique : la réponse totale (GraphicEQ + filtres)
+    est approchée par ``band_count`` bandes PK, comme _resample_bands.
+    """
+    if not parsed.graphic_eqs:
+        types, bands, gains, q_values = (list(column) for column in zip(*parsed.filters)) if parsed.filters else ([], [], [], [])
+    else:
+        grid = log_grid()
+        target_db = graphic_eq_db(parsed.graphic_eqs, grid.frequency)
+        if parsed.filters:
+            target_db += band_responses_db(*zip(*parsed.filters), grid=grid).sum(axis=0)
+        bands, gains, q_values = fit_peaking_bands(grid, target_db, band_count)
+        types = ['PK'] * len(bands)
+    return {
+        'pre_gain_db': parsed.preamp_db,
+        'bands': bands,
+        'gains': gains,
+        'q_values': q_values,
+        'filter_types': types,
+    }
@@ -0,0 +1,203 @@
+import os, threading, time
+
+APO_INCLUDE_FILE = "AudioEZ.txt"  # written next to config.txt (export / live include mode)
+APO_MARKER = "# AudioEZ"  # first line of every file AudioEZ generates
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.02
+
+
+class ApoConfigWriter:
+    """Écrit config.txt d'Equalizer APO seulement quand le texte change.
+
+    Chaque écriture fait recharger toute la chaîne de filtres par APO : le
+    dernier texte écrit est gardé en mémoire avec le (mtime, taille) du
+    fichier, et un rendu identique est ignoré tant que le fichier n'a pas
+    été modifié par ailleurs. L'écriture passe par un fichier temporaire
+    + os.replace, APO ne lit donc jamais un fichier à moitié écrit.
+    """
+
+    def __init__(self):
+        self.writes = 0
+        self.skipped = 0
+        self.last_write_ms = 0.0
+        self.total_write_ms = 0.0
+        self._last = None  # (path, text, (mtime_ns, size))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def write(self, path, text):
+        """Retourne True si le fichier a été écrit, False si le contenu était déjà à jour.
+
+        Les erreurs d'écriture (IOError / PermissionError) remontent à l'appelant.
+        """
+        with self._lock:
+            if self._last is not None and self._last[:2] == (path, text) and self._last[2] == self._signature(path):
+                self.skipped += 1
+                return False
+
+            start = time.perf_counter()
+            tmp_path = f"{path}.audioez.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                for attempt in range(REPLACE_RETRIES):
+                    try:
+                        os.replace(tmp_path, path)
+                        break
+                    except PermissionError:
+                        # APO (ou un antivirus) peut tenir le fichier ouvert un court instant
+                        if attempt == REPLACE_RETRIES - 1:
+                            raise
+                        time.sleep(REPLACE_RETRY_DELAY)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                self._last = None
+                raise
+
+            self._last = (path, text, self._signature(path))
+            self.last_write_ms = (time.perf_counter() - start) * 1000
+            self.total_write_ms += self.last_write_ms
+            self.writes += 1
+            return True
+
+    def invalidate(self):
+        """Oublie le dernier texte (le prochain write écrira toujours)"""
+        with self._lock:
+            self._last = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "writes": self.writes,
+                "skipped": self.skipped,
+                "last_write_ms": round(self.last_write_ms, 3),
+                "avg_write_ms": round(self.total_write_ms / self.writes, 3) if self.writes else 0.0,
+            }
+
+
+class ApoWriteScheduler:
+    """Point d'entrée unique des écritures de config.txt (éditions, presets, transitions RTGD).
+
+    ``request`` ne fait que retenir le dernier texte rendu. Un thread
+    l'écrit tout de suite si la dernière écriture est assez ancienne
+    (front montant), sinon à la fin de l'intervalle (front descendant) :
+    les rafales sont fusionnées et l'état final est toujours écrit.
+    L'intervalle vaut au moins 1 / max_rate et s'allonge si les écritures
+    mesurées deviennent lentes (APO en cours de rechargement, disque lent).
+    """
+
+    def __init__(self, writer, max_rate=12.0, cost_factor=4.0, max_interval=0.5, on_error=None, on_written=None):
+        self.writer = writer
+        self.max_rate = max_rate
+        self.cost_factor = cost_factor
+        self.max_interval = max_interval
+        self.on_error = on_error
+        self.on_written = on_written  # on_written(token) une fois le texte sur disque (ou déjà à jour)
+        self.requests = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._write_cost = 0.0  # moyenne glissante du coût d'une écriture (s)
+        self._pending = None    # (seq, path, text, token)
+        self._seq = 0
+        self._written_seq = 0
+        self._last_write = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="ApoWriteScheduler", daemon=True)
+        self._thread.start()
+
+    @property
+    def interval(self):
+        return min(self.max_interval, max(1.0 / self.max_rate, self.cost_factor * self._write_cost))
+
+    def request(self, path, text, token=None):
+        """Programme l'écriture de ``text`` (thread-safe, ne bloque jamais).
+
+        ``token`` est rendu à on_written quand ce texte (ou un plus récent) est écrit.
+        """
+        with self._condition:
+            self._seq += 1
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (self._seq, path, text, token)
+            self.requests += 1
+            self._condition.notify()
+
+    def flush(self):
+        """Écrit immédiatement le texte en attente. Retourne False si l'écriture a échoué."""
+        with self._condition:
+            job, self._pending = self._pending, None
+        return self._write(job) if job is not None else True
+
+    def write(self, path, text):
+        """Écriture synchrone hors rendu (config.txt, export) : le texte en attente est écrit d'abord.
+
+        Passe par le même verrou que le thread, les erreurs remontent à l'appelant.
+        """
+        self.flush()
+        with self._write_lock:
+            return self.writer.write(path, text)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=2)
+        return self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                delay = self._last_write + self.interval - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                job, self._pending = self._pending, None
+            self._write(job)
+
+    def _write(self, job):
+        seq, path, text, token = job
+        with self._write_lock:
+            if seq < self._written_seq:
+                return True  # un flush a déjà écrit un état plus récent
+            self._written_seq = seq
+            start = time.perf_counter()
+            try:
+                written = self.writer.write(path, text)
+            except Exception as e:
+                self.errors += 1
+                if self.on_error:
+                    self.on_error(e)
+                return False
+            finally:
+                self._last_write = time.monotonic()
+            if written:
+                self._write_cost = 0.8 * self._write_cost + 0.2 * (time.perf_counter() - start)
+        if token is not None and self.on_written:
+            self.on_written(token)
+        return True
+
+    def stats(self):
+        with self._condition:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "pending": self._pending is not None,
+                "interval_ms": round(self.interval * 1000, 1),
+            }
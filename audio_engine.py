@@ -1,9 +1,19 @@
 import json, os, sys, csv
 import numpy as np
-from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtCore import QObject
 from PyQt6.QtWidgets import QFileDialog
 
 import config
+from apo_writer import APO_INCLUDE_FILE, APO_MARKER, ApoConfigWriter, ApoWriteScheduler
+from autoeq_catalog import get_catalog, read_autoeq_version
+from autoeq_curves import CurveCache, CurvePack, TargetCurveCache, resolve_target_path
+from autoeq_peq import PEQ_CONFIG_NAME, PEQResultCache, PEQResultStore, autoeq_parameters, compute_peq
+from eq_fit import FitEvaluator
+from eq_response import ResponseEngine, response_db
+from jobs import JobCancelled, JobScheduler
+from latency import LatencyTracker
+import preset_parsers
+from state_journal import StateJournal
 
 class AudioEngine(QObject):
     def __init__(self):
@@ -32,15 +42,55 @@ class AudioEngine(QObject):
 
         self.autoeq_cache_timestamp = None
         self.autoeq_models = []
+        self.autoeq_version = read_autoeq_version()
 
-        # Debounce timer for APO file writes (80 ms)
-        self._apo_write_timer = QTimer()
-        self._apo_write_timer.setSingleShot(True)
-        self._apo_write_timer.setInterval(80)
-        self._apo_write_timer.timeout.connect(self._apply_apo_config)
+        # Processed (interpolated, centered, averaged) headphone curves
+        self.curve_cache = CurveCache(
+            os.path.join(self.AUTOEQ_CACHE_DIR, "autoeq_cache", "curves"),
+            autoeq_version=self.autoeq_version
+        )
+        # Whole database packed as a memory-mapped matrix (optional, built offline)
+        self.curve_pack = CurvePack(
+            os.path.join(self.AUTOEQ_CACHE_DIR, "autoeq_cache", "pack"),
+            autoeq_version=self.autoeq_version
+        )
+        if self.curve_pack.open():
+            print(f"AudioEngine: {len(self.curve_pack)} courbes disponibles dans la matrice packée.")
+        # Processed target curves shared by fetch_object_curve and apply_autoeq_profile
+        self.target_cache = TargetCurveCache(max_size=16)
+        # PEQ optimisation results, keyed by model/target/bands/config/dataset;
+        # falls back to the store filled offline by autoeq_precompute.py
+        self.peq_cache = PEQResultCache(
+            os.path.join(self.AUTOEQ_CACHE_DIR, "autoeq_cache", "peq"),
+            store=PEQResultStore(os.path.join(self.AUTOEQ_CACHE_DIR, "autoeq_cache", "peq_results.sqlite"))
+        )
+
+        # Background jobs (AutoEQ, curve loads, imports); newer requests supersede older ones
+        self.jobs = JobScheduler(max_threads=2)
 
         # Frequency response cache — skip recalc if nothing changed
         self._last_eq_hash = None
+        # Incremented on every emitted EQ change; band patches carry it so the UI can detect gaps
+        self.eq_state_version = 0
+        # Python-side EQ response (dB on a 512-point log grid), one row per filter
+        self.response_engine = ResponseEngine()
+        self.frequency_response_db = self.response_engine.total_db
+        self.fit = FitEvaluator(self.response_engine.frequency)
+        self._fit_key = None
+        self._fit_shown = False
+        # temp_.aez is written behind by a background thread, at most every couple of seconds
+        self.state_journal = StateJournal(f"{config.APP_CONFIGS_DIR}/temp_.aez")
+        # Skips config.txt rewrites whose rendered text did not change (each write reloads APO)
+        self.apo_writer = ApoConfigWriter()
+        # UI event → APO file latency, per stage (see PythonChannel.setBandGainAndFrequency)
+        self.latency = LatencyTracker()
+        # Every config.txt write goes through this rate-limited, coalescing scheduler
+        self.apo_scheduler = ApoWriteScheduler(self.apo_writer, max_rate=config.APO_MAX_WRITES_PER_SEC,
+                                               on_error=self._on_apo_write_error,
+                                               on_written=self.latency.complete_upto)
+        # Live include mode (setting apo_live_include): only AudioEZ.txt is rewritten, config.txt is patched once
+        self.apo_live_include = False
+        self._apo_include_ready = False
 
         # Safe mode
         self.safe_mode = False
@@ -66,7 +116,7 @@ class AudioEngine(QObject):
             self.filter_types = ['PK'] * num_bands
             self.config_manager.set_active_config("Default")
             self.send_full_ui_update()
-            if self.is_playing: self._apply_apo_config()
+            self._schedule_apo_write()
             self.py_channel.statusUpdate.emit("Configuration 'Default' (flat) loaded.")
             return
 
@@ -79,7 +129,7 @@ class AudioEngine(QObject):
         self.filter_types = config_data.get('filter_types', ['PK'] * len(self.bands))
         self.config_manager.set_active_config(config_name)
         self.send_full_ui_update()
-        if self.is_playing: self._apply_apo_config()
+        self._schedule_apo_write()
         self.py_channel.statusUpdate.emit(f"Configuration '{config_name}' loaded.")
 
     def log_message(self, message):
@@ -90,21 +140,7 @@ class AudioEngine(QObject):
         valid_models = []
         invalid_models = []
 
-        available_csv_models = set()
-        for author_folder in os.listdir(measurements_root):
-            data_path = os.path.join(measurements_root, author_folder, "data")
-            if not os.path.exists(data_path):
-                continue
-
-            for category_folder in os.listdir(data_path):
-                cat_path = os.path.join(data_path, category_folder)
-                if not os.path.isdir(cat_path):
-                    continue
-
-                for file in os.listdir(cat_path):
-                    if file.lower().endswith(".csv"):
-                        base = os.path.splitext(file)[0].lower()
-                        available_csv_models.add(base)
+        available_csv_models = get_catalog().model_names(lower=True)
 
         for model_name in models:
             base_name = os.path.basename(model_name).lower()
@@ -144,6 +180,9 @@ class AudioEngine(QObject):
             self.log_message(f"Répertoire {measurements_root} introuvable.")
             return []
 
+        if force_refresh:
+            get_catalog(force_rebuild=True)
+
         for folder in os.listdir(measurements_root):
             index_path = os.path.join(measurements_root, folder, "name_index.tsv")
             if not os.path.isfile(index_path):
@@ -179,151 +218,113 @@ class AudioEngine(QObject):
 
         return self.autoeq_index
         
-    def fetch_object_curve(self, object_name):
-        """Récupère la courbe de réponse pour un objet donné"""
-        from autoeq.frequency_response import FrequencyResponse
-        import os
-        import numpy as np
+    def _curve_kind(self, object_name, measurements_root="measurements", targets_root="targets"):
+        """'target' si le nom désigne une cible (measurements ou targets), sinon 'earphone'"""
+        target_csv_path = resolve_target_path(object_name, measurements_root, targets_root)
+        if '/' in object_name or '\\' in object_name or os.path.exists(target_csv_path):
+            return "target", target_csv_path
+        return "earphone", None
 
+    def fetch_object_curve(self, object_name):
+        """Récupère la courbe de réponse pour un objet donné (en arrière-plan)"""
         if not object_name:
             self.log_message("[FetchCurve] Aucun nom d'objet fourni.")
             return
 
         print(f"[FetchCurve] Chargement de : {object_name}")
 
-        measurements_root = "measurements"
-        targets_root = "targets"
-        
-        try:
-            if '/' in object_name or '\\' in object_name:
-                parts = object_name.replace('\\', '/').split('/')
-                if len(parts) < 2:
-                    raise ValueError(f"Format de target inattendu : {object_name}")
-
-                target_csv_path = os.path.join(measurements_root, parts[0], "data", *parts[1:-1], parts[-1] + ".csv")
-                if not os.path.exists(target_csv_path):
-                    raise FileNotFoundError(f"Fichier cible introuvable dans measurements: {target_csv_path}")
-
-                target_fr = FrequencyResponse.read_csv(target_csv_path)
-                target_fr.interpolate()
-                target_fr.center()
-
-                self.log_message(f"[FetchCurve] Cible chargée (measurements) : {object_name}")
-                if self.py_channel and hasattr(self.py_channel, 'targetCurveUpdate'):
-                    self.py_channel.target_name = object_name
-                    self.py_channel.targetCurveUpdate.emit(target_fr.frequency.tolist(), target_fr.raw.tolist())
-
-            else:
-                target_csv_path = os.path.join(targets_root, f"{object_name}.csv")
-                if os.path.exists(target_csv_path):
-                    target_fr = FrequencyResponse.read_csv(target_csv_path)
-                    target_fr.interpolate()
-                    target_fr.center()
-
-                    self.log_message(f"[FetchCurve] Cible chargée (targets) : {object_name}")
-                    if self.py_channel and hasattr(self.py_channel, 'targetCurveUpdate'):
-                        self.py_channel.target_name = object_name
-                        self.py_channel.targetCurveUpdate.emit(target_fr.frequency.tolist(), target_fr.raw.tolist())
-                else:
-                    model_base_name = os.path.basename(object_name).lower()
-                    measurement_files = []
-
-                    for author_folder in os.listdir(measurements_root):
-                        data_path = os.path.join(measurements_root, author_folder, "data")
-                        if not os.path.exists(data_path):
-                            continue
-                        for category_folder in os.listdir(data_path):
-                            cat_path = os.path.join(data_path, category_folder)
-                            if not os.path.isdir(cat_path):
-                                continue
-                            for file in os.listdir(cat_path):
-                                if file.lower().endswith(".csv") and os.path.splitext(file)[0].lower() == model_base_name:
-                                    measurement_files.append(os.path.join(cat_path, file))
-
-                    if not measurement_files:
-                        self.log_message(f"[FetchCurve] Aucun fichier de mesure trouvé pour {object_name}")
-                        if self.py_channel:
-                            self.py_channel.statusUpdate.emit(f"Measurement file missing for {object_name}.")
-                        return
-
-                    responses = []
-                    for csv_file in measurement_files:
-                        fr = FrequencyResponse.read_csv(csv_file)
-                        fr.interpolate()
-                        fr.center()
-                        if fr.raw.size > 0:
-                            responses.append(fr)
-
-                    if not responses:
-                        raise ValueError("Aucune réponse fréquentielle valide trouvée pour la moyenne.")
-
-                    min_len = min(len(fr.frequency) for fr in responses)
-                    frequency = responses[0].frequency[:min_len]
-                    avg_raw = np.mean([fr.raw[:min_len] for fr in responses], axis=0)
-
-                    avg_fr = FrequencyResponse(name=f"{object_name} (average)", frequency=frequency, raw=avg_raw)
-                    avg_fr.interpolate()
-                    avg_fr.center()
-
-                    self.log_message(f"[FetchCurve] Écouteur chargé : {object_name}")
-                    if self.py_channel and hasattr(self.py_channel, 'EarphonesCurve'):
-                        self.py_channel.earphone_name = object_name
-                        self.py_channel.EarphonesCurve.emit(avg_fr.frequency.tolist(), avg_fr.raw.tolist())
+        kind, _ = self._curve_kind(object_name)
+        self.jobs.submit(
+            f"curve:{kind}",
+            lambda is_cancelled: self._load_object_curve(object_name),
+            on_done=lambda loaded: self._apply_object_curve(object_name, loaded),
+            on_error=lambda error: self._apply_object_curve(object_name, None, error)
+        )
 
-        except Exception as e:
-            import traceback
-            self.log_message(f"[FetchCurve] Erreur lors du chargement de {object_name} : {e}\n{traceback.format_exc()}")
+    def _load_object_curve(self, object_name):
+        """Partie calcul de fetch_object_curve (thread de travail, n'émet rien)"""
+        kind, target_csv_path = self._curve_kind(object_name)
+        if kind == "target":
+            if not os.path.exists(target_csv_path):
+                raise FileNotFoundError(f"Fichier cible introuvable dans measurements: {target_csv_path}")
+            target_fr = self.target_cache.get(target_csv_path)
+            source = "measurements" if ('/' in object_name or '\\' in object_name) else "targets"
+            return {"kind": kind, "source": source, "frequency": target_fr.frequency, "raw": target_fr.raw}
+
+        if not self.has_headphone_curve(object_name):
+            return {"kind": "missing"}
+
+        frequency, avg_raw = self._load_headphone_curve(object_name)
+        return {"kind": kind, "frequency": np.asarray(frequency), "raw": np.asarray(avg_raw)}
+
+    def _apply_object_curve(self, object_name, loaded, error=None):
+        """Partie UI de fetch_object_curve (thread principal)"""
+        if error is not None:
+            self.log_message(f"[FetchCurve] Erreur lors du chargement de {object_name} : {error}")
             if self.py_channel:
                 self.py_channel.statusUpdate.emit(f"Error loading curve for {object_name}.")
 
-        eq_parametric_data = {
-            "preamp": self.pre_gain_db,
-            "bass_boost": self.bass_gain_db,
-            "treble_boost": self.treble_gain_db,
-            "filters": [
-                {"type": t, "gain": g, "q": q, "freq": b}
-                for b, g, q, t in zip(self.bands, self.gains, self.q_values, self.filter_types)
-            ]
-        }
+        elif loaded["kind"] == "missing":
+            self.log_message(f"[FetchCurve] Aucun fichier de mesure trouvé pour {object_name}")
+            if self.py_channel:
+                self.py_channel.statusUpdate.emit(f"Measurement file missing for {object_name}.")
+            return
+
+        elif loaded["kind"] == "target":
+            self.log_message(f"[FetchCurve] Cible chargée ({loaded['source']}) : {object_name}")
+            if self.py_channel and hasattr(self.py_channel, 'send_target_curve'):
+                self.py_channel.target_name = object_name
+                self.py_channel.send_target_curve(loaded["frequency"], loaded["raw"])
 
-        from config_save import save_to_aez_file
+        else:
+            self.log_message(f"[FetchCurve] Écouteur chargé : {object_name} (cache {self.curve_cache.stats()})")
+            if self.py_channel and hasattr(self.py_channel, 'send_earphones_curve'):
+                self.py_channel.earphone_name = object_name
+                self.py_channel.send_earphones_curve(loaded["frequency"], loaded["raw"])
+
+        self.save_state()
+        self.calculate_frequency_response()
 
-        save_to_aez_file(
-            filepath=f"{config.APP_CONFIGS_DIR}/temp_.aez",
-            eq_parametric=eq_parametric_data,
+    def save_state(self):
+        """Marque l'état courant (EQ + courbes) à sauvegarder dans temp_.aez"""
+        if not self.py_channel:
+            return
+        self.state_journal.mark(
+            eq_parametric={
+                "preamp": self.pre_gain_db,
+                "bass_boost": self.bass_gain_db,
+                "treble_boost": self.treble_gain_db,
+                "filters": [
+                    {"type": t, "gain": g, "q": q, "freq": b}
+                    for b, g, q, t in zip(self.bands, self.gains, self.q_values, self.filter_types)
+                    if None not in (b, g, q, t)
+                ]
+            },
             earphone_name=self.py_channel.earphone_name,
             earphone_curve=[self.py_channel._earphones_curve_freq, self.py_channel._earphones_curve_amp],
             target_name=self.py_channel.target_name,
             target_curve=[self.py_channel._target_curve_freq, self.py_channel._target_curve_amp]
         )
 
-        self.calculate_frequency_response()
+    def has_headphone_curve(self, model_name):
+        return model_name in self.curve_pack or model_name in get_catalog()
+
+    def _load_headphone_curve(self, model_name):
+        """Courbe moyenne d'un écouteur : matrice packée, sinon cache .npz, sinon CSV"""
+        packed = self.curve_pack.get(model_name)
+        if packed is not None:
+            return packed
+        return self.curve_cache.load(model_name, get_catalog().csv_paths(model_name))
 
     def apply_autoeq_profile(self, model_name, target=None, band_size=10):
         """Applique un profil AutoEQ à l'égaliseur"""
-        from autoeq.frequency_response import FrequencyResponse
-        from autoeq.peq import PEQ
-        from autoeq.constants import PEQ_CONFIGS, DEFAULT_FS, DEFAULT_MAX_GAIN, DEFAULT_MAX_SLOPE, \
-            DEFAULT_TREBLE_F_LOWER, DEFAULT_TREBLE_F_UPPER, DEFAULT_TREBLE_GAIN_K
-        
         self.py_channel.statusUpdate.emit("AutoEQ, please wait...")
 
         self.log_message(f"Application AutoEQ locale: {model_name} → cible: {target or 'par défaut'}")
 
         model_base_name = os.path.basename(model_name)
-        measurements_root = "measurements"
-        measurement_files = []
-        for author_folder in os.listdir(measurements_root):
-            data_path = os.path.join(measurements_root, author_folder, "data")
-            if not os.path.exists(data_path): continue
-            for category_folder in os.listdir(data_path):
-                cat_path = os.path.join(data_path, category_folder)
-                if not os.path.isdir(cat_path): continue
-                for file in os.listdir(cat_path):
-                    if file.lower().endswith(".csv") and os.path.splitext(file)[0].lower() == model_base_name.lower():
-                        measurement_files.append(os.path.join(cat_path, file))
-        
-        if not measurement_files:
+
+        if not self.has_headphone_curve(model_name):
             self.log_message(f"Aucun fichier de mesure trouvé pour {model_name}")
             self.py_channel.statusUpdate.emit(f"Measurement file missing for {model_name}.")
             return
@@ -331,114 +332,106 @@ class AudioEngine(QObject):
         self.py_channel.earphone_name = model_name
         self.py_channel.target_name = target
 
-        try:
-            responses = []
-            for csv_file in measurement_files:
-                fr = FrequencyResponse.read_csv(csv_file)
-                fr.interpolate()
-                fr.center()
-                if fr.raw.size > 0:
-                    responses.append(fr)
-
-            if not responses:
-                raise ValueError("Aucune réponse fréquentielle valide trouvée pour la moyenne.")
-
-            min_len = min(len(fr.frequency) for fr in responses)
-            frequency = responses[0].frequency[:min_len]
-            avg_raw = np.mean([fr.raw[:min_len] for fr in responses], axis=0)
-            
-            avg_fr = FrequencyResponse(name=f"{model_name} (average)", frequency=frequency, raw=avg_raw)
-            avg_fr.interpolate()
-            avg_fr.center()
-
-            if self.py_channel and hasattr(self.py_channel, 'EarphonesCurve'):
-                self.py_channel.EarphonesCurve.emit(avg_fr.frequency.tolist(), avg_fr.raw.tolist())
-
-            if not target:
-                return None
-            if '/' in target or '\\' in target:
-                parts = target.replace('\\', '/').split('/')
-                if len(parts) < 2:
-                    raise ValueError(f"Format de target inattendu : {target}")
-                target_csv_path = os.path.join("measurements", parts[0], "data", *parts[1:-1], parts[-1] + ".csv")
-            else:
-                target_csv_path = os.path.join("targets", f"{target}.csv")
+        self.jobs.submit(
+            "autoeq",
+            lambda is_cancelled: self._compute_autoeq_profile(model_name, target, band_size, is_cancelled),
+            on_done=lambda computed: self._apply_autoeq_result(model_name, target, band_size, computed),
+            on_error=lambda error: self._on_autoeq_error(model_name, error)
+        )
 
-            print(f"Chemin de fichier cible vérifié : {target_csv_path}")
-            print(f"Le fichier existe-t-il ? {os.path.exists(target_csv_path)}")
+    def _compute_autoeq_profile(self, model_name, target, band_size, is_cancelled=lambda: False):
+        """Partie calcul de apply_autoeq_profile (thread de travail, n'émet rien)"""
+        frequency, avg_raw = self._load_headphone_curve(model_name)
+        computed = {"frequency": np.asarray(frequency, dtype=float), "raw": np.asarray(avg_raw, dtype=float)}
 
-            if not target_csv_path or not os.path.exists(target_csv_path):
-                raise ValueError(f"Fichier de cible introuvable ou invalide : {target_csv_path}")
+        if not target:
+            return computed
+        target_csv_path = resolve_target_path(target)
 
-            target_fr = FrequencyResponse.read_csv(target_csv_path)
-            target_fr.interpolate()
-            target_fr.center()
-            
-            avg_fr.compensate(target_fr, min_mean_error=True)
-            avg_fr.smoothen()
-            avg_fr.equalize(
-                max_gain=DEFAULT_MAX_GAIN,
-                max_slope=DEFAULT_MAX_SLOPE,
-                treble_f_lower=DEFAULT_TREBLE_F_LOWER,
-                treble_f_upper=DEFAULT_TREBLE_F_UPPER,
-                treble_gain_k=DEFAULT_TREBLE_GAIN_K
-            )
+        print(f"Chemin de fichier cible vérifié : {target_csv_path}")
+        print(f"Le fichier existe-t-il ? {os.path.exists(target_csv_path)}")
 
-            peq_config = PEQ_CONFIGS['8_PEAKING_WITH_SHELVES']
-            
-            peq = PEQ.from_dict(
-                config=peq_config,
-                f=avg_fr.frequency,
-                fs=DEFAULT_FS,
-                target=avg_fr.equalization
-            )
-            
-            peq.optimize()
-            
-            if peq.filters and len(peq.filters) == band_size:
-                preamp = -peq.max_gain if peq.max_gain > 0 else 0.0
-            
-                self.pre_gain_db = preamp
-                self.bands = [filt.fc for filt in peq.filters]
-                self.band_count = len(self.bands) 
-                self.gains = [filt.gain for filt in peq.filters]
-                self.q_values = [filt.q for filt in peq.filters]
-                filter_name_map = {
-                    'LowShelf': 'LS',
-                    'HighShelf': 'HS',
-                    'Peaking': 'PK',
-                    'LowPass': 'LP',
-                    'HighPass': 'HP',
-                    'BandPass': 'BP',
-                    'Notch': 'NO',
-                    'AllPass': 'AP'
-                }
-                self.filter_types = [filter_name_map.get(type(filt).__name__, type(filt).__name__) for filt in peq.filters]
-                                    
-                self.log_message(f"Optimisation réussie avec {len(peq.filters)} filtres.")
-            else:
-                self.log_message(f"Erreur d'optimisation PEQ : l'optimisation a produit {len(peq.filters)} filtres au lieu de 10.")
-                self.bands = []
-                self.band_count = 0
-                self.gains = []
-                self.q_values = []
-                self.filter_types = []
-            
-            if self.py_channel and hasattr(self.py_channel, 'targetCurveUpdate'):
-                self.py_channel.targetCurveUpdate.emit(target_fr.frequency.tolist(), target_fr.raw.tolist())
+        if not target_csv_path or not os.path.exists(target_csv_path):
+            raise ValueError(f"Fichier de cible introuvable ou invalide : {target_csv_path}")
 
-        except Exception as e:
-            import traceback
-            self.log_message(f"Erreur retarget AutoEQ local: {e}\n{traceback.format_exc()}")
-            if self.py_channel:
-                self.py_channel.statusUpdate.emit(f"Error recalcul AutoEQ for {model_name}.")
+        target_fr = self.target_cache.get(target_csv_path)
+        computed["target_fr"] = target_fr
+        if is_cancelled():
+            raise JobCancelled()
+
+        # Même écouteur + même cible + même dataset => même résultat d'optimisation
+        cache_key = self.peq_cache.make_key(
+            model_name, target, band_size, PEQ_CONFIG_NAME, autoeq_parameters(), self.autoeq_version
+        )
+        result = self.peq_cache.get(cache_key)
+        computed["from_cache"] = result is not None
+        if result is None:
+            result = compute_peq(model_name, frequency, avg_raw, target_fr, PEQ_CONFIG_NAME)
+            if len(result['bands']) == band_size:
+                self.peq_cache.put(cache_key, result, meta={'model': model_name, 'target': target, 'band_size': band_size})
+        computed["result"] = result
+        return computed
+
+    def _apply_autoeq_result(self, model_name, target, band_size, computed):
+        """Partie UI de apply_autoeq_profile (thread principal)"""
+        model_base_name = os.path.basename(model_name)
+
+        if self.py_channel and hasattr(self.py_channel, 'send_earphones_curve'):
+            self.py_channel.send_earphones_curve(computed["frequency"], computed["raw"])
+
+        if "result" not in computed:
             return
 
+        result = computed["result"]
+        if computed["from_cache"]:
+            self.log_message(f"Profil AutoEQ chargé depuis le cache pour {model_base_name}.")
+
+        if result['bands'] and len(result['bands']) == band_size:
+            self.pre_gain_db = result['preamp']
+            self.bands = list(result['bands'])
+            self.band_count = len(self.bands) 
+            self.gains = list(result['gains'])
+            self.q_values = list(result['q_values'])
+            self.filter_types = list(result['filter_types'])
+                                 
+            self.log_message(f"Optimisation réussie avec {len(self.bands)} filtres.")
+        else:
+            self.log_message(f"Erreur d'optimisation PEQ : l'optimisation a produit {len(result['bands'])} filtres au lieu de 10.")
+            self.bands = []
+            self.band_count = 0
+            self.gains = []
+            self.q_values = []
+            self.filter_types = []
+
+        target_fr = computed["target_fr"]
+        if self.py_channel and hasattr(self.py_channel, 'send_target_curve'):
+            self.py_channel.send_target_curve(target_fr.frequency, target_fr.raw)
+
         self.send_full_ui_update()
-        if self.is_playing:
-            self._apply_apo_config()
+        self._schedule_apo_write()
         self.py_channel.statusUpdate.emit(f"'{model_base_name}' retarget → {target}")
 
+    def _on_autoeq_error(self, model_name, error):
+        self.log_message(f"Erreur retarget AutoEQ local: {error}")
+        if self.py_channel:
+            self.py_channel.statusUpdate.emit(f"Error recalcul AutoEQ for {model_name}.")
+
+    def get_diagnostics(self):
+        """État des caches (exposé à l'interface via PythonChannel.getDiagnostics)"""
+        return {
+            "curve_cache": self.curve_cache.stats(),
+            "target_cache": self.target_cache.stats(),
+            "peq_cache": self.peq_cache.stats(),
+            "curve_pack": {"rows": len(self.curve_pack)},
+            "jobs": self.jobs.stats(),
+            "response_engine": self.response_engine.stats(),
+            "fit_evaluations": self.fit.evaluations,
+            "state_journal": self.state_journal.stats(),
+            "apo_writer": self.apo_writer.stats(),
+            "apo_scheduler": self.apo_scheduler.stats(),
+            "latency": self.latency.stats(),
+        }
+
     def set_channel(self, channel):
         self.py_channel = channel
         print("AudioEngine: Python channel updated.")
@@ -461,11 +454,11 @@ class AudioEngine(QObject):
     def write_disabled_config(self):
         """Écrit une configuration désactivée dans config.txt"""
         try:
-            with open(config.EAPO_CONFIG_PATH, 'w', encoding='utf-8') as f:
-                f.write("# AudioEZ - Equalizer Disabled\n")
-                f.write("Preamp: 0 dB\n")
-                for i in range(1, len(self.bands) + 1):
-                    f.write(f"Filter {i}: OFF None\n")
+            lines = [f"{APO_MARKER} - Equalizer Disabled", "Preamp: 0 dB"]
+            lines += [f"Filter {i}: OFF None" for i in range(1, len(self.bands) + 1)]
+            self.apo_scheduler.request(self._apo_output_path(), "\n".join(lines) + "\n")
+            if not self.apo_scheduler.flush():
+                return False
 
             print("Configuration EQ APO désactivée avec succès")
             return True
@@ -494,6 +487,7 @@ class AudioEngine(QObject):
             if os.path.exists(backup_path):
                 import shutil
                 shutil.copy2(backup_path, config_path)
+                self.apo_writer.invalidate()
                 return True
         except Exception as e:
             print(f"Error restauration config: {e}")
@@ -503,69 +497,121 @@ class AudioEngine(QObject):
         if not self.check_apo_config():
             return
 
-        print("AudioEngine: Updating Equalizer APO configuration file...")
-
         try:
-            config_lines = [f"Preamp: {self.pre_gain_db:.1f} dB"]
-
-            for i in range(len(self.bands)):
-                filter_type = self.filter_types[i]
-                fc = self.bands[i]
-                gain = self.gains[i]
-                q = self.q_values[i]
-
-                if filter_type.upper() in ['LS', 'HS', 'LSQ', 'HSQ']:
-                    config_lines.append(
-                        f"Filter {i+1}: ON {filter_type} Fc {fc} Hz Gain {gain:.1f} dB Q {q:.2f}"
-                    )
-                else:
-                    config_lines.append(
-                        f"Filter {i+1}: ON {filter_type} Fc {fc} Hz Gain {gain:.1f} dB Q {q:.2f}"
-                    )
-
-            filter_index = len(self.bands) + 1
-
-            if hasattr(self, "bass_gain_db") and self.bass_gain_db != 0:
-                bass_q = getattr(self, "bass_q", 0.71)
+            text = self._render_apo_config()
+            if self.apo_live_include:
+                self._ensure_apo_include()
+            self.apo_scheduler.request(self._apo_output_path(), text, token=self.latency.mark("apo_requested"))
+
+        except Exception as e:
+            self._on_apo_write_error(e)
+
+    def _render_apo_config(self):
+        """Texte APO (préampli, filtres, bass/treble) de l'état courant"""
+        config_lines = [f"{APO_MARKER} - generated, edits will be overwritten", f"Preamp: {self.pre_gain_db:.1f} dB"]
+
+        for i in range(len(self.bands)):
+            filter_type = self.filter_types[i]
+            fc = self.bands[i]
+            gain = self.gains[i]
+            q = self.q_values[i]
+
+            if filter_type.upper() in ['LS', 'HS', 'LSQ', 'HSQ']:
                 config_lines.append(
-                    f"Filter {filter_index}: ON LS Fc 100 Hz Gain {self.bass_gain_db:.1f} dB Q {bass_q:.2f}"
+                    f"Filter {i+1}: ON {filter_type} Fc {fc} Hz Gain {gain:.1f} dB Q {q:.2f}"
                 )
-                filter_index += 1
-
-            if hasattr(self, "treble_gain_db") and self.treble_gain_db != 0:
-                treble_q = getattr(self, "treble_q", 0.71)
+            else:
                 config_lines.append(
-                    f"Filter {filter_index}: ON HS Fc 8000 Hz Gain {self.treble_gain_db:.1f} dB Q {treble_q:.2f}"
+                    f"Filter {i+1}: ON {filter_type} Fc {fc} Hz Gain {gain:.1f} dB Q {q:.2f}"
                 )
 
-            with open(config.EAPO_CONFIG_PATH, "w", encoding="utf-8") as f:
-                f.write("\n".join(config_lines))
+        filter_index = len(self.bands) + 1
 
-            print("AudioEngine: Equalizer APO configuration file updated.")
+        if hasattr(self, "bass_gain_db") and self.bass_gain_db != 0:
+            bass_q = getattr(self, "bass_q", 0.71)
+            config_lines.append(
+                f"Filter {filter_index}: ON LS Fc 100 Hz Gain {self.bass_gain_db:.1f} dB Q {bass_q:.2f}"
+            )
+            filter_index += 1
 
-        except IOError as e:
-            error_msg = (
-                "Permission error: Cannot write to Equalizer APO config file. \nPlease run the application as administrator."
-                if e.errno == 13 else f"Error updating Equalizer APO configuration: {e}"
+        if hasattr(self, "treble_gain_db") and self.treble_gain_db != 0:
+            treble_q = getattr(self, "treble_q", 0.71)
+            config_lines.append(
+                f"Filter {filter_index}: ON HS Fc 8000 Hz Gain {self.treble_gain_db:.1f} dB Q {treble_q:.2f}"
             )
-            if self.py_channel:
-                self.py_channel.statusUpdate.emit(error_msg)
-            print(error_msg, file=sys.stderr)
 
-        except Exception as e:
+        return "\n".join(config_lines)
+
+    def _apo_output_path(self):
+        """Fichier réécrit à chaque changement : AudioEZ.txt en mode include, sinon config.txt"""
+        if self.apo_live_include:
+            return os.path.join(os.path.dirname(config.EAPO_CONFIG_PATH), APO_INCLUDE_FILE)
+        return config.EAPO_CONFIG_PATH
+
+    def set_apo_live_include(self, enabled):
+        """Mode include : config.txt est patché une fois, seules les écritures d'AudioEZ.txt suivent"""
+        enabled = bool(enabled)
+        if enabled == self.apo_live_include:
+            return
+        self.apo_live_include = enabled
+        self._apo_include_ready = False
+        print(f"AudioEngine: APO live include mode {'enabled' if enabled else 'disabled'}.")
+        self._schedule_apo_write()
+
+    def _ensure_apo_include(self):
+        """Ajoute 'Include: AudioEZ.txt' à config.txt (une fois par session).
+
+        Seul un config.txt écrit par AudioEZ en mode complet est remplacé
+        (première ligne APO_MARKER, ou uniquement des lignes Preamp/Filter
+        comme l'écrivaient les versions sans marqueur), sinon ses filtres
+        s'appliqueraient en plus de l'include ; tout autre contenu est
+        conservé et la directive est ajoutée à la fin. config.txt.bak est
+        créé avant toute modification.
+        """
+        if self._apo_include_ready:
+            return
+        try:
+            with open(config.EAPO_CONFIG_PATH, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = ""
+
+        directive = f"Include: {APO_INCLUDE_FILE}"
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        if directive in lines:
+            pass
+        elif (not lines or lines[0].startswith(APO_MARKER)
+              or all(line.startswith(("Preamp:", "Filter ", APO_MARKER)) for line in lines)):
+            self.backup_config()
+            self.apo_scheduler.write(config.EAPO_CONFIG_PATH, f"{APO_MARKER} - live include\n{directive}\n")
+        else:
+            self.backup_config()
+            self.apo_scheduler.write(config.EAPO_CONFIG_PATH, content.rstrip("\n") + f"\n{directive}\n")
+        self._apo_include_ready = True
+
+    def _on_apo_write_error(self, e):
+        """Erreur de rendu ou d'écriture de config.txt (peut venir du thread du scheduler)"""
+        if isinstance(e, IOError) and e.errno == 13:
+            error_msg = "Permission error: Cannot write to Equalizer APO config file. \nPlease run the application as administrator."
+        else:
             error_msg = f"Error updating Equalizer APO configuration: {e}"
-            if self.py_channel:
-                self.py_channel.statusUpdate.emit(error_msg)
-            print(error_msg, file=sys.stderr)
+        if self.py_channel:
+            self.py_channel.statusUpdate.emit(error_msg)
+        print(error_msg, file=sys.stderr)
 
-    def calculate_frequency_response(self):
-        """Calcule et met à jour la réponse fréquentielle (cached)"""
+    def calculate_frequency_response(self, patch_index=None, patch_fields=()):
+        """Calcule et met à jour la réponse fréquentielle (cached).
+
+        Avec patch_index, seule la bande modifiée (champs patch_fields) est envoyée à l'UI.
+        """
         current_hash = self._get_eq_state_hash()
         if current_hash is not None and current_hash == self._last_eq_hash:
+            self.update_fit()  # EQ inchangé, mais une courbe a pu changer
             return
         self._last_eq_hash = current_hash
+        self.eq_state_version += 1
 
-        freqs = np.logspace(np.log10(20), np.log10(20000), 512)
+        freqs = self.response_engine.frequency
 
         valid_triplets = [
             (b, g, q, t)
@@ -573,40 +619,61 @@ class AudioEngine(QObject):
             if b is not None and g is not None and q is not None and t is not None
         ]
 
+        # Bass/treble last so that a band index is also its row in the contribution matrix
+        filters = [(t, b, g, q) for b, g, q, t in valid_triplets] + self._tone_filters()
+        self.frequency_response_db = self.response_engine.update(filters, self.pre_gain_db or 0.0)
+        self.latency.mark("response_computed", version=self.eq_state_version)
+
         if valid_triplets and self.py_channel:
             bands, gains, q_values, filter_types = zip(*valid_triplets)
 
-            eq_parametric_data = {
-                "preamp": self.pre_gain_db,
-                "bass_boost": self.bass_gain_db,
-                "treble_boost": self.treble_gain_db,
-                "filters": [
-                    {"type": t, "gain": g, "q": q, "freq": b}
-                    for b, g, q, t in zip(bands, gains, q_values, filter_types)
-                ]
-            }
-
-            from config_save import save_to_aez_file
-
-            save_to_aez_file(
-                filepath=f"{config.APP_CONFIGS_DIR}/temp_.aez",
-                eq_parametric=eq_parametric_data,
-                earphone_name=self.py_channel.earphone_name,
-                earphone_curve=[self.py_channel._earphones_curve_freq, self.py_channel._earphones_curve_amp],
-                target_name=self.py_channel.target_name,
-                target_curve=[self.py_channel._target_curve_freq, self.py_channel._target_curve_amp]
-            )
-
-            self.py_channel.frequencyResponseUpdate.emit(
-                list(map(float, freqs)),
-                list(map(float, bands)),
-                list(map(float, gains)),
-                list(map(float, q_values)),
-                list(filter_types)
-            )
+            self.save_state()
+            self.latency.mark("state_marked")
+
+            # patch_index est un index de self.bands : dès qu'une bande incomplète est filtrée,
+            # les index de l'UI ne correspondent plus, on renvoie l'état complet
+            patchable = len(valid_triplets) == len(self.bands) and patch_index is not None and patch_index < len(bands)
+            if patchable and hasattr(self.py_channel, 'send_band_patch'):
+                band = {"freq": bands[patch_index], "gain": gains[patch_index],
+                        "q": q_values[patch_index], "type": filter_types[patch_index]}
+                self.py_channel.send_band_patch(self.eq_state_version, patch_index,
+                                                {key: band[key] for key in patch_fields})
+            else:
+                self.py_channel.send_frequency_response(freqs, bands, gains, q_values, filter_types,
+                                                        version=self.eq_state_version)
         else:
             print("⚠️ Aucun triplet (band, gain, q, type) complet valide trouvé.")
 
+        self.update_fit()
+        self.latency.mark("ui_emitted")
+
+    def update_fit(self):
+        """Écart écouteur + EQ vs cible (RMS pondéré, écart max), poussé à l'UI à chaque édition"""
+        channel = self.py_channel
+        if not channel or not hasattr(channel, 'send_fit'):
+            return
+        key = (self.eq_state_version, channel.curves_version)
+        if key == self._fit_key:
+            return
+        self._fit_key = key
+        earphone = [channel._earphones_curve_freq, channel._earphones_curve_amp]
+        target = [channel._target_curve_freq, channel._target_curve_amp]
+        if self.fit.set_curves(earphone, target):
+            self._fit_shown = True
+            channel.send_fit(self.eq_state_version, self.fit.evaluate(self.frequency_response_db))
+        elif self._fit_shown:
+            self._fit_shown = False
+            channel.send_fit(self.eq_state_version, None)
+
+    def _tone_filters(self):
+        """Filtres bass/treble tels qu'écrits dans la config APO"""
+        filters = []
+        if getattr(self, "bass_gain_db", 0):
+            filters.append(("LS", 100, self.bass_gain_db, getattr(self, "bass_q", 0.71)))
+        if getattr(self, "treble_gain_db", 0):
+            filters.append(("HS", 8000, self.treble_gain_db, getattr(self, "treble_q", 0.71)))
+        return filters
+
     def start_playback(self):
         if self.is_playing:
             return
@@ -631,28 +698,17 @@ class AudioEngine(QObject):
         
         self.is_playing = False
         
-        try:
-            import config
-            
-            with open(config.EAPO_CONFIG_PATH, "w", encoding="utf-8") as f:
-                f.write("Preamp: 0 dB\n")
-                for i in range(1, len(self.bands) + 1):
-                    f.write(f"Filter {i}: OFF None\n")
-
-        except Exception as e:
-            error_msg = f"Error disabling Equalizer APO: {e}"
-            if self.py_channel:
-                self.py_channel.statusUpdate.emit(error_msg)
-            print(error_msg, file=sys.stderr)
+        # Écrit tout de suite (remplace une écriture d'EQ en attente), les erreurs passent par _on_apo_write_error
+        self.write_disabled_config()
         
         if self.py_channel:
             self.py_channel.statusUpdate.emit("AudioEZ disabled.")
         self._update_and_emit_playback_state()
 
     def _schedule_apo_write(self):
-        """Debounce APO file writes: restart the 80 ms timer on each call."""
+        """Schedule an APO write if the equalizer is active (rate limiting is done by apo_scheduler)."""
         if self.is_playing:
-            self._apo_write_timer.start()
+            self._apply_apo_config()
 
     def _get_eq_state_hash(self):
         """Return a hash of the full EQ state for cache invalidation."""
@@ -682,7 +738,7 @@ class AudioEngine(QObject):
             self.gains[band_index] = self._clamp_gain(gain_db)
             self.bands[band_index] = frequency
             self._schedule_apo_write()
-            self.calculate_frequency_response()
+            self.calculate_frequency_response(patch_index=band_index, patch_fields=("gain", "freq"))
         else:
             print(f"AudioEngine: Invalid band index: {band_index}")
 
@@ -711,8 +767,7 @@ class AudioEngine(QObject):
         self.pre_gain_db = 0.0
         self.bass_gain_db = 0.0
         self.treble_gain_db = 0.0
-        if self.is_playing:
-            self._apply_apo_config()
+        self._schedule_apo_write()
         self.send_full_ui_update()
         
     def send_full_ui_update(self):
@@ -771,8 +826,7 @@ class AudioEngine(QObject):
 
             self.config_manager.set_active_config(config_name)
             self.send_full_ui_update()
-            if self.is_playing:
-                self._apply_apo_config()
+            self._schedule_apo_write()
             self.py_channel.statusUpdate.emit(f"Configuration loaded.")
         else:
             self.py_channel.statusUpdate.emit(f"Error: Configuration not found.")
@@ -789,51 +843,15 @@ class AudioEngine(QObject):
         then pick *target_count* frequencies evenly spaced in log scale and read off
         the gain at each frequency. Q values default to 1.41 (Butterworth) and filter
         type defaults to PK (peaking)."""
-        import math
-
         bands = config_data['bands']
         gains = config_data['gains']
         q_values = config_data['q_values']
         filter_types = config_data['filter_types']
 
-        # Build a simple frequency response evaluator
-        def biquad_peak_response(freq, fc, gain_db, Q):
-            """Return linear magnitude of a peaking EQ at *freq*."""
-            A = 10 ** (gain_db / 40.0)
-            w0 = 2 * math.pi * fc / 48000.0
-            w  = 2 * math.pi * freq / 48000.0
-            alpha = math.sin(w0) / (2 * Q)
-            cos_w0 = math.cos(w0)
-            b0 = (1 + alpha * A)
-            b1 = -2 * cos_w0
-            b2 = (1 - alpha * A)
-            a0 = (1 + alpha / A)
-            a1 = -2 * cos_w0
-            a2 = (1 - alpha / A)
-            cos_w = math.cos(w)
-            sin_w = math.sin(w)
-            cos_2w = math.cos(2 * w)
-            sin_2w = math.sin(2 * w)
-            nr = (b0/a0) + (b1/a0)*cos_w + (b2/a0)*cos_2w
-            ni = -(b1/a0)*sin_w - (b2/a0)*sin_2w
-            dr = 1 + (a1/a0)*cos_w + (a2/a0)*cos_2w
-            di = -(a1/a0)*sin_w - (a2/a0)*sin_2w
-            num = math.sqrt(nr*nr + ni*ni)
-            den = math.sqrt(dr*dr + di*di) or 1e-12
-            return num / den
-
-        def total_gain_db(freq):
-            lin = 1.0
-            for i in range(len(bands)):
-                lin *= biquad_peak_response(freq, bands[i], gains[i], q_values[i])
-            return 20 * math.log10(max(lin, 1e-12))
-
         # Generate new bands evenly spaced in log scale
-        log_min = math.log10(20)
-        log_max = math.log10(20000)
-        step = (log_max - log_min) / (target_count - 1) if target_count > 1 else 0
-        new_bands = [round(10 ** (log_min + i * step)) for i in range(target_count)]
-        new_gains = [round(total_gain_db(f), 1) for f in new_bands]
+        new_bands = np.round(np.logspace(np.log10(20), np.log10(20000), target_count)).astype(int).tolist()
+        filters = list(zip(filter_types, bands, gains, q_values))
+        new_gains = np.round(response_db(filters, new_bands), 1).tolist()
         new_q = [1.41] * target_count
         new_types = ['PK'] * target_count
 
@@ -929,33 +947,18 @@ class AudioEngine(QObject):
         logger = logging.getLogger(__name__)
         try:
             apo_config_dir = os.path.dirname(config.EAPO_CONFIG_PATH)
-            include_file = os.path.join(apo_config_dir, "AudioEZ.txt")
+            include_file = os.path.join(apo_config_dir, APO_INCLUDE_FILE)
 
             # Write the EQ filters to the include file
-            lines = [f"Preamp: {self.pre_gain_db:.1f} dB"]
-            for i in range(len(self.bands)):
-                lines.append(
-                    f"Filter {i+1}: ON {self.filter_types[i]} Fc {self.bands[i]} Hz "
-                    f"Gain {float(self.gains[i]):.1f} dB Q {float(self.q_values[i]):.2f}"
-                )
-            idx = len(self.bands) + 1
-            if self.bass_gain_db != 0:
-                lines.append(f"Filter {idx}: ON LS Fc 100 Hz Gain {self.bass_gain_db:.1f} dB Q 0.71")
-                idx += 1
-            if self.treble_gain_db != 0:
-                lines.append(f"Filter {idx}: ON HS Fc 8000 Hz Gain {self.treble_gain_db:.1f} dB Q 0.71")
-
-            with open(include_file, "w", encoding="utf-8") as f:
-                f.write("\n".join(lines))
+            self.apo_scheduler.write(include_file, self._render_apo_config())
 
             # Patch main config.txt to add Include directive
-            include_directive = "Include: AudioEZ.txt"
+            include_directive = f"Include: {APO_INCLUDE_FILE}"
             if os.path.exists(config.EAPO_CONFIG_PATH):
                 with open(config.EAPO_CONFIG_PATH, "r", encoding="utf-8") as f:
                     content = f.read()
                 if include_directive not in content:
-                    with open(config.EAPO_CONFIG_PATH, "a", encoding="utf-8") as f:
-                        f.write(f"\n{include_directive}\n")
+                    self.apo_scheduler.write(config.EAPO_CONFIG_PATH, content.rstrip("\n") + f"\n{include_directive}\n")
 
             msg = f"Exported to {os.path.basename(include_file)} (Include directive added)."
             logger.info(msg)
@@ -976,21 +979,66 @@ class AudioEngine(QObject):
             "AudioEZ Configuration Files (*.aezl)"
         )
         if file_path:
-            self.config_manager.export_all_configs(file_path)
-            self.py_channel.statusUpdate.emit(f"All configurations exported to {os.path.basename(file_path)}.")
+            file_name = os.path.basename(file_path)
+            self.jobs.submit(
+                "export",
+                lambda is_cancelled: self.config_manager.export_all_configs(
+                    file_path, progress=lambda done, total: self.py_channel.statusUpdate.emit(f"Exporting... {done}/{total}")),
+                on_done=lambda count: self.py_channel.statusUpdate.emit(f"{count} configurations exported to {file_name}."),
+                on_error=lambda error: self.py_channel.statusUpdate.emit(f"Error exporting configurations: {error.splitlines()[0]}")
+            )
 
     def import_config_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             None,
-            "Import a configuration",
+            "Import configurations",
             "",
-            "AudioEZ Configuration Files (*.aez);;Wavelet Config (*.json *.wavelet);;Peace Configuration File (*.peace);;Equalizer APO text file (*.txt);;All Files (*)"
+            "AudioEZ Configuration Files (*.aez);;AudioEZ Library (*.aezl);;Wavelet Config (*.json *.wavelet);;Peace Configuration File (*.peace);;Equalizer APO text file (*.txt);;All Files (*)"
         )
-        if file_path:
-            self.config_manager.import_config(file_path)
-            self.send_full_ui_update()
-            if self.is_playing:
-                self._apply_apo_config()
+        if len(file_paths) > 1 or any(path.lower().endswith('.aezl') for path in file_paths):
+            self.import_config_files(file_paths)
+        elif file_paths:
+            file_path = file_paths[0]
+            self.jobs.submit(
+                "import",
+                lambda is_cancelled: self.config_manager.parse_config_file(file_path),
+                on_done=self._apply_imported_config,
+                on_error=lambda error: self.py_channel.statusUpdate.emit(f"Error importing file: {error.splitlines()[0]}")
+            )
+
+    def import_config_folder(self):
+        folder = QFileDialog.getExistingDirectory(None, "Import a folder of configurations")
+        if folder:
+            file_paths = preset_parsers.find_config_files(folder)
+            if not file_paths:
+                self.py_channel.statusUpdate.emit("No configuration file found in this folder.")
+                return
+            self.import_config_files(file_paths)
+
+    def import_config_files(self, file_paths, names=None):
+        """Import en masse (fichiers, bibliothèques .aezl entières ou ``names`` seulement).
+
+        Parsing et enregistrement en arrière-plan, une seule mise à jour de l'UI.
+        """
+        self.py_channel.statusUpdate.emit(f"Importing {len(file_paths)} file(s)...")
+        progress = lambda count: self.py_channel.statusUpdate.emit(f"Importing... {count} presets read")
+        self.jobs.submit(
+            "import",
+            lambda is_cancelled: self.config_manager.store_bulk_import(
+                *self.config_manager.parse_config_files(file_paths, is_cancelled, names, progress)),
+            on_done=self._on_bulk_import_done,
+            on_error=lambda error: self.py_channel.statusUpdate.emit(f"Error importing files: {error.splitlines()[0]}")
+        )
+
+    def _on_bulk_import_done(self, message):
+        self.config_manager.set_active_config(self.config_manager.active_config)  # rafraîchit la liste des presets
+        self.py_channel.statusUpdate.emit(message)
+
+    def _apply_imported_config(self, parsed):
+        name, imported_data, message = parsed
+        self.config_manager.apply_imported_config(name, imported_data, message)
+        self.send_full_ui_update()
+        self._schedule_apo_write()
 
     def set_equalizer_point_parameter(self, index, key, value):
         TYPE_MAP = {0:"PK",1:"LP",2:"HP",3:"BP",4:"LS",5:"HS",6:"NO",7:"AP",8:"LSD",9:"HSD",10:"BWLP",11:"BWHP",12:"LRLP",13:"LRHP",14:"LSQ",15:"HSQ",16:"LSC",17:"HSC"}
@@ -1011,7 +1059,9 @@ class AudioEngine(QObject):
         else:
             print(f"⚠️ Paramètre EQ inconnu : {key}")
 
-        if self.is_playing:
-            self._apply_apo_config()
+        self._schedule_apo_write()
 
-        self.calculate_frequency_response()
\ No newline at end of file
+        if key in ("freq", "gain", "q", "type"):
+            self.calculate_frequency_response(patch_index=index, patch_fields=(key,))
+        else:
+            self.calculate_frequency_response()
\ No newline at end of file
@@ -0,0 +1,194 @@
+import json, os, time
+
+MEASUREMENTS_ROOT = "measurements"
+CATALOG_FORMAT = 1
+
+
+def read_autoeq_version(base_path="."):
+    """Retourne le commit AutoEq téléchargé (contenu de .autoeq_version) ou ''"""
+    try:
+        with open(os.path.join(base_path, ".autoeq_version"), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+class AutoEQCatalog:
+    """Catalogue JSON des CSV de measurements/ (modèle → fichiers), construit une fois puis rechargé"""
+
+    def __init__(self, measurements_root=MEASUREMENTS_ROOT, catalog_path=None, autoeq_version=""):
+        self.measurements_root = str(measurements_root)
+        self.catalog_path = str(catalog_path) if catalog_path else None
+        self.autoeq_version = autoeq_version
+        self.models = {}  # { model_name.lower(): {"name": str, "files": [ {...}, ... ]} }
+        self.built_at = None
+        self.tree_signature = None  # sans .autoeq_version : mtimes des dossiers, pour détecter un catalogue périmé
+
+    # ---- build / persistence -------------------------------------------- #
+
+    def build(self):
+        """Parcourt measurements/<author>/data/<category>/*.csv une seule fois"""
+        models = {}
+        if not os.path.isdir(self.measurements_root):
+            print(f"AutoEQCatalog: {self.measurements_root} introuvable.")
+            self.models = {}
+            return self
+
+        for author_entry in os.scandir(self.measurements_root):
+            if not author_entry.is_dir():
+                continue
+            for entry in self._scan_author(author_entry.name):
+                key = entry.pop("key")
+                name = entry.pop("name")
+                models.setdefault(key, {"name": name, "files": []})["files"].append(entry)
+
+        self.models = models
+        self.built_at = time.time()
+        self.tree_signature = None if self.autoeq_version else self._tree_signature()
+        return self
+
+    def _tree_signature(self):
+        """{auteur: {catégorie: mtime}} de measurements/<author>/data/<category> (stat seulement, sans lister les CSV)"""
+        signature = {}
+        if not os.path.isdir(self.measurements_root):
+            return signature
+        for author_entry in os.scandir(self.measurements_root):
+            data_path = os.path.join(author_entry.path, "data")
+            if not author_entry.is_dir() or not os.path.isdir(data_path):
+                continue
+            dirs = {".": os.stat(data_path).st_mtime_ns}
+            for category_entry in os.scandir(data_path):
+                if category_entry.is_dir():
+                    dirs[category_entry.name] = category_entry.stat().st_mtime_ns
+            signature[author_entry.name] = dirs
+        return signature
+
+    def _scan_author(self, author):
+        data_path = os.path.join(self.measurements_root, author, "data")
+        if not os.path.isdir(data_path):
+            return []
+
+        entries = []
+        for category_entry in os.scandir(data_path):
+            if not category_entry.is_dir():
+                continue
+            for file_entry in os.scandir(category_entry.path):
+                if not file_entry.name.lower().endswith(".csv") or not file_entry.is_file():
+                    continue
+                stat = file_entry.stat()
+                name = os.path.splitext(file_entry.name)[0]
+                entries.append({
+                    "key": name.lower(),
+                    "name": name,
+                    "path": os.path.join(author, "data", category_entry.name, file_entry.name),
+                    "author": author,
+                    "category": category_entry.name,
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                })
+        return entries
+
+    def save(self, path=None):
+        path = path or self.catalog_path
+        if not path:
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = {
+            "format": CATALOG_FORMAT,
+            "autoeq_version": self.autoeq_version,
+            "built_at": self.built_at,
+            "tree_signature": self.tree_signature,
+            "models": self.models,
+        }
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            print(f"AutoEQCatalog: Erreur sauvegarde catalogue : {e}")
+            return False
+
+    def load(self, path=None):
+        """Charge le catalogue depuis le disque. Retourne False s'il est absent ou périmé."""
+        path = path or self.catalog_path
+        if not path or not os.path.isfile(path):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"AutoEQCatalog: Erreur lecture catalogue : {e}")
+            return False
+
+        if payload.get("format") != CATALOG_FORMAT:
+            return False
+        if self.autoeq_version and payload.get("autoeq_version") != self.autoeq_version:
+            print("AutoEQCatalog: Catalogue périmé (nouvelle version AutoEQ).")
+            return False
+        if not self.autoeq_version:
+            signature = self._tree_signature()
+            if payload.get("tree_signature") != signature:
+                print("AutoEQCatalog: Catalogue périmé (measurements/ modifié).")
+                return False
+            self.tree_signature = signature
+
+        self.models = payload.get("models", {})
+        self.built_at = payload.get("built_at")
+        return True
+
+    def load_or_build(self):
+        if not self.load():
+            self.build()
+            self.save()
+        return self
+
+    # ---- lookups -------------------------------------------------------- #
+
+    def __len__(self):
+        return len(self.models)
+
+    def __contains__(self, model_name):
+        return self.key(model_name) in self.models
+
+    @staticmethod
+    def key(model_name):
+        return os.path.basename(str(model_name)).lower()
+
+    def get(self, model_name):
+        return self.models.get(self.key(model_name))
+
+    def csv_paths(self, model_name):
+        """Chemins des fichiers CSV de mesure pour un modèle (lookup O(1))"""
+        model = self.get(model_name)
+        if not model:
+            return []
+        return [os.path.join(self.measurements_root, entry["path"]) for entry in model["files"]]
+
+    def model_names(self, lower=False):
+        if lower:
+            return set(self.models.keys())
+        return sorted(model["name"] for model in self.models.values())
+
+
+_catalog = None
+
+
+def get_catalog(base_path=".", force_rebuild=False):
+    """Catalogue partagé par l'application (chargé une seule fois par processus)"""
+    global _catalog
+    if _catalog is None or force_rebuild:
+        import config
+        catalog = AutoEQCatalog(
+            measurements_root=MEASUREMENTS_ROOT if base_path == "." else os.path.join(base_path, MEASUREMENTS_ROOT),
+            catalog_path=os.path.join(config.APP_CONFIGS_DIR, "autoeq_profiles", "autoeq_cache", "catalog.json"),
+            autoeq_version=read_autoeq_version(base_path),
+        )
+        if force_rebuild:
+            catalog.build()
+            catalog.save()
+        else:
+            catalog.load_or_build()
+        _catalog = catalog
+    return _catalog
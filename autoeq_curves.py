@@ -0,0 +1,282 @@
+import hashlib, json, os, re, threading
+from collections import OrderedDict
+import numpy as np
+
+
+def average_measurements(model_name, csv_paths):
+    """Lit, interpole, centre puis moyenne les mesures d'un modèle (pipeline AutoEQ)"""
+    from autoeq.frequency_response import FrequencyResponse
+
+    responses = []
+    for csv_file in csv_paths:
+        fr = FrequencyResponse.read_csv(csv_file)
+        fr.interpolate()
+        fr.center()
+        if fr.raw.size > 0:
+            responses.append(fr)
+
+    if not responses:
+        raise ValueError("Aucune réponse fréquentielle valide trouvée pour la moyenne.")
+
+    min_len = min(len(fr.frequency) for fr in responses)
+    frequency = responses[0].frequency[:min_len]
+    avg_raw = np.mean([fr.raw[:min_len] for fr in responses], axis=0)
+
+    avg_fr = FrequencyResponse(name=f"{model_name} (average)", frequency=frequency, raw=avg_raw)
+    avg_fr.interpolate()
+    avg_fr.center()
+    return np.asarray(avg_fr.frequency, dtype=float), np.asarray(avg_fr.raw, dtype=float)
+
+
+def resolve_target_path(target_name, measurements_root="measurements", targets_root="targets"):
+    """Chemin CSV d'une cible : 'author/.../name' -> measurements, sinon targets/<name>.csv"""
+    if '/' in target_name or '\\' in target_name:
+        parts = target_name.replace('\\', '/').split('/')
+        if len(parts) < 2:
+            raise ValueError(f"Format de target inattendu : {target_name}")
+        return os.path.join(measurements_root, parts[0], "data", *parts[1:-1], parts[-1] + ".csv")
+    return os.path.join(targets_root, f"{target_name}.csv")
+
+
+class TargetCurveCache:
+    """LRU borné des courbes cibles traitées, clé (chemin, mtime) ; get renvoie une copie"""
+
+    def __init__(self, max_size=16):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, csv_path):
+        from autoeq.frequency_response import FrequencyResponse
+
+        key = (os.path.abspath(csv_path), os.stat(csv_path).st_mtime_ns)
+        with self._lock:
+            target_fr = self._entries.get(key)
+            if target_fr is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return target_fr.copy()
+            self.misses += 1
+
+        target_fr = FrequencyResponse.read_csv(csv_path)
+        target_fr.interpolate()
+        target_fr.center()
+
+        with self._lock:
+            self._entries[key] = target_fr
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return target_fr.copy()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class CurveCache:
+    """Courbes moyennées par modèle en .npz, valides pour les mêmes CSV (chemin, taille, mtime) et le même commit AutoEq"""
+
+    def __init__(self, cache_dir, autoeq_version=""):
+        self.cache_dir = str(cache_dir)
+        self.autoeq_version = autoeq_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def source_key(self, model_name, csv_paths):
+        digest = hashlib.sha1()
+        digest.update(self.autoeq_version.encode('utf-8'))
+        digest.update(model_name.lower().encode('utf-8'))
+        for path in sorted(csv_paths):
+            try:
+                stat = os.stat(path)
+                signature = f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+            except OSError:
+                signature = f"{path}|missing"
+            digest.update(signature.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, model_name):
+        slug = re.sub(r'[^\w\-]+', '_', model_name.lower()).strip('_')[:60]
+        name_hash = hashlib.sha1(model_name.lower().encode('utf-8')).hexdigest()[:10]
+        return os.path.join(self.cache_dir, f"{slug}-{name_hash}.npz")
+
+    def get(self, model_name, csv_paths):
+        path = self._entry_path(model_name)
+        key = self.source_key(model_name, csv_paths)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["key"]) == key:
+                    frequency, raw = data["frequency"], data["raw"]
+                    with self._lock:
+                        self.hits += 1
+                    return frequency, raw
+        except (OSError, KeyError, ValueError):
+            pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, model_name, csv_paths, frequency, raw):
+        path = self._entry_path(model_name)
+        tmp_path = path[:-len(".npz")] + ".tmp.npz"
+        try:
+            np.savez(tmp_path, key=np.array(self.source_key(model_name, csv_paths)),
+                     frequency=np.asarray(frequency, dtype=float), raw=np.asarray(raw, dtype=float))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"CurveCache: Erreur écriture cache {path} : {e}")
+
+    def load(self, model_name, csv_paths):
+        """Retourne (frequency, raw) depuis le cache, ou calcule et met en cache la courbe moyenne"""
+        cached = self.get(model_name, csv_paths)
+        if cached is not None:
+            return cached
+        frequency, raw = average_measurements(model_name, csv_paths)
+        self.put(model_name, csv_paths, frequency, raw)
+        return frequency, raw
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class CurvePack:
+    """Toutes les courbes de la base dans une matrice float32 memmappée (une ligne par modèle)"""
+
+    MATRIX_FILE = "curves.f32"
+    INDEX_FILE = "curves_index.json"
+
+    def __init__(self, pack_dir, autoeq_version=""):
+        self.pack_dir = str(pack_dir)
+        self.autoeq_version = autoeq_version
+        self.frequency = None
+        self.matrix = None
+        self.rows = {}  # { model_name.lower(): row }
+        self.names = []
+
+    def open(self):
+        index_path = os.path.join(self.pack_dir, self.INDEX_FILE)
+        matrix_path = os.path.join(self.pack_dir, self.MATRIX_FILE)
+        if not os.path.isfile(index_path) or not os.path.isfile(matrix_path):
+            return False
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if self.autoeq_version and index.get("autoeq_version") != self.autoeq_version:
+                print("CurvePack: Matrice périmée (nouvelle version AutoEQ), ignorée.")
+                return False
+            rows, columns = index["shape"]
+            if rows == 0:
+                return False
+            self.matrix = np.memmap(matrix_path, dtype='<f4', mode='r', shape=(rows, columns))
+            self.frequency = np.asarray(index["frequency"], dtype=float)
+            self.names = index["names"]
+            self.rows = {name.lower(): row for row, name in enumerate(self.names)}
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"CurvePack: Erreur ouverture matrice : {e}")
+            self.matrix = None
+            return False
+
+    def close(self):
+        self.matrix = None
+        self.rows = {}
+        self.names = []
+
+    def __contains__(self, model_name):
+        return self.matrix is not None and os.path.basename(str(model_name)).lower() in self.rows
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, model_name):
+        """Retourne (frequency, raw) sans copie, ou None si le modèle n'est pas dans la matrice"""
+        if self.matrix is None:
+            return None
+        row = self.rows.get(os.path.basename(str(model_name)).lower())
+        if row is None:
+            return None
+        return self.frequency, self.matrix[row]
+
+    @staticmethod
+    def common_frequencies():
+        from autoeq.frequency_response import FrequencyResponse
+        return np.asarray(FrequencyResponse.generate_frequencies(), dtype=float)
+
+    def build(self, catalog, curve_cache, progress=None):
+        """Moyenne chaque modèle du catalogue sur la grille AutoEQ et écrit la matrice packée"""
+        os.makedirs(self.pack_dir, exist_ok=True)
+        self.close()
+
+        frequency = self.common_frequencies()
+        log_frequency = np.log10(frequency)
+        matrix_path = os.path.join(self.pack_dir, self.MATRIX_FILE)
+        index_path = os.path.join(self.pack_dir, self.INDEX_FILE)
+
+        names = []
+        total = len(catalog)
+        with open(matrix_path + ".tmp", 'wb') as f:
+            for i, model in enumerate(catalog.models.values()):
+                name = model["name"]
+                try:
+                    model_frequency, raw = curve_cache.load(name, catalog.csv_paths(name))
+                except Exception as e:
+                    print(f"CurvePack: {name} ignoré ({e})")
+                    continue
+                if len(model_frequency) != len(frequency) or not np.allclose(model_frequency, frequency):
+                    raw = np.interp(log_frequency, np.log10(model_frequency), raw)
+                f.write(np.asarray(raw, dtype='<f4').tobytes())
+                names.append(name)
+                if progress:
+                    progress(i + 1, total)
+
+        with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({
+                "autoeq_version": self.autoeq_version,
+                "shape": [len(names), len(frequency)],
+                "frequency": frequency.tolist(),
+                "names": names,
+            }, f, ensure_ascii=False)
+
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(index_path + ".tmp", index_path)
+        return self.open()
+
+
+if __name__ == "__main__":
+    # Packing step: python autoeq_curves.py [base_path]
+    import sys, time
+    import config
+    from autoeq_catalog import get_catalog, read_autoeq_version
+
+    base_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    config.APP_CONFIGS_DIR = os.path.join(base_path, "configs")
+    cache_root = os.path.join(config.APP_CONFIGS_DIR, "autoeq_profiles", "autoeq_cache")
+    version = read_autoeq_version(base_path)
+
+    start = time.perf_counter()
+    pack = CurvePack(os.path.join(cache_root, "pack"), autoeq_version=version)
+    pack.build(get_catalog(base_path), CurveCache(os.path.join(cache_root, "curves"), autoeq_version=version),
+               progress=lambda done, total: print(f"\r{done}/{total}", end="", flush=True))
+    print(f"\nCurvePack: {len(pack)} courbes packées en {time.perf_counter() - start:.1f}s.")
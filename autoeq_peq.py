@@ -0,0 +1,266 @@
+import hashlib, json, os, sqlite3, threading
+import numpy as np
+
+PEQ_CONFIG_NAME = '8_PEAKING_WITH_SHELVES'
+
+FILTER_NAME_MAP = {
+    'LowShelf': 'LS',
+    'HighShelf': 'HS',
+    'Peaking': 'PK',
+    'LowPass': 'LP',
+    'HighPass': 'HP',
+    'BandPass': 'BP',
+    'Notch': 'NO',
+    'AllPass': 'AP'
+}
+
+
+def autoeq_parameters():
+    """Paramètres AutoEQ utilisés par le pipeline (font partie de la clé de cache)"""
+    from autoeq.constants import DEFAULT_FS, DEFAULT_MAX_GAIN, DEFAULT_MAX_SLOPE, \
+        DEFAULT_TREBLE_F_LOWER, DEFAULT_TREBLE_F_UPPER, DEFAULT_TREBLE_GAIN_K
+    return {
+        'fs': DEFAULT_FS,
+        'max_gain': DEFAULT_MAX_GAIN,
+        'max_slope': DEFAULT_MAX_SLOPE,
+        'treble_f_lower': DEFAULT_TREBLE_F_LOWER,
+        'treble_f_upper': DEFAULT_TREBLE_F_UPPER,
+        'treble_gain_k': DEFAULT_TREBLE_GAIN_K,
+    }
+
+
+def compute_peq(model_name, frequency, raw, target_fr, peq_config_name=PEQ_CONFIG_NAME):
+    """compensate → smoothen → equalize → PEQ.optimize sur la courbe moyenne d'un écouteur.
+
+    Retourne un dict sérialisable : preamp, bands, gains, q_values, filter_types.
+    """
+    from autoeq.frequency_response import FrequencyResponse
+    from autoeq.peq import PEQ
+    from autoeq.constants import PEQ_CONFIGS
+
+    params = autoeq_parameters()
+    avg_fr = FrequencyResponse(name=f"{model_name} (average)",
+                               frequency=np.array(frequency, dtype=float), raw=np.array(raw, dtype=float))
+
+    avg_fr.compensate(target_fr, min_mean_error=True)
+    avg_fr.smoothen()
+    avg_fr.equalize(
+        max_gain=params['max_gain'],
+        max_slope=params['max_slope'],
+        treble_f_lower=params['treble_f_lower'],
+        treble_f_upper=params['treble_f_upper'],
+        treble_gain_k=params['treble_gain_k']
+    )
+
+    peq = PEQ.from_dict(
+        config=PEQ_CONFIGS[peq_config_name],
+        f=avg_fr.frequency,
+        fs=params['fs'],
+        target=avg_fr.equalization
+    )
+    peq.optimize()
+
+    filters = peq.filters or []
+    return {
+        'preamp': float(-peq.max_gain) if peq.max_gain > 0 else 0.0,
+        'bands': [float(filt.fc) for filt in filters],
+        'gains': [float(filt.gain) for filt in filters],
+        'q_values': [float(filt.q) for filt in filters],
+        'filter_types': [FILTER_NAME_MAP.get(type(filt).__name__, type(filt).__name__) for filt in filters],
+    }
+
+
+class PEQResultCache:
+    """Résultats PEQ d'AutoEQ en JSON sur disque, éviction LRU au-delà de max_bytes, repli sur le store précalculé"""
+
+    def __init__(self, cache_dir, max_bytes=8 * 1024 * 1024, store=None):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.store = store
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                                if entry.name.endswith(".json"))
+
+    @staticmethod
+    def make_key(model_name, target, band_size, peq_config_name, parameters, dataset_version):
+        payload = json.dumps({
+            'model': os.path.basename(model_name).lower(),
+            'target': target,
+            'band_size': int(band_size),
+            'peq_config': peq_config_name,
+            'parameters': parameters,
+            'dataset': dataset_version,
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f).get('result')
+            os.utime(path)  # LRU: l'accès rafraîchit la date
+        except (OSError, ValueError):
+            result = None
+        if result is None and self.store is not None:
+            result = self.store.get(key)
+            if result is not None:
+                with self._lock:
+                    self.store_hits += 1
+                return result
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key, result, meta=None):
+        path = self._entry_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'meta': meta or {}, 'result': result}, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._total_bytes += os.path.getsize(path) - previous_size
+        except OSError as e:
+            print(f"PEQResultCache: Erreur écriture {path} : {e}")
+            return
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 80% de max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        limit = int(self.max_bytes * 0.8)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = total
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.store_hits + self.misses
+            return {
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.store_hits) / total, 3) if total else 0.0,
+            }
+
+
+class PEQResultStore:
+    """Résultats PEQ précalculés par autoeq_precompute.py (SQLite), même clé que PEQResultCache"""
+
+    def __init__(self, path, readonly=True):
+        self.path = str(path)
+        self.readonly = readonly
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            if self.readonly:
+                if not os.path.isfile(self.path):
+                    return None
+                uri = "file:" + self.path.replace("\\", "/") + "?mode=ro"
+                self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.executescript("""
+                    PRAGMA journal_mode=WAL;
+                    CREATE TABLE IF NOT EXISTS results (
+                        key TEXT PRIMARY KEY, model TEXT, target TEXT, band_size INTEGER,
+                        result TEXT, error TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+                """)
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            try:
+                conn = self._connect()
+                if conn is None:
+                    return None
+                row = conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"PEQResultStore: Erreur lecture {self.path} : {e}")
+                return None
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def keys(self):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return set()
+            return {row[0] for row in conn.execute("SELECT key FROM results")}
+
+    def put_many(self, rows):
+        """rows : itérable de (key, model, target, band_size, result | None, error | None)"""
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, model, target, band_size,
+                  json.dumps(result, separators=(',', ':')) if result is not None else None, error)
+                 for key, model, target, band_size, result, error in rows]
+            )
+            conn.commit()
+
+    def set_meta(self, name, value):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, json.dumps(value)))
+            conn.commit()
+
+    def get_meta(self, name, default=None):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return default
+            row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __len__(self):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            return conn.execute("SELECT COUNT(*) FROM results WHERE result IS NOT NULL").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
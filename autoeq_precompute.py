@@ -0,0 +1,127 @@
+"""Precompute AutoEQ PEQ profiles for every model x target x band size.
+
+    python autoeq_precompute.py [--base-path .] [--targets "AutoEq in-ear" ...]
+                                [--band-sizes 10] [--processes N] [--limit N]
+
+Runs the same pipeline as AudioEngine.apply_autoeq_profile (averaged curve,
+target, compute_peq) in a multiprocessing pool and writes the results to
+configs/autoeq_profiles/autoeq_cache/peq_results.sqlite, which the app's
+PEQResultCache reads on demand. Already computed keys are skipped, so an
+interrupted run picks up where it stopped.
+"""
+import argparse, multiprocessing, os, time
+
+import config
+from autoeq_catalog import get_catalog, read_autoeq_version
+from autoeq_curves import CurveCache, TargetCurveCache, resolve_target_path
+from autoeq_peq import PEQ_CONFIG_NAME, PEQResultCache, PEQResultStore, autoeq_parameters, compute_peq
+
+STORE_FILE = "peq_results.sqlite"
+
+_worker = {}
+
+
+def _init_worker(base_path, cache_root, version):
+    config.APP_CONFIGS_DIR = os.path.join(base_path, "configs")
+    _worker["base_path"] = base_path
+    _worker["catalog"] = get_catalog(base_path)
+    _worker["curve_cache"] = CurveCache(os.path.join(cache_root, "curves"), autoeq_version=version)
+    _worker["target_cache"] = TargetCurveCache(max_size=64)
+
+
+def _compute_model(task):
+    """Un modèle, toutes ses (cible, bandes) restantes : la courbe moyenne n'est chargée qu'une fois"""
+    model_name, pending = task
+    base_path = _worker["base_path"]
+    rows = []
+    try:
+        frequency, raw = _worker["curve_cache"].load(model_name, _worker["catalog"].csv_paths(model_name))
+    except Exception as e:
+        return [(key, model_name, target, band_size, None, f"curve: {e}") for key, target, band_size in pending]
+
+    for key, target, band_size in pending:
+        try:
+            target_csv_path = resolve_target_path(target, os.path.join(base_path, "measurements"),
+                                                  os.path.join(base_path, "targets"))
+            target_fr = _worker["target_cache"].get(target_csv_path)
+            result = compute_peq(model_name, frequency, raw, target_fr, PEQ_CONFIG_NAME)
+            if len(result['bands']) != band_size:
+                rows.append((key, model_name, target, band_size, None, f"{len(result['bands'])} filters"))
+            else:
+                rows.append((key, model_name, target, band_size, result, None))
+        except Exception as e:
+            rows.append((key, model_name, target, band_size, None, str(e)))
+    return rows
+
+
+def default_targets(base_path="."):
+    targets_root = os.path.join(base_path, "targets")
+    if not os.path.isdir(targets_root):
+        return []
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(targets_root) if name.lower().endswith(".csv"))
+
+
+def precompute(base_path=".", targets=None, band_sizes=(10,), processes=None, limit=None):
+    config.APP_CONFIGS_DIR = os.path.join(base_path, "configs")
+    cache_root = os.path.join(config.APP_CONFIGS_DIR, "autoeq_profiles", "autoeq_cache")
+    version = read_autoeq_version(base_path)
+    parameters = autoeq_parameters()
+    targets = targets or default_targets(base_path)
+    processes = processes or os.cpu_count() or 1
+
+    store = PEQResultStore(os.path.join(cache_root, STORE_FILE), readonly=False)
+    done = store.keys()
+
+    models = get_catalog(base_path).model_names()
+    if limit:
+        models = models[:limit]
+
+    tasks = []
+    for model_name in models:
+        pending = []
+        for target in targets:
+            for band_size in band_sizes:
+                key = PEQResultCache.make_key(model_name, target, band_size, PEQ_CONFIG_NAME, parameters, version)
+                if key not in done:
+                    pending.append((key, target, band_size))
+        if pending:
+            tasks.append((model_name, pending))
+
+    total = sum(len(pending) for _, pending in tasks)
+    print(f"Precompute: {len(models)} modèles x {len(targets)} cibles x {len(band_sizes)} tailles, "
+          f"{len(done)} déjà calculés, {total} restants sur {processes} processus.")
+    if not total:
+        return 0.0
+
+    start = time.perf_counter()
+    computed = 0
+    failed = 0
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(base_path, cache_root, version)) as pool:
+        for rows in pool.imap_unordered(_compute_model, tasks):
+            store.put_many(rows)  # commit par modèle : une interruption ne perd que les modèles en cours
+            computed += len(rows)
+            failed += sum(1 for row in rows if row[4] is None)
+            elapsed = time.perf_counter() - start
+            print(f"\r{computed}/{total} profils ({computed / elapsed:.1f}/s)", end="", flush=True)
+
+    elapsed = time.perf_counter() - start
+    per_core = computed / elapsed / processes
+    print(f"\nPrecompute: {computed - failed} profils, {failed} échecs en {elapsed:.1f}s "
+          f"({per_core:.2f} profils/s/cœur).")
+    store.set_meta("autoeq_version", version)
+    store.set_meta("last_run", {"profiles": computed, "failed": failed, "seconds": round(elapsed, 2),
+                                "processes": processes, "profiles_per_sec_per_core": round(per_core, 3)})
+    store.close()
+    return per_core
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute AutoEQ PEQ profiles")
+    parser.add_argument("--base-path", default=".")
+    parser.add_argument("--targets", nargs="*", help="noms de cibles (défaut : tous les CSV de targets/)")
+    parser.add_argument("--band-sizes", nargs="*", type=int, default=[10])
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None, help="nombre max de modèles (tests)")
+    args = parser.parse_args()
+
+    precompute(args.base_path, args.targets, tuple(args.band_sizes), args.processes, args.limit)
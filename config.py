@@ -4,6 +4,7 @@ client_id = '1402724529851072583'
 EAPO_INSTALL_PATH = r"C:\Program Files\EqualizerAPO"
 EAPO_CONFIG_PATH = None
 APP_CONFIGS_DIR = "./configs"
+APO_MAX_WRITES_PER_SEC = 12  # config.txt rewrites (each one reloads the APO filter chain)
 settings_file = None
 
 def initialize_paths():
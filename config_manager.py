@@ -1,19 +1,19 @@
-import json, re, os, sys
+import json, os, sys
 import numpy as np
 from PyQt6.QtCore import QObject
 
 import config
+import preset_parsers
+from jobs import JobCancelled
+from preset_store import PresetStore
 
 class ConfigManager(QObject):
     def __init__(self, audio_engine):
         super().__init__()
 
         self.audio_engine = audio_engine
-        self.configs = {}
+        self.configs = PresetStore(config.APP_CONFIGS_DIR)  # { preset_name: data }, un fichier par preset
         self.active_config = "Default"
-        self.config_file = os.path.join(config.APP_CONFIGS_DIR, "presets.json")
-        self.tags_file = os.path.join(config.APP_CONFIGS_DIR, "presets_tags.json")
-        self.tags = {}  # { preset_name: tag_string }
 
     def get_config_names(self):
         return ["Default"] + [name for name in sorted(self.configs.keys()) 
@@ -26,46 +26,20 @@ class ConfigManager(QObject):
                 self.audio_engine.py_channel.configListUpdate.emit(self.get_config_names(), self.active_config)
 
     def load_configs(self):
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    self.configs = json.load(f)
-            except json.JSONDecodeError:
-                print("Error: The presets.json file is corrupted or empty. It will be reinitialized.", file=sys.stderr)
-                self.configs = {}
-            except Exception as e:
-                print(f"Error loading configurations: {e}", file=sys.stderr)
+        try:
+            self.configs.load()
+        except Exception as e:
+            print(f"Error loading configurations: {e}", file=sys.stderr)
         self.set_active_config("Default")
-        self.load_tags()
-
-    def save_configs(self):
-        with open(self.config_file, 'w') as f:
-            json.dump(self.configs, f, indent=4)
-
-    def load_tags(self):
-        if os.path.exists(self.tags_file):
-            try:
-                with open(self.tags_file, 'r', encoding='utf-8') as f:
-                    self.tags = json.load(f)
-            except Exception:
-                self.tags = {}
-
-    def save_tags(self):
-        with open(self.tags_file, 'w', encoding='utf-8') as f:
-            json.dump(self.tags, f, indent=2, ensure_ascii=False)
 
     def set_tag(self, preset_name, tag):
-        if tag:
-            self.tags[preset_name] = tag
-        elif preset_name in self.tags:
-            del self.tags[preset_name]
-        self.save_tags()
+        self.configs.set_tag(preset_name, tag)
 
     def get_tag(self, preset_name):
-        return self.tags.get(preset_name, "")
+        return self.configs.tags.get(preset_name, "")
 
     def get_all_tags(self):
-        return dict(self.tags)
+        return dict(self.configs.tags)
 
     def load_config_by_name(self, name):
         return self.configs.get(name)
@@ -73,11 +47,7 @@ class ConfigManager(QObject):
     def delete_config(self, name):
         if name in self.configs:
             del self.configs[name]
-            self.save_configs()
-            if name in self.tags:
-                del self.tags[name]
-                self.save_tags()
-            print(f"Configuration '{name}' supprimée de presets.json.")
+            print(f"Configuration '{name}' supprimée.")
         else:
             print(f"La configuration '{name}' n'existe pas.")
 
@@ -89,18 +59,13 @@ class ConfigManager(QObject):
             return False, f"Configuration '{old_name}' not found."
         if new_name in self.configs:
             return False, f"A configuration named '{new_name}' already exists."
-        self.configs[new_name] = self.configs.pop(old_name)
-        self.save_configs()
-        if old_name in self.tags:
-            self.tags[new_name] = self.tags.pop(old_name)
-            self.save_tags()
+        self.configs.rename(old_name, new_name)
         if self.active_config == old_name:
             self.active_config = new_name
         return True, new_name
 
     def save_config(self, name, data):
         self.configs[name] = data
-        self.save_configs()
         self.set_active_config(name)
     
     def export_single_config(self, file_path, data):
@@ -203,182 +168,87 @@ class ConfigManager(QObject):
         else:
             raise ValueError(f"Unsupported export file format: {ext}")
 
-    def export_all_configs(self, file_path):
-        with open(file_path, 'w') as f:
-            json.dump(self.configs, f, indent=4)
-
-    def import_config(self, file_path):
-        try:
-            filename = os.path.basename(file_path)
-            name, ext = os.path.splitext(filename)
-            imported_data = None
-
-            if ext.lower() in ['.aez', '.aezl']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    imported_data = json.load(f)
-
-                if isinstance(imported_data, dict):
-                    self.configs[name] = imported_data
-                    self.audio_engine.py_channel.statusUpdate.emit(f"Configuration '{name}' imported successfully.")
+    def export_all_configs(self, file_path, progress=None):
+        """Exporte la bibliothèque en .aezl v2 (NDJSON), preset par preset ; retourne le nombre exporté"""
+        names = [name for name in self.configs if not name.startswith("temp_")]
 
-                    # Màj des filtres et gains
-                    self.audio_engine.pre_gain_db = imported_data.get('pre_gain_db', 0.0)
-                    self.audio_engine.bass_gain_db = imported_data.get('bass_gain_db', 0.0)
-                    self.audio_engine.treble_gain_db = imported_data.get('treble_gain_db', 0.0)
-                    self.audio_engine.bands = imported_data.get('bands', self.audio_engine.bands)
-                    self.audio_engine.gains = np.array(imported_data.get('gains', np.zeros(len(self.audio_engine.bands)).tolist()))
-                    self.audio_engine.q_values = np.array(imported_data.get('q_values', np.full(len(self.audio_engine.bands), 1.41).tolist()))
-                    self.audio_engine.filter_types = imported_data.get('filter_types', ['PK'] * len(self.audio_engine.bands))
-                    self.set_active_config(name)
-
-            elif ext.lower() == '.peace':
+        def presets():
+            for name in names:
                 try:
-                    with open(file_path, 'r', encoding='utf-8-sig') as f:
-                        content = f.read()
-                except UnicodeDecodeError:
-                    with open(file_path, 'r', encoding='latin1') as f:
-                        content = f.read()
-
-                preamp_match = re.search(r"PreAmp=(-?\d+\.?\d*)", content)
-                preamp = float(preamp_match.group(1)) if preamp_match else 0.0
-
-                bass_gain_match = re.search(r"Bass Gain=(-?\d+\.?\d*)", content)
-                bass_gain = float(bass_gain_match.group(1)) if bass_gain_match else 0.0
-
-                treble_gain_match = re.search(r"Treble Gain=(-?\d+\.?\d*)", content)
-                treble_gain = float(treble_gain_match.group(1)) if treble_gain_match else 0.0
-
-                frequencies = re.findall(r"Frequency\d+=(\d+\.?\d*)", content)
-                gains = re.findall(r"Gain\d+=(-?\d+\.?\d*)", content)
-                q_values = re.findall(r"Quality\d+=(\d+\.?\d*)", content)
-
-                length = min(len(frequencies), len(gains), len(q_values))
-                if length == 0:
-                    raise ValueError("No valid Peace filter configuration found.")
-
-                new_bands = [float(f) for f in frequencies[:length]]
-                new_gains = [float(g) for g in gains[:length]]
-                new_q_values = [float(q) for q in q_values[:length]]
-
-                imported_data = {
-                    'pre_gain_db': preamp,
-                    'bass_gain_db': bass_gain,
-                    'treble_gain_db': treble_gain,
-                    'bands': new_bands,
-                    'gains': new_gains,
-                    'q_values': new_q_values,
-                    'filter_types': ['PK'] * len(new_bands)
-                }
-
-                self.configs[name] = imported_data
-                self.audio_engine.py_channel.statusUpdate.emit(f"Peace configuration '{name}' imported successfully.")
-
-            elif ext.lower() == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                    yield name, self.configs.tags.get(name, ""), self.configs.read(name)
+                except KeyError:
+                    continue
 
-                # Extraire Preamp
-                preamp_match = re.search(r"Preamp:\s*([-+]?\d+\.?\d*)\s*dB", content, re.IGNORECASE)
-                preamp = float(preamp_match.group(1)) if preamp_match else 0.0
+        return preset_parsers.write_aezl(file_path, presets(), total=len(names), progress=progress)
 
-                # Regular expression in main.py
-                filter_pattern = re.compile(
-                    r"Filter\s*\d+\s*:\s*ON\s+(\w+)\s+Fc\s+([\d\.]+)\s*Hz\s+Gain\s+([-+]?\d+\.?\d*)\s*dB\s+Q\s+([\d\.]+)",
-                    re.IGNORECASE
-                )
+    def parse_config_file(self, file_path):
+        """Lit un fichier de configuration (.aez, .peace, .txt, .json/.wavelet).
 
-                bands = []
-                gains = []
-                q_values = []
-                filter_types = []
-
-
-                for match in filter_pattern.finditer(content):
-                    f_type = match.group(1).upper()
-                    freq = float(match.group(2))
-                    gain = float(match.group(3))
-                    q = float(match.group(4))
-                    print(f"Type: {f_type}, Freq: {freq}, Gain: {gain}, Q: {q}")
-                    bands.append(freq)
-                    gains.append(gain)
-                    q_values.append(q)
-                    filter_types.append(f_type)
-
-                if not bands:
-                    raise ValueError("Aucun filtre valide trouvé dans le fichier .txt")
-
-                imported_data = {
-                    'pre_gain_db': preamp,
-                    'bands': bands,
-                    'gains': gains,
-                    'q_values': q_values,
-                    'filter_types': filter_types
-                }
-
-                self.configs[name] = imported_data
-                self.audio_engine.py_channel.statusUpdate.emit(f"Configuration '{name}' importée avec succès.")
-
-            elif ext.lower() in ['.json', '.wavelet']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    wavelet_data = json.load(f)
-
-                preamp = float(wavelet_data.get('preamp', 0.0))
-                filters = wavelet_data.get('filters', [])
-
-                if not filters:
-                    raise ValueError("No valid filters found in Wavelet JSON file.")
-
-                type_map = {
-                    'peaking': 'PK', 'lowshelf': 'LS', 'highshelf': 'HS',
-                    'lowpass': 'LP', 'highpass': 'HP', 'bandpass': 'BP',
-                    'notch': 'NO', 'allpass': 'AP',
-                    'pk': 'PK', 'ls': 'LS', 'hs': 'HS', 'lp': 'LP',
-                    'hp': 'HP', 'bp': 'BP', 'no': 'NO', 'ap': 'AP',
-                    'lsq': 'LSQ', 'hsq': 'HSQ'
-                }
-
-                new_bands = []
-                new_gains = []
-                new_q_values = []
-                new_filter_types = []
-
-                for filt in filters:
-                    freq = float(filt.get('frequency', filt.get('fc', 1000)))
-                    gain = float(filt.get('gain', 0.0))
-                    q = float(filt.get('q', filt.get('Q', 1.41)))
-                    ftype = str(filt.get('type', 'peaking')).lower()
-                    ftype = type_map.get(ftype, 'PK')
-
-                    new_bands.append(freq)
-                    new_gains.append(gain)
-                    new_q_values.append(q)
-                    new_filter_types.append(ftype)
-
-                imported_data = {
-                    'pre_gain_db': preamp,
-                    'bands': new_bands,
-                    'gains': new_gains,
-                    'q_values': new_q_values,
-                    'filter_types': new_filter_types
-                }
+        Ne modifie aucun état : peut tourner dans un job en arrière-plan.
+        Retourne (name, imported_data, message) ou lève une exception.
+        """
+        return preset_parsers.parse_config_file(file_path)
 
-                self.configs[name] = imported_data
-                self.audio_engine.py_channel.statusUpdate.emit(f"Wavelet configuration '{name}' imported successfully.")
+    def parse_config_files(self, file_paths, is_cancelled=lambda: False, names=None, progress=None):
+        """Import en masse, étape de parsing (job en arrière-plan).
 
+        ``names`` limite l'import des bibliothèques .aezl à ces presets ;
+        ``progress(count)`` est appelé tous les 100 presets lus.
+        Retourne (parsed, errors) : parsed = [(name, data, tag)] dans l'ordre
+        des fichiers, errors = [(file_path, message)].
+        """
+        parsed, errors = [], []
+        for i, (path, name, data, tag, error) in enumerate(preset_parsers.parse_config_files(file_paths, names), 1):
+            if i % 64 == 0 and is_cancelled():
+                raise JobCancelled()
+            if progress and i % 100 == 0:
+                progress(i)
+            if error is None:
+                parsed.append((name, data, tag))
             else:
-                raise ValueError("Unsupported file format.")
+                errors.append((path, error))
+        return parsed, errors
 
-            self.save_configs()
-            if imported_data:
-                self.audio_engine.pre_gain_db = imported_data.get('pre_gain_db', 0.0)
-                self.audio_engine.bass_gain_db = imported_data.get('bass_gain_db', 0.0)
-                self.audio_engine.treble_gain_db = imported_data.get('treble_gain_db', 0.0)
-                self.audio_engine.gains = np.array(imported_data.get('gains', np.zeros(len(self.audio_engine.bands)).tolist()))
-                self.audio_engine.bands = imported_data.get('bands', self.audio_engine.bands)
-                self.audio_engine.q_values = np.array(imported_data.get('q_values', np.full(len(self.audio_engine.bands), 1.41).tolist()))
-                self.audio_engine.filter_types = imported_data.get('filter_types', ['PK'] * len(self.audio_engine.bands))
-                self.set_active_config(name)
+    def store_bulk_import(self, parsed, errors):
+        """Enregistre en une seule fois les presets parsés par parse_config_files ; retourne le message de statut.
 
+        Ne touche pas à l'UI : peut tourner dans le même job que le parsing.
+        """
+        imported, tags = {}, {}
+        for name, data, tag in parsed:
+            unique, n = name, 2
+            while unique in imported or unique in self.configs or unique.lower() == "default":
+                unique, n = f"{name} ({n})", n + 1
+            imported[unique] = data
+            if tag:
+                tags[unique] = tag
+        if imported:
+            self.configs.put_many(imported, tags)
+        for path, error in errors:
+            print(f"Import error ({os.path.basename(path)}): {error}", file=sys.stderr)
+        message = f"{len(imported)} configuration(s) imported."
+        if errors:
+            message += f" {len(errors)} file(s) skipped: " + ", ".join(os.path.basename(p) for p, _ in errors[:3])
+            if len(errors) > 3:
+                message += ", ..."
+        return message
+
+    def apply_imported_config(self, name, imported_data, message):
+        """Enregistre et active une configuration lue par parse_config_file (thread principal)"""
+        self.configs[name] = imported_data
+        self.audio_engine.py_channel.statusUpdate.emit(message)
+        self.audio_engine.pre_gain_db = imported_data.get('pre_gain_db', 0.0)
+        self.audio_engine.bass_gain_db = imported_data.get('bass_gain_db', 0.0)
+        self.audio_engine.treble_gain_db = imported_data.get('treble_gain_db', 0.0)
+        self.audio_engine.gains = np.array(imported_data.get('gains', np.zeros(len(self.audio_engine.bands)).tolist()))
+        self.audio_engine.bands = imported_data.get('bands', self.audio_engine.bands)
+        self.audio_engine.q_values = np.array(imported_data.get('q_values', np.full(len(self.audio_engine.bands), 1.41).tolist()))
+        self.audio_engine.filter_types = imported_data.get('filter_types', ['PK'] * len(self.audio_engine.bands))
+        self.set_active_config(name)
+
+    def import_config(self, file_path):
+        try:
+            self.apply_imported_config(*self.parse_config_file(file_path))
         except Exception as e:
             self.audio_engine.py_channel.statusUpdate.emit(f"Error importing file: {e}")
             print(f"Import error: {e}", file=sys.stderr)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import threading, zlib
+from collections import OrderedDict
+import numpy as np
+
+GRAPH_MIN_FREQ = 20.0
+GRAPH_MAX_FREQ = 20000.0
+
+
+def decimate_log(frequency, values, width, f_min=GRAPH_MIN_FREQ, f_max=GRAPH_MAX_FREQ):
+    """Rééchantillonne une courbe sur ``width`` colonnes log entre f_min et f_max.
+
+    Retourne (centers, mean, low, high) : la moyenne par colonne plus une
+    enveloppe min/max pour que les pics étroits restent visibles. Une colonne
+    sans point source reçoit la valeur interpolée.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(frequency, kind='stable')
+    frequency, values = frequency[order], values[order]
+
+    edges = np.geomspace(f_min, f_max, width + 1)
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    interpolated = np.interp(np.log10(centers), np.log10(frequency), values)
+
+    # Points hors de l'axe du graphe ignorés : les segments de reduceat sont alors exacts
+    inside = slice(np.searchsorted(frequency, f_min, side='left'), np.searchsorted(frequency, f_max, side='right'))
+    frequency, values = frequency[inside], values[inside]
+
+    starts = np.searchsorted(frequency, edges[:-1], side='left')
+    counts = np.diff(np.append(starts, len(frequency)))
+    filled = counts > 0
+
+    mean = interpolated.copy()
+    low = interpolated.copy()
+    high = interpolated.copy()
+    if filled.any():
+        first = starts[filled]
+        mean[filled] = np.add.reduceat(values, first) / counts[filled]
+        low[filled] = np.minimum.reduceat(values, first)
+        high[filled] = np.maximum.reduceat(values, first)
+    return centers, mean, low, high
+
+
+class DecimationCache:
+    """LRU of decimated curves keyed by (curve id, width)"""
+
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def curve_id(frequency, values):
+        frequency = np.ascontiguousarray(frequency, dtype='<f4')
+        values = np.ascontiguousarray(values, dtype='<f4')
+        return zlib.crc32(values.tobytes(), zlib.crc32(frequency.tobytes()))
+
+    def get(self, frequency, values, width):
+        key = (self.curve_id(frequency, values), int(width))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = decimate_log(frequency, values, width)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,81 @@
+import base64, struct, threading, zlib
+import numpy as np
+
+# Frame: magic, version, flags, series count, grid id, point count (16 bytes, little-endian)
+#        [grid float32 * n if FLAG_GRID] + series_count * (float32 * n)
+CURVE_MAGIC = b'AEZC'
+CURVE_VERSION = 1
+FLAG_GRID = 0x01
+_HEADER = struct.Struct('<4sBBHII')
+
+
+def grid_id(frequency):
+    """Identifiant stable d'un axe de fréquences (crc32 des float32, 31 bits pour rester un int Qt)"""
+    return zlib.crc32(np.ascontiguousarray(frequency, dtype='<f4').tobytes()) & 0x7fffffff
+
+
+class CurveEncoder:
+    """Courbes en trames float32 base64 pour QWebChannel ; l'axe des fréquences n'est envoyé qu'une fois par grid_id"""
+
+    def __init__(self, max_grids=32):
+        self.max_grids = max_grids
+        self._grids = {}   # { grid_id: float32 bytes }
+        self._sent = set()
+        self._lock = threading.Lock()
+
+    def encode(self, frequency, *series):
+        frequency = np.ascontiguousarray(frequency, dtype='<f4')
+        gid = grid_id(frequency)
+        n = len(frequency)
+
+        with self._lock:
+            send_grid = gid not in self._sent
+            if send_grid:
+                self._sent.add(gid)
+                if len(self._grids) >= self.max_grids:
+                    self._grids.pop(next(iter(self._grids)))
+                self._grids[gid] = frequency.tobytes()
+
+        parts = [_HEADER.pack(CURVE_MAGIC, CURVE_VERSION, FLAG_GRID if send_grid else 0, len(series), gid, n)]
+        if send_grid:
+            parts.append(frequency.tobytes())
+        for values in series:
+            values = np.ascontiguousarray(values, dtype='<f4')
+            if len(values) != n:
+                raise ValueError(f"Série de {len(values)} points pour une grille de {n} points")
+            parts.append(values.tobytes())
+        return base64.b64encode(b''.join(parts)).decode('ascii')
+
+    def grid_frame(self, gid):
+        """Trame contenant uniquement la grille ``gid`` (pour un client qui l'a perdue)"""
+        with self._lock:
+            data = self._grids.get(gid)
+        if data is None:
+            return ""
+        n = len(data) // 4
+        return base64.b64encode(_HEADER.pack(CURVE_MAGIC, CURVE_VERSION, FLAG_GRID, 0, gid, n) + data).decode('ascii')
+
+    def reset(self):
+        with self._lock:
+            self._sent.clear()
+
+
+def decode_curve(frame, grids=None):
+    """Décodage côté Python (tests / outils) : retourne (frequency, [series...])"""
+    data = base64.b64decode(frame)
+    magic, version, flags, series_count, gid, n = _HEADER.unpack_from(data)
+    if magic != CURVE_MAGIC or version != CURVE_VERSION:
+        raise ValueError("Trame de courbe invalide")
+    offset = _HEADER.size
+    if flags & FLAG_GRID:
+        frequency = np.frombuffer(data, dtype='<f4', count=n, offset=offset)
+        offset += 4 * n
+        if grids is not None:
+            grids[gid] = frequency
+    else:
+        frequency = (grids or {}).get(gid)
+    series = []
+    for _ in range(series_count):
+        series.append(np.frombuffer(data, dtype='<f4', count=n, offset=offset))
+        offset += 4 * n
+    return frequency, series
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Au-dessus de 10 kHz les mesures (couplage, résonances du coupleur) sont peu fiables : poids réduit
+TREBLE_WEIGHT_FROM = 10000.0
+TREBLE_WEIGHT = 0.5
+
+
+class FitEvaluator:
+    """Écart "écouteur + EQ" vs cible sur la grille du ResponseEngine.
+
+    Les deux courbes mesurées ne sont interpolées sur la grille que quand
+    elles changent ; une édition d'EQ ne coûte ensuite qu'une soustraction
+    et deux réductions sur ~500 points. L'écart est centré (moyenne pondérée
+    retirée) : le niveau absolu de la mesure et le préampli n'entrent pas
+    dans le score.
+    """
+
+    def __init__(self, frequency):
+        self.frequency = np.asarray(frequency, dtype=float)
+        self._log_frequency = np.log10(self.frequency)
+        self._base_weights = np.where(self.frequency >= TREBLE_WEIGHT_FROM, TREBLE_WEIGHT, 1.0)
+        self._sources = (None, None)
+        self._difference = None  # écouteur - cible, sur la grille
+        self._weights = None
+        self.evaluations = 0
+
+    def _on_grid(self, frequency, values):
+        frequency = np.asarray(frequency, dtype=float)
+        values = np.asarray(values, dtype=float)
+        order = np.argsort(frequency)
+        frequency, values = frequency[order], values[order]
+        inside = (self.frequency >= frequency[0]) & (self.frequency <= frequency[-1])
+        return np.interp(self._log_frequency, np.log10(np.maximum(frequency, 1e-3)), values), inside
+
+    def set_curves(self, earphone, target):
+        """earphone / target : [freqs, amps]. Retourne False si l'une des courbes manque."""
+        if earphone[0] is self._sources[0] and target[0] is self._sources[1]:
+            return self._difference is not None
+        self._sources = (earphone[0], target[0])
+        if len(earphone[0]) < 2 or len(target[0]) < 2:
+            self._difference = None
+            return False
+
+        earphone_db, earphone_inside = self._on_grid(*earphone)
+        target_db, target_inside = self._on_grid(*target)
+        self._weights = self._base_weights * (earphone_inside & target_inside)
+        if not self._weights.any():
+            self._difference = None
+            return False
+        self._difference = earphone_db - target_db
+        return True
+
+    def evaluate(self, eq_db):
+        """Retourne {residual, rms, max_dev, offset} ou None sans courbes"""
+        if self._difference is None:
+            return None
+        residual = self._difference + eq_db
+        weights = self._weights
+        total = weights.sum()
+        offset = float(np.dot(weights, residual) / total)
+        residual = residual - offset
+        rms = float(np.sqrt(np.dot(weights, residual * residual) / total))
+        max_dev = float(np.abs(residual[weights > 0]).max())
+        self.evaluations += 1
+        return {"residual": residual, "rms": rms, "max_dev": max_dev, "offset": offset}
@@ -0,0 +1,161 @@
+import threading
+from functools import lru_cache
+import numpy as np
+
+SAMPLE_RATE = 48000
+GRID_POINTS = 512
+GRID_MIN_FREQ = 20.0
+GRID_MAX_FREQ = 20000.0
+
+# Types proposés par l'UI (filterTypeCodes dans scripts.js)
+FILTER_TYPES = ('PK', 'LP', 'HP', 'BP', 'LS', 'HS', 'NO', 'AP', 'LSD', 'HSD',
+                'BWLP', 'BWHP', 'LRLP', 'LRHP', 'LSQ', 'HSQ', 'LSC', 'HSC')
+
+_LOW_SHELVES = ('LS', 'LSQ', 'LSD', 'LSC')
+_HIGH_SHELVES = ('HS', 'HSQ', 'HSD', 'HSC')
+_BUTTERWORTH_Q = np.sqrt(0.5)
+
+
+class FrequencyGrid:
+    """Axe de fréquences log + tables cos/sin de w et 2w (partagées par tous les filtres)"""
+
+    def __init__(self, frequency, fs=SAMPLE_RATE):
+        self.frequency = np.asarray(frequency, dtype=float)
+        self.fs = fs
+        w = 2 * np.pi * self.frequency / fs
+        self.cos_w, self.sin_w = np.cos(w), np.sin(w)
+        self.cos_2w, self.sin_2w = np.cos(2 * w), np.sin(2 * w)
+
+    def __len__(self):
+        return len(self.frequency)
+
+
+@lru_cache(maxsize=8)
+def log_grid(points=GRID_POINTS, f_min=GRID_MIN_FREQ, f_max=GRID_MAX_FREQ, fs=SAMPLE_RATE):
+    return FrequencyGrid(np.logspace(np.log10(f_min), np.log10(f_max), points), fs)
+
+
+def biquad_coefficients(filter_types, freqs, gains, q_values, fs=SAMPLE_RATE):
+    """Coefficients RBJ normalisés (a0 = 1) pour n filtres à la fois.
+
+    Retourne (b, a, stages) : b et a de forme (n, 3), stages = nombre de fois
+    que le biquad est appliqué (2 pour les Linkwitz-Riley, qui sont deux
+    Butterworth en cascade). BWLP/BWHP/LRLP/LRHP ignorent Q (Butterworth
+    2e ordre) ; LSC/HSC donnent la fréquence de coin, convertie en point
+    milieu du shelf RBJ.
+    """
+    types = np.array([str(t).upper() for t in filter_types])
+    fc = np.clip(np.asarray(freqs, dtype=float), 1.0, fs * 0.499)
+    gain = np.asarray(gains, dtype=float)
+    q = np.maximum(np.asarray(q_values, dtype=float), 1e-3)
+
+    butterworth = np.isin(types, ('BWLP', 'BWHP', 'LRLP', 'LRHP'))
+    q = np.where(butterworth, _BUTTERWORTH_Q, q)
+    corner_shift = 10 ** (np.abs(gain) / 80)
+    fc = np.where(types == 'LSC', fc * corner_shift, fc)
+    fc = np.where(types == 'HSC', fc / corner_shift, fc)
+
+    A = 10 ** (gain / 40)
+    w0 = 2 * np.pi * fc / fs
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * q)
+    sqrt_a_alpha = 2 * np.sqrt(A) * alpha
+    one = np.ones_like(cos_w0)
+
+    # Défaut (et types inconnus) : peaking, comme getCoefficientsForType côté JS
+    b = np.stack([1 + alpha * A, -2 * cos_w0, 1 - alpha * A], axis=1)
+    a = np.stack([1 + alpha / A, -2 * cos_w0, 1 - alpha / A], axis=1)
+
+    def assign(mask, b_rows, a_rows):
+        if mask.any():
+            b[mask] = np.stack(b_rows, axis=1)[mask]
+            a[mask] = np.stack(a_rows, axis=1)[mask]
+
+    pole = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    assign(np.isin(types, ('LP', 'BWLP', 'LRLP')), [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2], pole)
+    assign(np.isin(types, ('HP', 'BWHP', 'LRHP')), [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2], pole)
+    assign(types == 'BP', [alpha, 0 * one, -alpha], pole)
+    assign(types == 'NO', [one, -2 * cos_w0, one], pole)
+    assign(types == 'AP', [1 - alpha, -2 * cos_w0, 1 + alpha], pole)
+    assign(np.isin(types, _LOW_SHELVES),
+           [A * ((A + 1) - (A - 1) * cos_w0 + sqrt_a_alpha), 2 * A * ((A - 1) - (A + 1) * cos_w0),
+            A * ((A + 1) - (A - 1) * cos_w0 - sqrt_a_alpha)],
+           [(A + 1) + (A - 1) * cos_w0 + sqrt_a_alpha, -2 * ((A - 1) + (A + 1) * cos_w0),
+            (A + 1) + (A - 1) * cos_w0 - sqrt_a_alpha])
+    assign(np.isin(types, _HIGH_SHELVES),
+           [A * ((A + 1) + (A - 1) * cos_w0 + sqrt_a_alpha), -2 * A * ((A - 1) + (A + 1) * cos_w0),
+            A * ((A + 1) + (A - 1) * cos_w0 - sqrt_a_alpha)],
+           [(A + 1) - (A - 1) * cos_w0 + sqrt_a_alpha, 2 * ((A - 1) - (A + 1) * cos_w0),
+            (A + 1) - (A - 1) * cos_w0 - sqrt_a_alpha])
+
+    b = b / a[:, :1]
+    a = a / a[:, :1]
+    stages = np.where(np.isin(types, ('LRLP', 'LRHP')), 2, 1)
+    return b, a, stages
+
+
+def band_responses_db(filter_types, freqs, gains, q_values, grid=None):
+    """Matrice (n filtres, n points) des gains en dB, calculée en une seule passe"""
+    grid = grid or log_grid()
+    if len(filter_types) == 0:
+        return np.zeros((0, len(grid)))
+    b, a, stages = biquad_coefficients(filter_types, freqs, gains, q_values, grid.fs)
+    b0, b1, b2 = (b[:, i:i + 1] for i in range(3))
+    a1, a2 = a[:, 1:2], a[:, 2:3]
+
+    num = (b0 + b1 * grid.cos_w + b2 * grid.cos_2w) ** 2 + (b1 * grid.sin_w + b2 * grid.sin_2w) ** 2
+    den = (1 + a1 * grid.cos_w + a2 * grid.cos_2w) ** 2 + (a1 * grid.sin_w + a2 * grid.sin_2w) ** 2
+    return 10 * np.log10(np.maximum(num, 1e-24) / np.maximum(den, 1e-24)) * stages[:, None]
+
+
+def response_db(filters, frequency):
+    """Réponse totale en dB de ``filters`` [(type, freq, gain, q), ...] aux fréquences données"""
+    if not filters:
+        return np.zeros(len(frequency))
+    types, freqs, gains, q_values = zip(*filters)
+    return band_responses_db(types, freqs, gains, q_values, FrequencyGrid(frequency)).sum(axis=0)
+
+
+class ResponseEngine:
+    """Réponse de l'EQ sur une grille fixe, une ligne de contribution par filtre.
+
+    ``update`` ne recalcule que les lignes dont les paramètres ont changé
+    (une seule quand l'utilisateur déplace un point), puis somme en dB.
+    """
+
+    def __init__(self, points=GRID_POINTS, fs=SAMPLE_RATE):
+        self.grid = log_grid(points, fs=fs)
+        self.contributions = np.zeros((0, points))
+        self.total_db = np.zeros(points)
+        self.rows_computed = 0
+        self.updates = 0
+        self._filters = []
+        self._lock = threading.Lock()
+
+    @property
+    def frequency(self):
+        return self.grid.frequency
+
+    def update(self, filters, preamp_db=0.0):
+        """filters : [(type, freq, gain, q), ...] ; retourne la réponse totale en dB (préampli inclus)"""
+        filters = [(str(t).upper(), float(f), float(g), float(q)) for t, f, g, q in filters]
+        with self._lock:
+            if len(filters) != len(self._filters):
+                changed = list(range(len(filters)))
+                self.contributions = np.zeros((len(filters), len(self.grid)))
+            else:
+                changed = [i for i, (new, old) in enumerate(zip(filters, self._filters)) if new != old]
+
+            if changed:
+                types, freqs, gains, q_values = zip(*(filters[i] for i in changed))
+                self.contributions[changed] = band_responses_db(types, freqs, gains, q_values, self.grid)
+                self.rows_computed += len(changed)
+            self._filters = filters
+            self.updates += 1
+            self.total_db = self.contributions.sum(axis=0) + preamp_db
+            return self.total_db
+
+    def stats(self):
+        with self._lock:
+            return {"filters": len(self._filters), "points": len(self.grid),
+                    "updates": self.updates, "rows_computed": self.rows_computed}
@@ -0,0 +1,139 @@
+import itertools, threading, traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class JobCancelled(Exception):
+    """Levée par un job qui a constaté qu'une requête plus récente l'a remplacé"""
+
+
+class _JobSignals(QObject):
+    # key, generation, result / error message
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+
+
+class _Job(QRunnable):
+    def __init__(self, scheduler, key, generation, compute, signals):
+        super().__init__()
+        self.scheduler = scheduler
+        self.key = key
+        self.generation = generation
+        self.compute = compute
+        self.signals = signals
+        self.setAutoDelete(False)
+
+    def is_cancelled(self):
+        return not self.scheduler.is_current(self.key, self.generation)
+
+    def run(self):
+        if self.is_cancelled():
+            self.signals.failed.emit(self.key, self.generation, "cancelled")
+            return
+        try:
+            result = self.compute(self.is_cancelled)
+        except JobCancelled:
+            self.signals.failed.emit(self.key, self.generation, "cancelled")
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, f"{e}\n{traceback.format_exc()}")
+        else:
+            self.signals.finished.emit(self.key, self.generation, result)
+
+
+class JobScheduler(QObject):
+    """Exécute les opérations longues hors du thread Qt principal.
+
+    Chaque job a une clé ('autoeq', 'curve:earphone', 'import'...). Soumettre un
+    nouveau job pour une clé remplace le précédent : s'il est encore en file il
+    est retiré, s'il tourne déjà son résultat sera ignoré. ``compute`` reçoit
+    une fonction ``is_cancelled()`` pour s'arrêter tôt entre deux étapes.
+    ``on_done`` / ``on_error`` sont toujours appelés sur le thread principal,
+    et uniquement pour la requête la plus récente de la clé.
+    """
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._generations = itertools.count(1)
+        self._current = {}   # { key: generation }
+        self._pending = {}   # { key: (job, on_done, on_error) }
+        self._running = {}   # { generation: job } (garde les QRunnable en vie)
+        self._lock = threading.Lock()
+        self.superseded = 0
+
+    def submit(self, key, compute, on_done=None, on_error=None):
+        generation = next(self._generations)
+        signals = _JobSignals()
+        signals.finished.connect(self._on_finished)
+        signals.failed.connect(self._on_failed)
+        job = _Job(self, key, generation, compute, signals)
+
+        with self._lock:
+            previous = self._pending.get(key)
+            self._current[key] = generation
+            self._pending[key] = (job, on_done, on_error)
+            self._running[generation] = job
+        if previous is not None:
+            self.superseded += 1
+            self._discard(previous[0])
+
+        self.pool.start(job)
+        return generation
+
+    def cancel(self, key):
+        with self._lock:
+            self._current.pop(key, None)
+            previous = self._pending.pop(key, None)
+        if previous is not None:
+            self._discard(previous[0])
+
+    def _discard(self, job):
+        """Retire un job encore en file ; s'il tourne déjà, son résultat sera ignoré"""
+        if self.pool.tryTake(job):
+            with self._lock:
+                self._running.pop(job.generation, None)
+
+    def is_current(self, key, generation):
+        with self._lock:
+            return self._current.get(key) == generation
+
+    def _take(self, key, generation):
+        with self._lock:
+            self._running.pop(generation, None)
+            if self._current.get(key) != generation:
+                return None
+            self._current.pop(key, None)
+            return self._pending.pop(key, None)
+
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, key, generation, result):
+        entry = self._take(key, generation)
+        if entry is None:
+            print(f"JobScheduler: Résultat ignoré pour '{key}' (requête remplacée).")
+            return
+        _, on_done, _ = entry
+        if on_done:
+            on_done(result)
+
+    @pyqtSlot(str, int, str)
+    def _on_failed(self, key, generation, error):
+        entry = self._take(key, generation)
+        if entry is None:
+            return
+        _, _, on_error = entry
+        print(f"JobScheduler: Échec du job '{key}' : {error}")
+        if on_error:
+            on_error(error)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def stats(self):
+        with self._lock:
+            pending = sorted(self._pending.keys())
+        return {
+            "active_threads": self.pool.activeThreadCount(),
+            "max_threads": self.pool.maxThreadCount(),
+            "pending": pending,
+            "superseded": self.superseded,
+        }
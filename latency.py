@@ -0,0 +1,112 @@
+import threading, time
+from collections import OrderedDict, deque
+import numpy as np
+
+# Étapes d'une édition, dans l'ordre où elles se produisent normalement
+STAGES = ("apo_requested", "response_computed", "state_marked", "ui_emitted", "apo_written")
+HISTOGRAM_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+LOG_EVERY = 200
+
+
+class LatencyTracker:
+    """Latence bout en bout d'une édition, de l'appel du slot à l'écriture APO.
+
+    ``begin`` ouvre une trace (horodatage de réception) qui devient la trace
+    courante ; les étapes du moteur y ajoutent leur horodatage via ``mark``.
+    La trace suit l'écriture APO demandée (``mark`` retourne son id, passé
+    au scheduler) : quand le fichier est écrit, ``complete_upto`` ferme
+    cette trace et celles fusionnées avant elle. Une trace sans écriture APO
+    (égaliseur inactif) est fermée dès la fin du slot.
+
+    Les durées (ms depuis la réception) sont gardées par étape sur une
+    fenêtre glissante pour les percentiles, plus un histogramme cumulé.
+    """
+
+    def __init__(self, window=1024, max_open=256):
+        self.max_open = max_open
+        self.completed = 0
+        self.dropped = 0
+        self._samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self._histograms = {stage: [0] * (len(HISTOGRAM_EDGES_MS) + 1) for stage in STAGES}
+        self._open = OrderedDict()  # { trace id: {"version", "received", "t": {stage: perf_counter}} }
+        self._current = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            trace_id = self._next_id
+            self._next_id += 1
+            self._open[trace_id] = {"version": None, "received": time.perf_counter(), "t": {}}
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+                self.dropped += 1
+            self._current = trace_id
+            return trace_id
+
+    def end(self, trace_id):
+        """Fin du slot : la trace reste ouverte seulement si une écriture APO est en attente"""
+        with self._lock:
+            if self._current == trace_id:
+                self._current = None
+            trace = self._open.get(trace_id)
+            if trace is not None and ("apo_requested" not in trace["t"] or "apo_written" in trace["t"]):
+                self._finish(trace_id)
+
+    def mark(self, stage, version=None):
+        """Horodate ``stage`` sur la trace courante ; retourne son id (None hors trace)"""
+        with self._lock:
+            trace = self._open.get(self._current)
+            if trace is None:
+                return None
+            trace["t"].setdefault(stage, time.perf_counter())
+            if version is not None:
+                trace["version"] = version
+            return self._current
+
+    def complete_upto(self, trace_id, stage="apo_written"):
+        """Le fichier APO contenant l'état de ``trace_id`` est écrit : ferme cette trace et les précédentes"""
+        if trace_id is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            for open_id in [i for i in self._open if i <= trace_id]:
+                trace = self._open[open_id]
+                if "apo_requested" in trace["t"]:
+                    trace["t"][stage] = now
+                if open_id != self._current:
+                    self._finish(open_id)
+
+    def _finish(self, trace_id):
+        trace = self._open.pop(trace_id)
+        for stage, t in trace["t"].items():
+            if stage not in self._samples:
+                continue
+            elapsed_ms = (t - trace["received"]) * 1000
+            self._samples[stage].append(elapsed_ms)
+            self._histograms[stage][int(np.searchsorted(HISTOGRAM_EDGES_MS, elapsed_ms))] += 1
+        self.completed += 1
+        if self.completed % LOG_EVERY == 0:
+            written = self._samples["apo_written"]
+            if written:
+                p50, p95, p99 = np.percentile(written, (50, 95, 99))
+                print(f"Latency: UI → config.txt p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms "
+                      f"({len(written)} dernières éditions)")
+
+    def stats(self):
+        with self._lock:
+            stages = {}
+            for stage in STAGES:
+                samples = self._samples[stage]
+                if not samples:
+                    continue
+                p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+                stages[stage] = {
+                    "count": len(samples),
+                    "p50_ms": round(float(p50), 3),
+                    "p95_ms": round(float(p95), 3),
+                    "p99_ms": round(float(p99), 3),
+                    "histogram": dict(zip([f"<{edge}ms" for edge in HISTOGRAM_EDGES_MS] + ["slower"],
+                                          self._histograms[stage])),
+                }
+            return {"completed": self.completed, "open": len(self._open), "dropped": self.dropped, "stages": stages}
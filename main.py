@@ -42,6 +42,7 @@ from subprocess import Popen
 
 import sounddevice as sd
 import config
+from state_journal import inline_curve_files
 
 def check_single_instance():
     """Empêche le lancement multiple de l'application"""
@@ -74,7 +75,7 @@ def load_from_aez_file(filepath: str) -> dict:
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
             print(f"Chargement réussi depuis {filepath}")
-            return data
+            return inline_curve_files(data, filepath)
     except json.JSONDecodeError as e:
         print(f"Erreur de décodage JSON dans le fichier '{filepath}': {e}")
         return {}
@@ -143,20 +144,8 @@ def find_matching_device(available_devices, known_devices, threshold=0.75, min_c
 
 def get_all_autoeq_models(measurements_root="measurements"):
     """Récupère tous les modèles AutoEQ disponibles"""
-    models = set()
-    for author_folder in os.listdir(measurements_root):
-        data_path = os.path.join(measurements_root, author_folder, "data")
-        if not os.path.exists(data_path):
-            continue
-        for category_folder in os.listdir(data_path):
-            cat_path = os.path.join(data_path, category_folder)
-            if not os.path.isdir(cat_path):
-                continue
-            for file in os.listdir(cat_path):
-                if file.lower().endswith(".csv"):
-                    model_name = os.path.splitext(file)[0].lower()
-                    models.add(model_name)
-    return models
+    from autoeq_catalog import get_catalog
+    return get_catalog().model_names(lower=True)
 
 def list_output_devices():
     devices = sd.query_devices()
@@ -426,20 +415,16 @@ class AudioEZWindow(QMainWindow):
                 earphone_curve = state.get('earphone_curve', [])
                 if earphone_curve and isinstance(earphone_curve, list) and len(earphone_curve) > 0:
                     if isinstance(earphone_curve[0], list) and len(earphone_curve[0]) > 0:
-                        self.py_channel._earphones_curve_freq = [p[0] for p in earphone_curve]
-                        self.py_channel._earphones_curve_amp = [p[1] for p in earphone_curve]
+                        self.py_channel._update_earphones_curve([p[0] for p in earphone_curve], [p[1] for p in earphone_curve])
                     elif len(earphone_curve) == 2 and isinstance(earphone_curve[0], list):
-                        self.py_channel._earphones_curve_freq = earphone_curve[0]
-                        self.py_channel._earphones_curve_amp = earphone_curve[1]
+                        self.py_channel._update_earphones_curve(earphone_curve[0], earphone_curve[1])
                 
                 target_curve = state.get('target_curve', [])
                 if target_curve and isinstance(target_curve, list) and len(target_curve) > 0:
                     if isinstance(target_curve[0], list) and len(target_curve[0]) > 0:
-                        self.py_channel._target_curve_freq = [p[0] for p in target_curve]
-                        self.py_channel._target_curve_amp = [p[1] for p in target_curve]
+                        self.py_channel._update_target_curve([p[0] for p in target_curve], [p[1] for p in target_curve])
                     elif len(target_curve) == 2 and isinstance(target_curve[0], list):
-                        self.py_channel._target_curve_freq = target_curve[0]
-                        self.py_channel._target_curve_amp = target_curve[1]
+                        self.py_channel._update_target_curve(target_curve[0], target_curve[1])
                 
                 print("État persistant chargé avec succès.")
         
@@ -540,29 +525,16 @@ class AudioEZWindow(QMainWindow):
     def closeEvent(self, event):
         """Gère la fermeture de l'application"""
         print("Closing the application...")
+        self.audio_engine.jobs.wait(2000)
         self.audio_engine.stop_playback()
+        self.audio_engine.apo_scheduler.close()
         
-        if self.py_channel.settings.get("persistent_state", True):
-            eq_parametric_data = {
-                "preamp": self.audio_engine.pre_gain_db,
-                "bass_boost": self.audio_engine.bass_gain_db,
-                "treble_boost": self.audio_engine.treble_gain_db,
-                "filters": [
-                    {"type": t, "gain": g, "q": q, "freq": b}
-                    for b, g, q, t in zip(self.audio_engine.bands, self.audio_engine.gains, self.audio_engine.q_values, self.audio_engine.filter_types)
-                ]
-            }
-
-            from config_save import save_to_aez_file
-
-            save_to_aez_file(
-                filepath=f"{config.APP_CONFIGS_DIR}/temp_.aez",
-                eq_parametric=eq_parametric_data,
-                earphone_name=self.py_channel.earphone_name,
-                earphone_curve=[self.py_channel._earphones_curve_freq, self.py_channel._earphones_curve_amp],
-                target_name=self.py_channel.target_name,
-                target_curve=[self.py_channel._target_curve_freq, self.py_channel._target_curve_amp]
-            )
+        persistent_state = self.py_channel.settings.get("persistent_state", True)
+        if persistent_state:
+            self.audio_engine.save_state()
+        self.audio_engine.state_journal.close()  # écrit ce qui reste en attente (write-behind)
+        self.audio_engine.config_manager.configs.close()  # replie le journal des presets dans index.json
+        if persistent_state:
             print("État persistant sauvegardé.")
         
         event.accept()
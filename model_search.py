@@ -0,0 +1,148 @@
+import json, os, re, threading, time, unicodedata
+import numpy as np
+
+SEARCH_INDEX_FORMAT = 1
+
+
+def normalize_name(name):
+    """Minuscules, sans accents, ponctuation remplacée par des espaces"""
+    name = unicodedata.normalize('NFKD', os.path.basename(str(name))).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ModelSearchIndex:
+    """Index de trigrammes des noms de modèles (postings CSR en tableaux numpy), score Jaccard + bonus sous-chaîne/préfixe"""
+
+    def __init__(self, names=(), autoeq_version=""):
+        self.autoeq_version = autoeq_version
+        self.names = []
+        self.normalized = []
+        self.gram_counts = np.zeros(0, dtype=np.int16)
+        self.grams = {}  # { trigram: posting index }
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int32)
+        self.last_search_ms = 0.0
+        self._lock = threading.Lock()
+        if names:
+            self.build(names)
+
+    def build(self, names):
+        self.names = sorted(set(names), key=str.lower)
+        self.normalized = [normalize_name(name) for name in self.names]
+
+        postings = {}
+        counts = []
+        for i, text in enumerate(self.normalized):
+            grams = trigrams(text)
+            counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+
+        self.gram_counts = np.asarray(counts, dtype=np.int16)
+        self.grams = {gram: i for i, gram in enumerate(postings)}
+        lengths = [len(ids) for ids in postings.values()]
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.ids = np.fromiter((i for ids in postings.values() for i in ids), dtype=np.int32, count=sum(lengths))
+        return self
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=20):
+        """Retourne les ``limit`` noms les plus proches de ``query``, du meilleur au moins bon"""
+        start = time.perf_counter()
+        text = normalize_name(query)
+        if not text or not self.names:
+            return []
+
+        query_grams = [self.grams[gram] for gram in trigrams(text) if gram in self.grams]
+        if not query_grams:
+            return []
+        postings = np.concatenate([self.ids[self.offsets[g]:self.offsets[g + 1]] for g in query_grams])
+        shared = np.bincount(postings, minlength=len(self.names))
+
+        candidates = np.flatnonzero(shared)
+        query_size = len(trigrams(text))
+        scores = shared[candidates] / (query_size + self.gram_counts[candidates] - shared[candidates])
+
+        # Bonus sous-chaîne / préfixe sur les meilleurs candidats seulement
+        keep = min(len(candidates), max(limit * 4, 50))
+        top = np.argpartition(-scores, keep - 1)[:keep] if keep < len(candidates) else np.arange(len(candidates))
+        ranked = []
+        for j in top:
+            i = int(candidates[j])
+            score = float(scores[j])
+            name = self.normalized[i]
+            if name.startswith(text):
+                score += 1.0
+            elif text in name:
+                score += 0.5
+            ranked.append((-score, len(name), self.names[i]))
+        ranked.sort()
+
+        with self._lock:
+            self.last_search_ms = (time.perf_counter() - start) * 1000
+        return [name for _, _, name in ranked[:limit]]
+
+    # ---- persistence ---------------------------------------------------- #
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path[:-len(".npz")] + ".tmp.npz"
+        try:
+            np.savez(tmp_path,
+                     meta=np.array(json.dumps({"format": SEARCH_INDEX_FORMAT, "autoeq_version": self.autoeq_version,
+                                               "names": self.names, "grams": list(self.grams)})),
+                     gram_counts=self.gram_counts, offsets=self.offsets, ids=self.ids)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            print(f"ModelSearchIndex: Erreur sauvegarde index : {e}")
+            return False
+
+    def load(self, path):
+        """Charge l'index. Retourne False s'il est absent ou périmé."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("format") != SEARCH_INDEX_FORMAT:
+                    return False
+                if self.autoeq_version and meta.get("autoeq_version") != self.autoeq_version:
+                    return False
+                self.gram_counts, self.offsets, self.ids = data["gram_counts"], data["offsets"], data["ids"]
+        except (OSError, KeyError, ValueError):
+            return False
+        self.names = meta["names"]
+        self.normalized = [normalize_name(name) for name in self.names]
+        self.grams = {gram: i for i, gram in enumerate(meta["grams"])}
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {"names": len(self.names), "trigrams": len(self.grams), "last_search_ms": round(self.last_search_ms, 3)}
+
+
+_index = None
+_index_catalog = None
+
+
+def get_search_index():
+    """Index partagé, reconstruit quand le catalogue AutoEQ change"""
+    global _index, _index_catalog
+    import config
+    from autoeq_catalog import get_catalog, read_autoeq_version
+
+    catalog = get_catalog()
+    if _index is None or _index_catalog is not catalog:
+        path = os.path.join(config.APP_CONFIGS_DIR, "autoeq_profiles", "autoeq_cache", "search_index.npz")
+        index = ModelSearchIndex(autoeq_version=read_autoeq_version())
+        if not index.load(path) or len(index) != len(catalog):
+            index.build(catalog.model_names())
+            index.save(path)
+        _index, _index_catalog = index, catalog
+    return _index
@@ -0,0 +1,272 @@
+import os, re, json
+
+import apo_parser
+
+# Formats acceptés par l'import (individuel ou en masse)
+IMPORT_EXTENSIONS = ('.aez', '.aezl', '.peace', '.txt', '.json', '.wavelet')
+
+# .aezl v2 : une ligne d'en-tête puis une ligne JSON par preset, le nom en premier
+AEZL_VERSION = 2
+AEZL_NAME_PREFIX = '{"name": "'
+
+
+def parse_config_file(file_path):
+    """Lit un fichier de configuration (.aez, .peace, .txt, .json/.wavelet).
+
+    Ne modifie aucun état : peut tourner dans un job en arrière-plan.
+    Retourne (name, imported_data, message) ou lève une exception.
+    """
+    filename = os.path.basename(file_path)
+    name, ext = os.path.splitext(filename)
+    imported_data = None
+
+    if ext.lower() == '.aez':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            imported_data = json.load(f)
+
+        if not isinstance(imported_data, dict):
+            raise ValueError("Invalid AudioEZ configuration file.")
+        message = f"Configuration '{name}' imported successfully."
+
+    elif ext.lower() == '.peace':
+        try:
+            with open(file_path, 'r', encoding='utf-8-sig') as f:
+                content = f.read()
+        except UnicodeDecodeError:
+            with open(file_path, 'r', encoding='latin1') as f:
+                content = f.read()
+
+        preamp_match = re.search(r"PreAmp=(-?\d+\.?\d*)", content)
+        preamp = float(preamp_match.group(1)) if preamp_match else 0.0
+
+        bass_gain_match = re.search(r"Bass Gain=(-?\d+\.?\d*)", content)
+        bass_gain = float(bass_gain_match.group(1)) if bass_gain_match else 0.0
+
+        treble_gain_match = re.search(r"Treble Gain=(-?\d+\.?\d*)", content)
+        treble_gain = float(treble_gain_match.group(1)) if treble_gain_match else 0.0
+
+        frequencies = re.findall(r"Frequency\d+=(\d+\.?\d*)", content)
+        gains = re.findall(r"Gain\d+=(-?\d+\.?\d*)", content)
+        q_values = re.findall(r"Quality\d+=(\d+\.?\d*)", content)
+
+        length = min(len(frequencies), len(gains), len(q_values))
+        if length == 0:
+            raise ValueError("No valid Peace filter configuration found.")
+
+        new_bands = [float(f) for f in frequencies[:length]]
+        new_gains = [float(g) for g in gains[:length]]
+        new_q_values = [float(q) for q in q_values[:length]]
+
+        imported_data = {
+            'pre_gain_db': preamp,
+            'bass_gain_db': bass_gain,
+            'treble_gain_db': treble_gain,
+            'bands': new_bands,
+            'gains': new_gains,
+            'q_values': new_q_values,
+            'filter_types': ['PK'] * len(new_bands)
+        }
+
+        message = f"Peace configuration '{name}' imported successfully."
+
+    elif ext.lower() == '.txt':
+        # Grammaire Equalizer APO : Filter (numérotés ou non), Preamp, GraphicEQ, Channel, Include
+        parsed = apo_parser.parse_file(file_path)
+        if parsed.empty:
+            raise ValueError("Aucun filtre valide trouvé dans le fichier .txt")
+        if parsed.ignored:
+            print(f"Import {filename} : commandes APO ignorées {dict(parsed.ignored)}")
+
+        imported_data = apo_parser.to_audioez(parsed)
+
+        message = f"Configuration '{name}' importée avec succès."
+        if parsed.unknown_types:
+            skipped = ", ".join(f"{count} {filter_type}" for filter_type, count in parsed.unknown_types.items())
+            print(f"Import {filename} : filtres de type inconnu ignorés ({skipped})")
+            message += f" Filtres de type inconnu ignorés : {skipped}."
+
+    elif ext.lower() in ['.json', '.wavelet']:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            wavelet_data = json.load(f)
+
+        preamp = float(wavelet_data.get('preamp', 0.0))
+        filters = wavelet_data.get('filters', [])
+
+        if not filters:
+            raise ValueError("No valid filters found in Wavelet JSON file.")
+
+        type_map = {
+            'peaking': 'PK', 'lowshelf': 'LS', 'highshelf': 'HS',
+            'lowpass': 'LP', 'highpass': 'HP', 'bandpass': 'BP',
+            'notch': 'NO', 'allpass': 'AP',
+            'pk': 'PK', 'ls': 'LS', 'hs': 'HS', 'lp': 'LP',
+            'hp': 'HP', 'bp': 'BP', 'no': 'NO', 'ap': 'AP',
+            'lsq': 'LSQ', 'hsq': 'HSQ'
+        }
+
+        new_bands = []
+        new_gains = []
+        new_q_values = []
+        new_filter_types = []
+
+        for filt in filters:
+            freq = float(filt.get('frequency', filt.get('fc', 1000)))
+            gain = float(filt.get('gain', 0.0))
+            q = float(filt.get('q', filt.get('Q', 1.41)))
+            ftype = str(filt.get('type', 'peaking')).lower()
+            ftype = type_map.get(ftype, 'PK')
+
+            new_bands.append(freq)
+            new_gains.append(gain)
+            new_q_values.append(q)
+            new_filter_types.append(ftype)
+
+        imported_data = {
+            'pre_gain_db': preamp,
+            'bands': new_bands,
+            'gains': new_gains,
+            'q_values': new_q_values,
+            'filter_types': new_filter_types
+        }
+
+        message = f"Wavelet configuration '{name}' imported successfully."
+
+    else:
+        raise ValueError("Unsupported file format.")
+
+    return name, imported_data, message
+
+
+def _error_message(e):
+    return str(e) or type(e).__name__
+
+
+def _parse_safe(file_path):
+    try:
+        name, imported_data, _ = parse_config_file(file_path)
+    except Exception as e:
+        return file_path, None, None, "", _error_message(e)
+    return file_path, name, imported_data, "", None
+
+
+def write_aezl(file_path, presets, total=None, progress=None, progress_every=100):
+    """Écrit une bibliothèque .aezl v2 preset par preset.
+
+    ``presets`` : itérable de (name, tag, config), consommé au fil de
+    l'écriture (un seul preset en mémoire à la fois). ``progress(done,
+    total)`` est appelé tous les ``progress_every`` presets. Retourne le
+    nombre de presets écrits.
+    """
+    done = 0
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(json.dumps({"format": "aezl", "version": AEZL_VERSION, "count": total}) + "\n")
+        for name, tag, config in presets:
+            f.write(json.dumps({"name": name, "tag": tag, "config": config}, ensure_ascii=False) + "\n")
+            done += 1
+            if progress and done % progress_every == 0:
+                progress(done, total)
+    os.replace(tmp_path, file_path)
+    return done
+
+
+def _aezl_line_name(line):
+    """Nom d'une ligne de preset sans décoder sa configuration"""
+    if line.startswith(AEZL_NAME_PREFIX):
+        try:
+            return json.decoder.scanstring(line, len(AEZL_NAME_PREFIX))[0]
+        except ValueError:
+            pass
+    return json.loads(line).get("name")
+
+
+def _open_aezl(f):
+    """Lit l'en-tête ; retourne None pour une bibliothèque v1 (un seul document JSON {nom: config})"""
+    try:
+        header = json.loads(f.readline())
+    except ValueError:
+        header = None
+    if not (isinstance(header, dict) and header.get("format") == "aezl"):
+        f.seek(0)
+        return None
+    if header.get("version", 0) > AEZL_VERSION:
+        raise ValueError(f"AudioEZ library version {header.get('version')} is not supported.")
+    return header
+
+
+def _read_aezl_v1(f):
+    library = json.load(f)
+    if not isinstance(library, dict):
+        raise ValueError("Invalid AudioEZ library file.")
+    return library
+
+
+def read_aezl(file_path, names=None):
+    """Générateur de (name, tag, config) lu ligne par ligne (mémoire bornée à un preset).
+
+    Avec ``names``, seules les lignes de ces presets sont décodées, les
+    autres sont sautées après lecture du nom. Une ligne illisible est
+    ignorée. Les anciens .aezl (v1) sont chargés en une fois.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if _open_aezl(f) is None:
+            for name, config in _read_aezl_v1(f).items():
+                if names is None or name in names:
+                    yield name, "", config
+            return
+        for line_number, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            try:
+                if names is not None and _aezl_line_name(line) not in names:
+                    continue
+                entry = json.loads(line)
+                name, config = entry["name"], entry["config"]
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"read_aezl: ligne {line_number} ignorée ({e})")
+                continue
+            yield name, entry.get("tag") or "", config
+
+
+def list_aezl(file_path):
+    """Noms des presets d'une bibliothèque, sans décoder les configurations (v2)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if _open_aezl(f) is None:
+            return list(_read_aezl_v1(f))
+        names = []
+        for line in f:
+            if line.strip():
+                try:
+                    names.append(_aezl_line_name(line))
+                except ValueError:
+                    continue
+        return names
+
+
+def find_config_files(folder):
+    """Fichiers importables de ``folder`` et de ses sous-dossiers, triés"""
+    found = []
+    for root, _, files in os.walk(folder):
+        found.extend(os.path.join(root, f) for f in files if os.path.splitext(f)[1].lower() in IMPORT_EXTENSIONS)
+    return sorted(found)
+
+
+def parse_config_files(file_paths, names=None):
+    """Générateur de (file_path, name, imported_data, tag, error) ; error est None en cas de succès.
+
+    Un fichier illisible ne fait pas échouer le lot. Une bibliothèque
+    .aezl produit un résultat par preset (``names`` : sous-ensemble à
+    importer). Les fichiers EQ font quelques Ko (~30 µs de parsing
+    chacun) : un pool de processus (spawn, qui réimporte PyQt par
+    processus) coûte plus qu'il ne rapporte, le lot est parsé dans le job
+    d'arrière-plan.
+    """
+    for file_path in file_paths:
+        if os.path.splitext(file_path)[1].lower() != '.aezl':
+            yield _parse_safe(file_path)
+            continue
+        try:
+            for name, tag, config in read_aezl(file_path, names):
+                yield file_path, name, config, tag, None
+        except Exception as e:
+            yield file_path, None, None, "", _error_message(e)
@@ -0,0 +1,350 @@
+import hashlib, json, os, re, sys, threading
+from collections.abc import MutableMapping
+
+from state_journal import write_atomic
+
+PRESETS_DIR = "presets"
+INDEX_FILE = "index.json"
+JOURNAL_FILE = "index.journal"
+INDEX_VERSION = 1
+COMPACT_BYTES = 64 * 1024  # taille du journal au-delà de laquelle il est replié dans index.json
+
+
+def preset_file_name(name):
+    """Nom de fichier stable et sûr pour un nom de preset (slug + empreinte, sans collision de casse)"""
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_')[:40] or "preset"
+    return f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]}.json"
+
+
+class PresetStore(MutableMapping):
+    """Un fichier JSON par preset + un petit index (noms, fichiers, mtimes, tags).
+
+    Enregistrer, supprimer ou renommer un preset ne touche que son fichier
+    et ajoute une ligne au journal de l'index (index.journal, fsync) ;
+    index.json n'est réécrit que lors d'un compactage, en arrière-plan
+    quand le journal dépasse ``compact_bytes``. Au chargement : index.json
+    puis rejeu du journal (les opérations sont idempotentes, une dernière
+    ligne tronquée par un crash est ignorée et le journal replié ; les
+    fichiers écrits sans entrée de journal sont réintégrés). Le contenu d'un preset n'est
+    lu qu'à la première demande puis gardé en cache. Au premier lancement,
+    l'ancien presets.json (et presets_tags.json) est éclaté en fichiers
+    puis renommé en .migrated.
+    """
+
+    def __init__(self, configs_dir, compact_bytes=COMPACT_BYTES):
+        self.directory = os.path.join(configs_dir, PRESETS_DIR)
+        self.index_path = os.path.join(self.directory, INDEX_FILE)
+        self.journal_path = os.path.join(self.directory, JOURNAL_FILE)
+        self.compact_bytes = compact_bytes
+        self.legacy_file = os.path.join(configs_dir, "presets.json")
+        self.legacy_tags_file = os.path.join(configs_dir, "presets_tags.json")
+        self.entries = {}  # { name: {"file", "mtime", "size"} }
+        self.tags = {}     # { name: tag }
+        self.file_writes = 0
+        self.journal_appends = 0
+        self.compactions = 0
+        self._cache = {}
+        self._journal = None  # fichier ouvert en ajout
+        self._journal_size = 0
+        self._compacting = False
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()  # une seule compaction à la fois (thread de fond / close)
+
+    # --- Chargement / migration ---
+
+    def load(self):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._cache.clear()
+            rebuilt = True
+            if os.path.exists(self.index_path):
+                try:
+                    with open(self.index_path, 'r', encoding='utf-8') as f:
+                        index = json.load(f)
+                    self.entries = index.get("presets", {})
+                    self.tags = index.get("tags", {})
+                    rebuilt = False
+                except (OSError, ValueError) as e:
+                    print(f"PresetStore: index illisible ({e}), reconstruction depuis les fichiers.", file=sys.stderr)
+                    self.tags = {}
+                    self._rebuild_index()
+            else:
+                self.entries, self.tags = {}, {}
+                self._rebuild_index()
+            replayed_old, clean_old = self._replay(self.journal_path + ".old")
+            replayed, clean = self._replay(self.journal_path)
+            swept = not rebuilt and self._sweep()
+            migrated = self._migrate_legacy()
+        # Un journal abîmé (ligne tronquée par un crash) est toujours replié : sinon le
+        # prochain ajout serait collé au fragment et perdu au chargement suivant
+        if rebuilt or replayed_old or replayed or not (clean_old and clean) or swept or migrated:
+            self._compact()
+
+    def _replay(self, path):
+        """Applique les opérations d'un journal à l'index en mémoire.
+
+        Retourne (nombre d'opérations, journal intact) ; intact est faux si
+        une ligne a été ignorée ou si le fichier ne finit pas par un saut de ligne.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return 0, True
+        applied, clean = 0, not text or text.endswith("\n")
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                print(f"PresetStore: Entrée de journal ignorée : {line[:80]!r}", file=sys.stderr)
+                clean = False
+                continue
+            applied += 1
+        return applied, clean
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "put":
+            self.entries[entry["name"]] = entry["entry"]
+        elif op == "put_many":
+            self.entries.update(entry["entries"])
+            self.tags.update(entry.get("tags", {}))
+        elif op == "del":
+            self.entries.pop(entry["name"], None)
+            self.tags.pop(entry["name"], None)
+        elif op == "rename":
+            self.entries.pop(entry["old"], None)
+            self.entries[entry["new"]] = entry["entry"]
+            if entry["old"] in self.tags:
+                self.tags[entry["new"]] = self.tags.pop(entry["old"])
+        elif op == "tag":
+            if entry["tag"]:
+                self.tags[entry["name"]] = entry["tag"]
+            else:
+                self.tags.pop(entry["name"], None)
+        else:
+            raise KeyError(op)
+
+    def _rebuild_index(self):
+        """Relit chaque fichier de preset (le nom est stocké dedans)"""
+        self.entries = {}
+        self._sweep()
+
+    def _sweep(self):
+        """Réconcilie l'index avec les fichiers présents ; retourne True s'il a changé.
+
+        Un crash entre l'écriture d'un fichier et son entrée de journal laisse
+        un fichier hors index (il y est ajouté) ; une suppression interrompue
+        laisse une entrée sans fichier (elle est retirée).
+        """
+        files = {f for f in os.listdir(self.directory) if f.endswith(".json") and f != INDEX_FILE}
+        changed = False
+        for name in [name for name, entry in self.entries.items() if entry.get("file") not in files]:
+            print(f"PresetStore: Preset '{name}' sans fichier, retiré de l'index.", file=sys.stderr)
+            del self.entries[name]
+            changed = True
+        referenced = {entry["file"] for entry in self.entries.values()}
+        for file_name in sorted(files - referenced):
+            try:
+                with open(os.path.join(self.directory, file_name), 'r', encoding='utf-8') as f:
+                    name = json.load(f)["name"]
+            except (OSError, ValueError, KeyError, TypeError):
+                print(f"PresetStore: Fichier ignoré : {file_name}", file=sys.stderr)
+                continue
+            if name not in self.entries:
+                self.entries[name] = self._entry(file_name)
+                changed = True
+        return changed
+
+    def _migrate_legacy(self):
+        migrated = False
+        if os.path.exists(self.legacy_file):
+            try:
+                with open(self.legacy_file, 'r') as f:
+                    legacy = json.load(f)
+            except ValueError:
+                print("Error: The presets.json file is corrupted or empty. It will be ignored.", file=sys.stderr)
+                legacy = {}
+            for name, data in legacy.items():
+                if name not in self.entries:
+                    self._write_preset(name, data)
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+            print(f"PresetStore: {len(legacy)} preset(s) migrés depuis presets.json.")
+            migrated = True
+        if os.path.exists(self.legacy_tags_file):
+            try:
+                with open(self.legacy_tags_file, 'r', encoding='utf-8') as f:
+                    for name, tag in json.load(f).items():
+                        self.tags.setdefault(name, tag)
+            except (OSError, ValueError):
+                pass
+            os.replace(self.legacy_tags_file, self.legacy_tags_file + ".migrated")
+            migrated = True
+        return migrated
+
+    # --- Écriture ---
+
+    def _entry(self, file_name):
+        st = os.stat(os.path.join(self.directory, file_name))
+        return {"file": file_name, "mtime": st.st_mtime, "size": st.st_size}
+
+    def _write_preset(self, name, data):
+        file_name = preset_file_name(name)
+        write_atomic(os.path.join(self.directory, file_name), json.dumps({"name": name, "config": data}, indent=4))
+        self.entries[name] = self._entry(file_name)
+        self._cache[name] = data
+        self.file_writes += 1
+
+    def _log(self, entry):
+        """Applique une opération à l'index en mémoire et l'ajoute au journal (appelé sous le verrou)"""
+        self._apply(entry)
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal_size = self._journal.tell()
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n"
+        self._journal.write(line)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_size += len(line.encode('utf-8'))
+        self.journal_appends += 1
+        if self._journal_size > self.compact_bytes and not self._compacting:
+            self._compacting = True
+            threading.Thread(target=self._compact, name="PresetStoreCompaction", daemon=True).start()
+
+    def _compact(self):
+        """Replie le journal dans index.json.
+
+        Sous le verrou : copie de l'index et rotation du journal en .old
+        (les ajouts suivants vont dans un journal neuf). Hors verrou :
+        écriture atomique de index.json puis suppression du .old.
+        """
+        with self._compact_lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        with self._lock:
+            snapshot = json.dumps({"version": INDEX_VERSION, "presets": self.entries, "tags": self.tags},
+                                  indent=2, ensure_ascii=False)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path) and os.path.exists(self.journal_path + ".old"):
+                # Compaction précédente échouée : le .old n'est pas encore dans index.json
+                with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                        open(self.journal_path + ".old", 'a+', encoding='utf-8') as dst:
+                    dst.seek(0)
+                    previous = dst.read()
+                    if previous and not previous.endswith("\n"):
+                        dst.write("\n")  # isole un éventuel fragment tronqué
+                    dst.write(src.read())
+                os.remove(self.journal_path)
+            elif os.path.exists(self.journal_path):
+                os.replace(self.journal_path, self.journal_path + ".old")
+            self._journal_size = 0
+        try:
+            write_atomic(self.index_path, snapshot)
+            if os.path.exists(self.journal_path + ".old"):
+                os.remove(self.journal_path + ".old")
+            self.compactions += 1
+        except OSError as e:
+            # Le .old reste en place : il sera rejoué au prochain chargement
+            print(f"PresetStore: Erreur de compactage de l'index : {e}", file=sys.stderr)
+        finally:
+            self._compacting = False
+
+    # --- Interface dict ---
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = self.read(name)
+            return self._cache[name]
+
+    def read(self, name):
+        """Contenu d'un preset sans l'ajouter au cache (parcours de toute la bibliothèque)"""
+        with self._lock:
+            if name in self._cache:
+                return self._cache[name]
+            entry = self.entries[name]
+        try:
+            with open(os.path.join(self.directory, entry["file"]), 'r', encoding='utf-8') as f:
+                return json.load(f)["config"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"PresetStore: Impossible de lire '{name}' : {e}", file=sys.stderr)
+            raise KeyError(name) from e
+
+    def __setitem__(self, name, data):
+        with self._lock:
+            self._write_preset(name, data)
+            self._log({"op": "put", "name": name, "entry": self.entries[name]})
+
+    def put_many(self, presets, tags=None):
+        """Import en masse : un fichier par preset mais une seule entrée de journal (un seul fsync)"""
+        with self._lock:
+            for name, data in presets.items():
+                self._write_preset(name, data)
+            self._log({"op": "put_many", "entries": {name: self.entries[name] for name in presets},
+                       "tags": tags or {}})
+
+    def __delitem__(self, name):
+        with self._lock:
+            entry = self.entries[name]
+            self._cache.pop(name, None)
+            # Fichier d'abord : après un crash, une entrée sans fichier est retirée par _sweep
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except FileNotFoundError:
+                pass
+            self._log({"op": "del", "name": name})
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self.entries
+
+    def __iter__(self):
+        # Instantané : une écriture concurrente ne casse pas l'itération en cours
+        with self._lock:
+            return iter(list(self.entries))
+
+    def __len__(self):
+        with self._lock:
+            return len(self.entries)
+
+    def rename(self, old_name, new_name):
+        """Ne touche que le fichier du preset renommé et l'index"""
+        with self._lock:
+            entry = self.entries[old_name]
+            file_name = preset_file_name(new_name)
+            data = self._cache.get(old_name)
+            old_path = os.path.join(self.directory, entry["file"])
+            if data is None:
+                with open(old_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)["config"]
+            # Le nom est stocké dans le fichier (reconstruction de l'index) : il faut le réécrire
+            write_atomic(os.path.join(self.directory, file_name), json.dumps({"name": new_name, "config": data}, indent=4))
+            if file_name != entry["file"]:
+                os.remove(old_path)
+            self._cache.pop(old_name, None)
+            self._cache[new_name] = data
+            self.file_writes += 1
+            self._log({"op": "rename", "old": old_name, "new": new_name, "entry": self._entry(file_name)})
+
+    def set_tag(self, name, tag):
+        with self._lock:
+            if self.tags.get(name, "") != (tag or ""):
+                self._log({"op": "tag", "name": name, "tag": tag or ""})
+
+    def close(self):
+        """Replie le journal (fermeture de l'application)"""
+        with self._lock:
+            pending = self._journal is not None or os.path.exists(self.journal_path)
+        if pending:
+            self._compact()
+
+    def stats(self):
+        with self._lock:
+            return {"presets": len(self.entries), "cached": len(self._cache), "file_writes": self.file_writes,
+                    "journal_appends": self.journal_appends, "journal_bytes": self._journal_size,
+                    "compactions": self.compactions}
@@ -1,39 +1,14 @@
-import json, os, sys, time, winreg
+import hashlib, json, os, sys, time, winreg
+import numpy as np
 from pypresence import Presence
-from PyQt6.QtCore import QObject, pyqtSlot, pyqtSignal, QThread
+from PyQt6.QtCore import QObject, pyqtSlot, pyqtSignal
 
 import config
+from curve_decimation import DecimationCache
+from curve_transport import CurveEncoder
+from model_search import get_search_index
 
-def get_autoeq_models_for_settings():
-    models = set()
-    measurements_root = "measurements"
-    
-    for author_folder in os.listdir(measurements_root):
-        data_path = os.path.join(measurements_root, author_folder, "data")
-        if not os.path.exists(data_path):
-            continue
-        for category_folder in os.listdir(data_path):
-            cat_path = os.path.join(data_path, category_folder)
-            if not os.path.isdir(cat_path):
-                continue
-            for file in os.listdir(cat_path):
-                if file.lower().endswith(".csv"):
-                    model_name = os.path.splitext(file)[0]
-                    models.add(model_name)
-    
-    return sorted(models)
-
-class AutoEQFetcher(QObject):
-    modelsFetched = pyqtSignal(list)
-
-    def __init__(self, audio_engine):
-        super().__init__()
-        self.audio_engine = audio_engine
-
-    @pyqtSlot()
-    def run(self):
-        models = self.audio_engine.fetch_autoeq_index(force_refresh=True)
-        self.modelsFetched.emit(models)
+MODELS_PAGE_MAX = 2000
 
 class PythonChannel(QObject):
     statusUpdate = pyqtSignal(str)
@@ -45,10 +20,19 @@ class PythonChannel(QObject):
     bassGainChanged = pyqtSignal(float)
     trebleGainChanged = pyqtSignal(float)
     qFactorChanged = pyqtSignal(float)
-    modelsUpdated = pyqtSignal(list)
+    modelsCatalogReady = pyqtSignal(str, int)  # version token, total count
     autoeqModelsUpdated = pyqtSignal(list)
     targetCurveUpdate = pyqtSignal(list, list)
     EarphonesCurve = pyqtSignal(list, list)
+    # Binary variants (base64 float32 frames, see curve_transport.py)
+    targetCurveBinary = pyqtSignal(str)
+    earphonesCurveBinary = pyqtSignal(str)
+    frequencyResponseBinary = pyqtSignal(str, list, list, list, list)
+    # Single-band edit: state version, band index, JSON of the changed fields
+    bandPatch = pyqtSignal(int, int, str)
+    eqSnapshotVersion = pyqtSignal(int)
+    # Fit vs target: EQ version, weighted RMS (dB), max deviation (dB), residual frame ('' without binary curves)
+    fitUpdate = pyqtSignal(int, float, float, str)
     headphoneDetected = pyqtSignal(str)
     get_ET = pyqtSignal(str, str)
     settingsUpdated = pyqtSignal(str)
@@ -67,6 +51,7 @@ class PythonChannel(QObject):
             except Exception as e:
                 print(f"Could not attach adaptive status listener: {e}")
         self._models_cache = []
+        self._models_version = ""
         print("PythonChannel: Object registered for QWebChannel.")
 
         self.earphone_name = ""
@@ -76,10 +61,16 @@ class PythonChannel(QObject):
         self._target_curve_amp = []
         self._earphones_curve_freq = []
         self._earphones_curve_amp = []
+        self.curves_version = 0  # incrémenté à chaque nouvelle courbe écouteur / cible
 
         self.targetCurveUpdate.connect(self._update_target_curve)
         self.EarphonesCurve.connect(self._update_earphones_curve)
 
+        self.binary_curves = False
+        self.curve_encoder = CurveEncoder()
+        self.decimation_cache = DecimationCache()
+        self.graph_width = 0  # largeur du canvas en pixels, 0 = courbes complètes
+
         self.settings = {}
         self.APP_NAME = "AudioEZ"
         self.REG_PATH = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -194,10 +185,90 @@ class PythonChannel(QObject):
     def _update_target_curve(self, freq_list, amp_list):
         self._target_curve_freq = freq_list
         self._target_curve_amp = amp_list
+        self.curves_version += 1
 
     def _update_earphones_curve(self, freq_list, amp_list):
         self._earphones_curve_freq = freq_list
         self._earphones_curve_amp = amp_list
+        self.curves_version += 1
+
+    def send_target_curve(self, frequency, values):
+        """Envoie la courbe cible à l'UI (trame binaire si le client la supporte)"""
+        if not self.binary_curves:
+            self.targetCurveUpdate.emit(np.asarray(frequency).tolist(), np.asarray(values).tolist())
+            return
+        self._update_target_curve(np.asarray(frequency).tolist(), np.asarray(values).tolist())
+        self.targetCurveBinary.emit(self._curve_frame(frequency, values))
+
+    def send_earphones_curve(self, frequency, values):
+        """Envoie la courbe de l'écouteur à l'UI (trame binaire si le client la supporte)"""
+        if not self.binary_curves:
+            self.EarphonesCurve.emit(np.asarray(frequency).tolist(), np.asarray(values).tolist())
+            return
+        self._update_earphones_curve(np.asarray(frequency).tolist(), np.asarray(values).tolist())
+        self.earphonesCurveBinary.emit(self._curve_frame(frequency, values))
+
+    def _curve_frame(self, frequency, values):
+        """Trame [moyenne, min, max] réduite à la largeur du graphe si la courbe a plus de points que de pixels"""
+        if self.graph_width and len(frequency) > self.graph_width:
+            centers, mean, low, high = self.decimation_cache.get(frequency, values, self.graph_width)
+            return self.curve_encoder.encode(centers, mean, low, high)
+        return self.curve_encoder.encode(frequency, values)
+
+    def send_frequency_response(self, freqs, bands, gains, q_values, filter_types, version=None):
+        if version is not None:
+            self.eqSnapshotVersion.emit(version)
+        bands = list(map(float, bands))
+        gains = list(map(float, gains))
+        q_values = list(map(float, q_values))
+        if self.binary_curves:
+            # Axe fixe : après le premier envoi la trame ne contient que son identifiant
+            self.frequencyResponseBinary.emit(self.curve_encoder.encode(freqs), bands, gains, q_values, list(filter_types))
+        else:
+            self.frequencyResponseUpdate.emit(list(map(float, freqs)), bands, gains, q_values, list(filter_types))
+
+    def send_band_patch(self, version, index, fields):
+        """Envoie uniquement les champs modifiés d'une bande (O(1) côté UI)"""
+        fields = {key: (value if key == "type" else float(value)) for key, value in fields.items()}
+        self.bandPatch.emit(version, index, json.dumps(fields))
+
+    def send_fit(self, version, fit):
+        """Score d'ajustement calculé par AudioEngine.update_fit (None : plus de courbes, l'UI efface le score)"""
+        if fit is None:
+            self.fitUpdate.emit(version, -1.0, -1.0, "")
+            return
+        frame = self.curve_encoder.encode(self.audio_engine.fit.frequency, fit["residual"]) if self.binary_curves else ""
+        self.fitUpdate.emit(version, round(fit["rms"], 3), round(fit["max_dev"], 3), frame)
+
+    @pyqtSlot()
+    def requestEqResync(self):
+        """L'UI a détecté un trou dans les versions de patch : renvoie l'état complet"""
+        self.audio_engine.send_full_ui_update()
+
+    @pyqtSlot(bool)
+    def enableBinaryCurves(self, enabled):
+        """Appelé par l'UI au chargement : active les trames binaires et oublie les grilles déjà envoyées"""
+        self.binary_curves = bool(enabled)
+        self.curve_encoder.reset()
+
+    @pyqtSlot(int)
+    def setGraphWidth(self, width):
+        """L'UI indique la largeur de son canvas : les courbes sont renvoyées à cette résolution"""
+        width = max(64, min(int(width), 4096)) if width > 0 else 0
+        if width == self.graph_width:
+            return
+        self.graph_width = width
+        if not self.binary_curves:
+            return
+        if self._target_curve_freq:
+            self.targetCurveBinary.emit(self._curve_frame(self._target_curve_freq, self._target_curve_amp))
+        if self._earphones_curve_freq:
+            self.earphonesCurveBinary.emit(self._curve_frame(self._earphones_curve_freq, self._earphones_curve_amp))
+
+    @pyqtSlot(int, result=str)
+    def getCurveGrid(self, grid_id):
+        """Renvoie la grille grid_id à un client qui ne l'a plus en mémoire"""
+        return self.curve_encoder.grid_frame(grid_id)
 
     def load_settings(self):
         """Charge les paramètres depuis settings.json ou crée un fichier par défaut."""
@@ -210,7 +281,8 @@ class PythonChannel(QObject):
             "default_headphone": "None",
             "default_target": "AutoEq in-ear",
             "default_configuration": "Default",
-            "adaptive_filter": False
+            "adaptive_filter": False,
+            "apo_live_include": False
         }
         
         try:
@@ -248,6 +320,8 @@ class PythonChannel(QObject):
         if sys.platform == "win32":
             self.update_autostart(self.settings.get("launch_with_windows", False))
 
+        self.audio_engine.set_apo_live_include(self.settings.get("apo_live_include", False))
+
     def update_autostart(self, enabled):
         """Active ou désactive le démarrage automatique avec Windows"""
         if sys.platform != "win32":
@@ -294,6 +368,7 @@ class PythonChannel(QObject):
             self.update_autostart(new_settings.get("launch_with_windows", False))
             self.settings.update(new_settings)
             self.save_settings()
+            self.audio_engine.set_apo_live_include(self.settings.get("apo_live_include", False))
             
         except Exception as e:
             print(f"Erreur lors de la sauvegarde : {e}")
@@ -303,11 +378,38 @@ class PythonChannel(QObject):
         """Slot appelé par JavaScript pour obtenir les paramètres."""
         return json.dumps(self.settings)
 
+    @pyqtSlot(int, int, str, result=str)
+    def getModelsPage(self, offset, limit, known_version):
+        """Page [offset, offset + limit) de la liste des modèles AutoEQ.
+
+        Si known_version correspond au catalogue courant, rien n'est renvoyé
+        (le client garde sa copie).
+        """
+        response = {"version": self._models_version, "total": len(self._models_cache), "offset": offset}
+        if known_version and known_version == self._models_version:
+            response.update(unchanged=True, models=[])
+        else:
+            limit = max(0, min(limit, MODELS_PAGE_MAX))
+            response.update(unchanged=False, models=self._models_cache[offset:offset + limit])
+        return json.dumps(response)
+
+    @pyqtSlot(str, int, result=str)
+    def searchModels(self, query, limit):
+        """Recherche floue (trigrammes) dans les modèles AutoEQ, retourne les meilleurs résultats en JSON"""
+        return json.dumps(get_search_index().search(query, limit or 20))
+
+    @pyqtSlot(result=str)
+    def getDiagnostics(self):
+        """Retourne l'état des caches du moteur en JSON."""
+        diagnostics = self.audio_engine.get_diagnostics()
+        diagnostics["model_search"] = get_search_index().stats()
+        diagnostics["curve_decimation"] = dict(self.decimation_cache.stats(), graph_width=self.graph_width)
+        return json.dumps(diagnostics)
+
     @pyqtSlot(result=str)
-    def getAutoEQModelsForSettings(self):
-        """Retourne la liste des modèles AutoEQ pour les paramètres"""
-        models = get_autoeq_models_for_settings()
-        return json.dumps(models)
+    def getLatencyStats(self):
+        """Percentiles (p50/p95/p99) et histogrammes de latence UI → config.txt par étape, en JSON"""
+        return json.dumps(self.audio_engine.latency.stats())
 
     @pyqtSlot(result=list)
     def getConfigNamesForSettings(self):
@@ -352,24 +454,25 @@ class PythonChannel(QObject):
 
         if cached_models:
             print("PythonChannel: Envoi du cache local sans fetch.")
-            self._models_cache = cached_models
-            self.modelsUpdated.emit(cached_models)
+            self._set_models(cached_models)
             return
 
-        self.fetcher_thread = QThread()
-        self.fetcher = AutoEQFetcher(self.audio_engine)
-        self.fetcher.moveToThread(self.fetcher_thread)
-        self.fetcher.modelsFetched.connect(self.onModelsFetched)
-        self.fetcher_thread.started.connect(self.fetcher.run)
-        self.fetcher_thread.start()
+        self.audio_engine.jobs.submit(
+            "autoeq_index",
+            lambda is_cancelled: self.audio_engine.fetch_autoeq_index(force_refresh=True),
+            on_done=self.onModelsFetched
+        )
 
     @pyqtSlot(list)
     def onModelsFetched(self, models):
         print(f"PythonChannel: {len(models)} modèles reçus.")
-        self._models_cache = models
-        self.modelsUpdated.emit(models)
-        self.fetcher_thread.quit()
-        self.fetcher_thread.wait()
+        self._set_models(models)
+
+    def _set_models(self, models):
+        """Publie la liste des modèles : seul le jeton de version et le total transitent par le signal"""
+        self._models_cache = list(models)
+        self._models_version = hashlib.sha1("\n".join(self._models_cache).encode('utf-8')).hexdigest()[:16]
+        self.modelsCatalogReady.emit(self._models_version, len(self._models_cache))
 
     @pyqtSlot(str, str, int)
     def applyAutoEQProfile(self, headphone, target, band_size):
@@ -401,7 +504,11 @@ class PythonChannel(QObject):
     @pyqtSlot(int, float, int)
     def setBandGainAndFrequency(self, index, gain_db, frequency):
         print(f"PythonChannel: Received 'setBandGainAndFrequency' call for index {index} with gain={gain_db} dB and frequency={frequency} Hz.")
-        self.audio_engine.set_gain_and_frequency(index, gain_db, frequency)
+        trace = self.audio_engine.latency.begin()
+        try:
+            self.audio_engine.set_gain_and_frequency(index, gain_db, frequency)
+        finally:
+            self.audio_engine.latency.end(trace)
 
     @pyqtSlot()
     def startPlayback(self):
@@ -461,6 +568,11 @@ class PythonChannel(QObject):
         print("PythonChannel: Received 'importConfig' call.")
         self.audio_engine.import_config_file()
 
+    @pyqtSlot()
+    def importConfigFolder(self):
+        print("PythonChannel: Received 'importConfigFolder' call.")
+        self.audio_engine.import_config_folder()
+
     @pyqtSlot()
     def resetAllGains(self):
         print("PythonChannel: Received 'resetAllGains' call.")
@@ -482,8 +594,7 @@ class PythonChannel(QObject):
         """Applique le même Q à tous les filtres et met à jour la courbe."""
         print(f"PythonChannel: Setting Q-factor of all bands to {q:.2f}.")
         self.audio_engine.q_values[:] = q
-        if self.audio_engine.is_playing:
-            self.audio_engine._apply_apo_config()
+        self.audio_engine._schedule_apo_write()
         self.audio_engine.calculate_frequency_response()
 
     @pyqtSlot(int, str, float)
@@ -573,5 +684,4 @@ class PythonChannel(QObject):
         ae.band_count = new_count
         ae._last_eq_hash = None
         ae.send_full_ui_update()
-        if ae.is_playing:
-            ae._apply_apo_config()
\ No newline at end of file
+        ae._schedule_apo_write()
\ No newline at end of file
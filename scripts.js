@@ -9,6 +9,11 @@ class AudioEZApp {
         this.targetEqualizerPoints = [];
         this.earphonesCurve = [];
         this.autoEqDb = [];
+        this.modelsVersion = null;
+        this.curveGrids = new Map();
+        this.eqStateVersion = null;
+        this.fitScore = null;
+        this.fitResidual = [];
         
         // UI State
         this.isDragging = false;
@@ -185,6 +190,7 @@ class AudioEZApp {
             // AutoEQ
             toggleAutoEqBtn: document.getElementById('toggle-autoeq'),
             headphoneList: document.getElementById('headphone-list'),
+            headphoneSearch: document.getElementById('headphone-search'),
             targetList: document.getElementById('target-list'),
             
             // Export Modal
@@ -209,6 +215,7 @@ class AudioEZApp {
             parametersBtn: document.getElementById('parameters-btn'),
             detectEarphoneCheckbox: document.getElementById('detect-earphone'),
             PersistentStateCheckbox: document.getElementById('persistent-state'),
+            apoLiveIncludeCheckbox: document.getElementById('apo-live-include'),
             targetSelect: document.getElementById('target-select'),
             defaultTargetSelect: document.getElementById('default-target-select'),
             readyOnStartupCheckbox: document.getElementById('ready-on-startup'),
@@ -302,12 +309,20 @@ class AudioEZApp {
             this.canvas.style.height = parentHeight + 'px';
 
             this.drawGraph();
+            clearTimeout(this.graphWidthTimer);
+            this.graphWidthTimer = setTimeout(() => this.sendGraphWidth(), 150);
         };
 
         window.addEventListener('resize', onResize);
         onResize();
     }
 
+    // Python decimates the curves to this many columns (min/max envelope kept)
+    sendGraphWidth() {
+        if (!this.canvas || !this.py_channel?.setGraphWidth) return;
+        this.py_channel.setGraphWidth(Math.round(this.canvas.width));
+    }
+
     setupEventListeners() {
         this.setupCanvasEventListeners();
         this.setupControlEventListeners();
@@ -581,6 +596,7 @@ class AudioEZApp {
             { id: 'ready-on-startup',          key: 'auto_launch',          read: el => el.checked },
             { id: 'detect-earphone',            key: 'detect_earphone',      read: el => el.checked },
             { id: 'persistent-state',           key: 'persistent_state',     read: el => el.checked },
+            { id: 'apo-live-include',           key: 'apo_live_include',     read: el => el.checked },
             { id: 'discord-rpc-checkbox',       key: 'discord_rpc',          read: el => el.checked },
             { id: 'launch-with-windows',        key: 'launch_with_windows',  read: el => el.checked },
             { id: 'adaptive-filter-state',      key: 'adaptive_filter',      read: el => el.checked },
@@ -650,8 +666,11 @@ class AudioEZApp {
             if (this.py_channel) this.py_channel.exportAllConfigs();
         };
         
-        importConfigButton.onclick = () => {
-            if (this.py_channel) this.py_channel.importConfig();
+        importConfigButton.onclick = (event) => {
+            if (!this.py_channel) return;
+            // Shift+clic : importer tout un dossier (bibliothèque AutoEQ / Peace)
+            if (event.shiftKey) this.py_channel.importConfigFolder();
+            else this.py_channel.importConfig();
         };
 
         deleteConfigButton.addEventListener('click', () => {
@@ -764,6 +783,9 @@ class AudioEZApp {
                 if (this.elements.PersistentStateCheckbox) {
                     this.elements.PersistentStateCheckbox.checked = settings.persistent_state;
                 }
+                if (this.elements.apoLiveIncludeCheckbox) {
+                    this.elements.apoLiveIncludeCheckbox.checked = settings.apo_live_include ?? false;
+                }
                 if (this.elements.discordRpcCheckbox) {
                     this.elements.discordRpcCheckbox.checked = settings.discord_rpc;
                 }
@@ -771,10 +793,7 @@ class AudioEZApp {
                     this.elements.launchWithWindowsCheckbox.checked = settings.launch_with_windows;
                 }
                 
-                this.py_channel.getAutoEQModelsForSettings().then((models_json) => {
-                    const models = JSON.parse(models_json);
-                    this.populateDropdown('default-headphone-select', models, settings.default_headphone);
-                });
+                this.populateDropdown('default-headphone-select', this.autoEqDb.map(e => e.name), settings.default_headphone);
 
                 this.py_channel.getConfigNamesForSettings().then((config_names) => {
                     this.populateDropdown('default-configuration-select', config_names, settings.default_configuration);
@@ -798,6 +817,7 @@ class AudioEZApp {
             auto_launch:            this.elements.readyOnStartupCheckbox?.checked   ?? false,
             detect_earphone:        this.elements.detectEarphoneCheckbox?.checked   ?? false,
             persistent_state:       this.elements.PersistentStateCheckbox?.checked  ?? false,
+            apo_live_include:       this.elements.apoLiveIncludeCheckbox?.checked   ?? false,
             discord_rpc:            this.elements.discordRpcCheckbox?.checked       ?? false,
             launch_with_windows:    this.elements.launchWithWindowsCheckbox?.checked ?? false,
             adaptive_filter:        this.elements.adaptiveFilterState?.checked      ?? false,
@@ -838,7 +858,14 @@ class AudioEZApp {
     }
 
     setupAutoEQEventListeners() {
-        const { toggleAutoEqBtn, headphoneList, targetList, creditaudioez, targetSelect } = this.elements;
+        const { toggleAutoEqBtn, headphoneList, headphoneSearch, targetList, creditaudioez, targetSelect } = this.elements;
+
+        if (headphoneSearch) {
+            headphoneSearch.addEventListener('input', () => {
+                clearTimeout(this.headphoneSearchTimer);
+                this.headphoneSearchTimer = setTimeout(() => this.searchHeadphones(headphoneSearch.value), 120);
+            });
+        }
 
         headphoneList.addEventListener('change', () => {
             const selectedValue = headphoneList.value;
@@ -998,13 +1025,8 @@ class AudioEZApp {
             this.pendingHeadphoneName = headphoneName;
         });
 
-        this.py_channel.modelsUpdated.connect((models) => {
-            this.autoEqDb = models.map(name => ({ name }));
-            this.loadSettingsFromPython();
-            
-            this.populateList(this.autoEqDb, this.elements.headphoneList);
-            this.populateList(this.autoEqDb, this.elements.targetList);
-            this.applyDefaultSelections();
+        this.py_channel.modelsCatalogReady.connect((version, total) => {
+            this.loadModelCatalog(version, total);
         });
 
         this.py_channel.EarphonesCurve.connect((freqs, rawGains) => {
@@ -1019,6 +1041,28 @@ class AudioEZApp {
             this.drawGraph();
         });
 
+        // Binary curve frames (float32, see curve_transport.py)
+        if (this.py_channel.targetCurveBinary) {
+            this.py_channel.targetCurveBinary.connect(frame => {
+                this.withCurveFrame(frame, (grid, [gains, mins, maxs]) => {
+                    this.targetEqualizerPoints = this.curvePoints(grid, gains, mins, maxs);
+                    this.drawGraph();
+                });
+            });
+            this.py_channel.earphonesCurveBinary.connect(frame => {
+                this.withCurveFrame(frame, (grid, [rawGains, mins, maxs]) => {
+                    this.earphonesCurve = this.curvePoints(grid, rawGains, mins, maxs);
+                    this.drawGraph();
+                });
+            });
+            this.py_channel.frequencyResponseBinary.connect((frame, bands, gains, qValues, filterTypes) => {
+                this.withCurveFrame(frame, () => {});
+                this.onFrequencyResponse(bands, gains, qValues, filterTypes);
+            });
+            this.py_channel.enableBinaryCurves(true);
+            this.sendGraphWidth();
+        }
+
         this.py_channel.statusUpdate.connect(status => {
             this.showToast(status, 'info');
             const config = this.elements.configListSelect.options[this.elements.configListSelect.selectedIndex]?.text || 'Default';
@@ -1028,28 +1072,35 @@ class AudioEZApp {
         });
 
         this.py_channel.frequencyResponseUpdate.connect((freqs, bands, gains, qValues, filterTypes) => {
-            console.log("📡 Received frequency response update.");
-
-            this.equalizerPoints = bands.map((freq, i) => ({
-                index: i,
-                freq: freq,
-                gain: gains[i],
-                q: qValues[i],
-                type: typeof filterTypes?.[i] === 'string' ? filterTypes[i] : 'PK'
-            }));
-
-            this.updateTypeSelectOptions();
+            this.onFrequencyResponse(bands, gains, qValues, filterTypes);
+        });
 
-            const point = this.equalizerPoints.find(p => p.index === this.selectedPointIndex);
-            if (point) {
-                this.showPointParameters(point);
-            } else {
-                this.hidePointParameters();
-            }
+        // Full snapshots carry the state version; single-band edits arrive as patches
+        if (this.py_channel.bandPatch) {
+            this.py_channel.eqSnapshotVersion.connect(version => {
+                this.eqStateVersion = version;
+            });
+            this.py_channel.bandPatch.connect((version, index, fieldsJson) => {
+                this.applyBandPatch(version, index, JSON.parse(fieldsJson));
+            });
+        }
 
-            this.updateCoefficients();
-            this.drawGraph();
-        });
+        // Earphone + EQ vs target, computed in Python on every edit
+        if (this.py_channel.fitUpdate) {
+            this.py_channel.fitUpdate.connect((version, rms, maxDev, frame) => {
+                // rms < 0 : courbe écouteur ou cible retirée, plus de score
+                this.fitScore = rms < 0 ? null : { version, rms, maxDev };
+                if (!frame) {
+                    this.fitResidual = [];
+                    this.drawGraph();
+                    return;
+                }
+                this.withCurveFrame(frame, (grid, [residual]) => {
+                    this.fitResidual = this.curvePoints(grid, residual);
+                    this.drawGraph();
+                });
+            });
+        }
 
         this.py_channel.preampGainChanged.connect(gain => {
             this.elements.preampSlider.value = gain;
@@ -1375,9 +1426,170 @@ class AudioEZApp {
         this.elements.pointParametersPanel.classList.add('hide');
     }
 
+    searchHeadphones(query) {
+        const { headphoneList } = this.elements;
+        if (!query.trim() || !this.py_channel || typeof this.py_channel.searchModels !== 'function') {
+            this.populateList(this.autoEqDb, headphoneList);
+            return;
+        }
+
+        // Ranking is done by the trigram index on the Python side
+        this.py_channel.searchModels(query, 50).then((results_json) => {
+            const results = JSON.parse(results_json).map(name => ({ name }));
+            this.populateList(results, headphoneList);
+        });
+    }
+
+    onFrequencyResponse(bands, gains, qValues, filterTypes) {
+        console.log("📡 Received frequency response update.");
+
+        this.equalizerPoints = bands.map((freq, i) => ({
+            index: i,
+            freq: freq,
+            gain: gains[i],
+            q: qValues[i],
+            type: typeof filterTypes?.[i] === 'string' ? filterTypes[i] : 'PK'
+        }));
+
+        this.updateTypeSelectOptions();
+
+        const point = this.equalizerPoints.find(p => p.index === this.selectedPointIndex);
+        if (point) {
+            this.showPointParameters(point);
+        } else {
+            this.hidePointParameters();
+        }
+
+        this.updateCoefficients();
+        this.drawGraph();
+    }
+
+    applyBandPatch(version, index, fields) {
+        const point = this.equalizerPoints[index];
+        if (!point || (this.eqStateVersion !== null && version !== this.eqStateVersion + 1)) {
+            // Missed an update: ask Python for a full snapshot
+            this.eqStateVersion = null;
+            this.py_channel.requestEqResync();
+            return;
+        }
+        this.eqStateVersion = version;
+
+        Object.assign(point, fields);
+        this.pointCoefficients[index] = DSPProcessor.getCoefficientsForType(point);
+        if ('type' in fields) this.updateTypeSelectOptions();
+        if (point.index === this.selectedPointIndex) this.showPointParameters(point);
+
+        this.simulatedCurveNeedsUpdate = true;
+        this.drawGraph();
+    }
+
+    decodeCurveFrame(frame) {
+        const binary = atob(frame);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+
+        const view = new DataView(bytes.buffer);
+        const magic = String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]);
+        if (magic !== 'AEZC' || view.getUint8(4) !== 1) throw new Error('Unsupported curve frame');
+        const flags = view.getUint8(5);
+        const seriesCount = view.getUint16(6, true);
+        const gridId = view.getUint32(8, true);
+        const n = view.getUint32(12, true);
+
+        let offset = 16;
+        if (flags & 1) {
+            this.curveGrids.set(gridId, new Float32Array(bytes.buffer, offset, n));
+            offset += 4 * n;
+        }
+        const series = [];
+        for (let s = 0; s < seriesCount; s++) {
+            series.push(new Float32Array(bytes.buffer, offset, n));
+            offset += 4 * n;
+        }
+        return { gridId, grid: this.curveGrids.get(gridId), series };
+    }
+
+    // Decimated frames carry [mean, min, max] per column; full frames only the gains
+    curvePoints(grid, gains, mins, maxs) {
+        if (!mins || !maxs) {
+            return Array.from(grid, (f, i) => ({ freq: f, gain: gains[i] }));
+        }
+        return Array.from(grid, (f, i) => ({ freq: f, gain: gains[i], min: mins[i], max: maxs[i] }));
+    }
+
+    withCurveFrame(frame, callback) {
+        const decoded = this.decodeCurveFrame(frame);
+        if (decoded.grid) {
+            callback(decoded.grid, decoded.series);
+            return;
+        }
+        // Grid sent before a page reload: ask Python for it once
+        this.py_channel.getCurveGrid(decoded.gridId).then(gridFrame => {
+            if (!gridFrame) return;
+            this.decodeCurveFrame(gridFrame);
+            callback(this.curveGrids.get(decoded.gridId), decoded.series);
+        });
+    }
+
+    loadModelCatalog(version, total) {
+        if (version === this.modelsVersion) return;
+
+        // Same catalog as last session: nothing is sent over the channel
+        let cached = null;
+        try {
+            cached = JSON.parse(localStorage.getItem('autoeqModels') || 'null');
+        } catch (e) { /* ignore corrupted cache */ }
+        if (cached && cached.version === version) {
+            this.populateList(cached.models.map(name => ({ name })), this.elements.headphoneList);
+            this.populateList(cached.models.map(name => ({ name })), this.elements.targetList);
+            this.onModelCatalogLoaded(version, cached.models, false);
+            return;
+        }
+
+        const PAGE_SIZE = 1000;
+        const models = [];
+        const loadPage = (offset) => {
+            this.py_channel.getModelsPage(offset, PAGE_SIZE, this.modelsVersion || '').then((page_json) => {
+                const page = JSON.parse(page_json);
+                if (page.version !== version || page.unchanged) return;
+
+                const items = page.models.map(name => ({ name }));
+                models.push(...page.models);
+                if (offset === 0) {
+                    this.populateList(items, this.elements.headphoneList);
+                    this.populateList(items, this.elements.targetList);
+                } else {
+                    this.appendToList(items, this.elements.headphoneList);
+                    this.appendToList(items, this.elements.targetList);
+                }
+
+                if (page.models.length > 0 && models.length < page.total) {
+                    loadPage(offset + page.models.length);
+                } else {
+                    this.onModelCatalogLoaded(version, models, true);
+                }
+            });
+        };
+        console.log(`Loading ${total} AutoEQ models in pages of ${PAGE_SIZE}.`);
+        loadPage(0);
+    }
+
+    onModelCatalogLoaded(version, models, store) {
+        this.modelsVersion = version;
+        this.autoEqDb = models.map(name => ({ name }));
+        if (store) {
+            try {
+                localStorage.setItem('autoeqModels', JSON.stringify({ version, models }));
+            } catch (e) { /* quota exceeded: reload pages next time */ }
+        }
+        this.loadSettingsFromPython();
+        this.applyDefaultSelections();
+    }
+
     populateList(list, element) {
         element.innerHTML = "";
-        const seenDisplayNames = new Set();
+        element.seenDisplayNames = new Set();
+        const seenDisplayNames = element.seenDisplayNames;
 
         if (element.id === 'target-list') {
             this.priorityTargets.forEach(name => {
@@ -1397,6 +1609,13 @@ class AudioEZApp {
             element.appendChild(noneOption);
         }
 
+        this.appendToList(list, element);
+    }
+
+    appendToList(list, element) {
+        const seenDisplayNames = element.seenDisplayNames || (element.seenDisplayNames = new Set());
+        const fragment = document.createDocumentFragment();
+
         list.forEach(item => {
             const displayName = item.name.split("/").pop();
             if (seenDisplayNames.has(displayName)) return;
@@ -1419,8 +1638,9 @@ class AudioEZApp {
                 }
             }
 
-            element.appendChild(option);
+            fragment.appendChild(option);
         });
+        element.appendChild(fragment);
     }
 
     populateSettingsSelects() {
@@ -1753,8 +1973,13 @@ class AudioEZApp {
         });
 
         this.drawCurve(this.targetEqualizerPoints, '#94a3b8', 1.5, true, padding, paddedWidth, paddedHeight, true);
+
+        if (this.fitResidual.length > 0) {
+            this.drawCurve(this.fitResidual, 'rgba(239, 68, 68, 0.45)', 1, false, padding, paddedWidth, paddedHeight, true);
+        }
         
         if (this.earphonesCurve && this.earphonesCurve.length > 0) {
+            this.drawEnvelope(this.earphonesCurve, 'rgba(100, 116, 139, 0.25)', padding, paddedWidth, paddedHeight);
             this.drawCurve(this.earphonesCurve, '#64748b', 2, false, padding, paddedWidth, paddedHeight, true);
         }
 
@@ -1824,9 +2049,37 @@ class AudioEZApp {
             this.ctx.stroke();
         });
 
+        if (this.fitScore) {
+            this.ctx.fillStyle = '#e2e8f0';
+            this.ctx.font = '11px Inter';
+            this.ctx.textAlign = 'right';
+            this.ctx.fillText(`Fit RMS ${this.fitScore.rms.toFixed(2)} dB · max ${this.fitScore.maxDev.toFixed(1)} dB`,
+                width - padding, padding - 8);
+        }
+
         //this.updateEqualizerBands(parseInt(this.equalizerPoints.length));
     }
 
+    // Shaded min/max band of a decimated curve, so narrow peaks stay visible
+    drawEnvelope(points, color, padding, paddedWidth, paddedHeight) {
+        if (!points.length || points[0].min === undefined) return;
+        const { ctx } = this;
+        const toX = freq => padding + (Math.log10(freq) - this.LOG_MIN_FREQ) / (this.LOG_MAX_FREQ - this.LOG_MIN_FREQ) * paddedWidth;
+        const toY = gain => padding + paddedHeight * (1 - (gain - this.MIN_GAIN) / (this.MAX_GAIN - this.MIN_GAIN));
+
+        ctx.beginPath();
+        ctx.moveTo(toX(points[0].freq), toY(points[0].max));
+        for (let i = 1; i < points.length; i++) {
+            ctx.lineTo(toX(points[i].freq), toY(points[i].max));
+        }
+        for (let i = points.length - 1; i >= 0; i--) {
+            ctx.lineTo(toX(points[i].freq), toY(points[i].min));
+        }
+        ctx.closePath();
+        ctx.fillStyle = color;
+        ctx.fill();
+    }
+
     drawCurve(points, color, lineWidth, dashed = false, padding, paddedWidth, paddedHeight, linear = false) {
         if (!points || points.length === 0) return;
         const { ctx } = this;
@@ -1904,6 +2157,8 @@ class AudioEZApp {
                 this.elements.launchWithWindowsCheckbox.checked = settings.launch_with_windows ?? false;
             if (this.elements.PersistentStateCheckbox)
                 this.elements.PersistentStateCheckbox.checked = settings.persistent_state ?? false;
+            if (this.elements.apoLiveIncludeCheckbox)
+                this.elements.apoLiveIncludeCheckbox.checked = settings.apo_live_include ?? false;
             if (this.elements.adaptiveFilterState) {
                 const wasChecked = this.elements.adaptiveFilterState.checked;
                 this.elements.adaptiveFilterState.checked = settings.adaptive_filter ?? false;
@@ -0,0 +1,121 @@
+import json, os, threading, time
+
+CURVES_DIR = "temp_curves"
+FLUSH_INTERVAL = 2.0
+
+
+def write_atomic(path, text):
+    """Écrit ``text`` dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def inline_curve_files(data, state_path):
+    """Remplace les références ``curve_file`` d'un état sauvegardé par les courbes elles-mêmes"""
+    for section in ("headphone", "target"):
+        entry = data.get(section)
+        if not isinstance(entry, dict) or "curve" in entry or not entry.get("curve_file"):
+            continue
+        try:
+            with open(os.path.join(os.path.dirname(state_path), entry["curve_file"]), 'r', encoding='utf-8') as f:
+                entry["curve"] = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"StateJournal: Courbe {section} illisible : {e}")
+            entry["curve"] = []
+    return data
+
+
+class StateJournal:
+    """Write-behind de l'état courant (temp_.aez).
+
+    ``mark`` ne fait que retenir le dernier instantané ; un thread l'écrit au
+    plus une fois toutes les ``flush_interval`` secondes. Les courbes
+    écouteur/cible sont stockées à part (temp_curves/) et réécrites
+    seulement quand l'objet courbe change, temp_.aez ne contient que l'EQ
+    et les noms. ``close`` écrit ce qui reste en attente.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        self.curve_writes = 0
+        self.marks = 0
+        self._pending = None
+        self._written_curves = {}  # { section: objet courbe déjà sur disque }
+        self._last_flush = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # flush() peut croiser le thread d'écriture
+        self._thread = threading.Thread(target=self._run, name="StateJournal", daemon=True)
+        self._thread.start()
+
+    def mark(self, eq_parametric, earphone_name, earphone_curve, target_name, target_curve):
+        """Enregistre l'état à écrire. Les listes de courbes ne doivent plus être modifiées ensuite."""
+        with self._condition:
+            self._pending = {
+                "equalizer": {"parametric": eq_parametric},
+                "headphone": {"name": earphone_name, "curve": earphone_curve},
+                "target": {"name": target_name, "curve": target_curve},
+            }
+            self.marks += 1
+            self._condition.notify()
+
+    def flush(self):
+        """Écrit immédiatement l'état en attente (thread appelant)"""
+        with self._condition:
+            state, self._pending = self._pending, None
+        if state is not None:
+            self._write(state)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                delay = self._last_flush + self.flush_interval - time.monotonic()
+                if delay > 0:
+                    # Les marques arrivant pendant l'attente remplacent simplement l'instantané
+                    self._condition.wait(delay)
+                    continue
+                state, self._pending = self._pending, None
+            self._write(state)
+
+    def _write(self, state):
+        with self._write_lock:
+            self._write_files(state)
+        self._last_flush = time.monotonic()
+
+    def _write_files(self, state):
+        try:
+            directory = os.path.dirname(self.path)
+            for section in ("headphone", "target"):
+                curve = state[section].pop("curve")
+                file_name = f"{CURVES_DIR}/{section}.json"
+                written = self._written_curves.get(section)
+                if written is None or len(curve) != len(written) or any(a is not b for a, b in zip(curve, written)):
+                    os.makedirs(os.path.join(directory, CURVES_DIR), exist_ok=True)
+                    write_atomic(os.path.join(directory, file_name), json.dumps(curve, separators=(',', ':')))
+                    self._written_curves[section] = curve
+                    self.curve_writes += 1
+                state[section]["curve_file"] = file_name
+            write_atomic(self.path, json.dumps(state, indent=4))
+            self.flushes += 1
+        except (OSError, TypeError, ValueError) as e:
+            print(f"StateJournal: Erreur lors de l'écriture de l'état : {e}")
+
+    def stats(self):
+        with self._condition:
+            return {"marks": self.marks, "flushes": self.flushes, "curve_writes": self.curve_writes,
+                    "pending": self._pending is not None}
@@ -0,0 +1,4 @@
+import os, sys
+
+# Modules à la racine du dépôt (pas de paquet)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import apo_parser
+from apo_parser import parse_file, to_audioez
+
+# Format écrit par AudioEngine._render_apo_config
+EXPORT = """# AudioEZ - generated, edits will be overwritten
+Preamp: -4.5 dB
+Filter 1: ON PK Fc 105 Hz Gain -3.2 dB Q 1.41
+Filter 2: ON LSC Fc 80 Hz Gain 5.0 dB Q 0.71
+Filter 3: ON HSQ Fc 9000 Hz Gain -2.0 dB Q 0.80
+Filter 4: ON BWLP Fc 18000 Hz Gain 0.0 dB Q 0.71
+Filter 5: ON LS Fc 100 Hz Gain 2.0 dB Q 0.71
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_audioez_export_round_trip(tmp_path):
+    preset = to_audioez(parse_file(write(tmp_path, "config.txt", EXPORT)))
+    assert preset == {
+        'pre_gain_db': -4.5,
+        'bands': [105.0, 80.0, 9000.0, 18000.0, 100.0],
+        'gains': [-3.2, 5.0, -2.0, 0.0, 2.0],
+        'q_values': [1.41, 0.71, 0.8, 0.71, 0.71],
+        'filter_types': ['PK', 'LSC', 'HSQ', 'BWLP', 'LS'],
+    }
+
+
+def test_aliases_and_unknown_types(tmp_path):
+    text = ("Filter: ON PEQ Fc 1000 Hz Gain 1 dB Q 2\n"
+            "Filter: ON LPQ Fc 5000 Hz Q 0.5\n"
+            "Filter: ON IIR Order 2 Coefficients 1 0 0 1 0 0\n"
+            "Filter: OFF PK Fc 200 Hz Gain 1 dB Q 1\n")
+    parsed = parse_file(write(tmp_path, "config.txt", text))
+    assert [f[0] for f in parsed.filters] == ['PK', 'LP']
+    assert parsed.unknown_types == {'IIR': 1}
+    assert parsed.ignored['Filter'] == 1
+
+
+def test_include_and_channel_selection(tmp_path):
+    write(tmp_path, "inc.txt", "Channel: R\nFilter: ON PK Fc 500 Hz Gain 6 dB Q 1\n")
+    path = write(tmp_path, "config.txt", "Include: inc.txt\nFilter: ON PK Fc 100 Hz Gain 1 dB Q 1\n")
+    left = parse_file(path, channel='L', cache=apo_parser.ApoParseCache())
+    right = parse_file(path, channel='R', cache=apo_parser.ApoParseCache())
+    # La sélection de canal de l'include ne déborde pas sur config.txt
+    assert [f[1] for f in left.filters] == [100.0]
+    assert [f[1] for f in right.filters] == [500.0, 100.0]
+
+
+def test_parse_cache_reuses_unchanged_file(tmp_path):
+    cache = apo_parser.ApoParseCache()
+    path = write(tmp_path, "config.txt", EXPORT)
+    parse_file(path, cache=cache)
+    parse_file(path, cache=cache)
+    assert cache.stats() == {"files": 1, "hits": 1, "misses": 1}
@@ -0,0 +1,45 @@
+import numpy as np
+
+from curve_decimation import DecimationCache, decimate_log
+
+
+def test_envelope_keeps_narrow_peaks():
+    frequency = np.geomspace(20, 20000, 4000)
+    values = np.zeros_like(frequency)
+    values[2000] = 12.0  # pic d'un seul point
+    centers, mean, low, high = decimate_log(frequency, values, 100)
+    assert len(centers) == len(mean) == 100
+    assert high.max() == 12.0
+    assert low.min() == 0.0
+    assert 0 < mean.max() < 12.0
+    assert np.all(low <= mean) and np.all(mean <= high)
+
+
+def test_sparse_columns_are_interpolated():
+    frequency = np.array([20.0, 20000.0])
+    values = np.array([0.0, 3.0])
+    centers, mean, low, high = decimate_log(frequency, values, 50)
+    expected = np.interp(np.log10(centers), np.log10(frequency), values)
+    # Les colonnes sans point source reprennent la valeur interpolée
+    assert np.allclose(mean[1:-1], expected[1:-1])
+    assert np.array_equal(low[1:-1], high[1:-1])
+
+
+def test_points_outside_axis_are_ignored():
+    inside = np.geomspace(21, 19000, 200)
+    frequency = np.concatenate([[5.0, 10.0], inside, [30000.0]])
+    values = np.concatenate([[100.0, 100.0], np.ones(len(inside)), [100.0]])
+    _, mean, low, high = decimate_log(frequency, values, 10)
+    assert high.max() == 1.0
+    assert mean.max() == 1.0
+
+
+def test_cache_hits_on_same_curve():
+    cache = DecimationCache(max_size=2)
+    frequency = np.geomspace(20, 20000, 300)
+    values = np.sin(np.arange(300))
+    first = cache.get(frequency, values, 64)
+    assert cache.get(frequency, values.copy(), 64) is first
+    cache.get(frequency, values, 32)
+    cache.get(frequency, values + 1, 64)
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 3}
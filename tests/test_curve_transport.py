@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from curve_transport import CurveEncoder, decode_curve, grid_id
+
+
+def test_encode_decode_round_trip():
+    encoder = CurveEncoder()
+    frequency = np.geomspace(20, 20000, 256)
+    first, second = np.sin(np.arange(256)), np.cos(np.arange(256))
+    grids = {}
+    decoded_frequency, series = decode_curve(encoder.encode(frequency, first, second), grids)
+    assert np.allclose(decoded_frequency, frequency.astype(np.float32))
+    assert np.allclose(series[0], first.astype(np.float32))
+    assert np.allclose(series[1], second.astype(np.float32))
+    assert grid_id(frequency) in grids
+
+
+def test_grid_is_sent_once_until_reset():
+    encoder = CurveEncoder()
+    frequency = np.geomspace(20, 20000, 64)
+    values = np.ones(64)
+    grids = {}
+    full = encoder.encode(frequency, values)
+    short = encoder.encode(frequency, values)
+    assert len(short) < len(full)
+    decode_curve(full, grids)
+    decoded_frequency, _ = decode_curve(short, grids)
+    assert np.allclose(decoded_frequency, frequency.astype(np.float32))
+    # Sans la grille côté client, la trame courte ne suffit pas
+    assert decode_curve(short)[0] is None
+    encoder.reset()
+    assert len(encoder.encode(frequency, values)) == len(full)
+
+
+def test_grid_frame_for_lost_grid():
+    encoder = CurveEncoder()
+    frequency = np.geomspace(20, 20000, 32)
+    encoder.encode(frequency, np.zeros(32))
+    decoded_frequency, series = decode_curve(encoder.grid_frame(grid_id(frequency)))
+    assert np.allclose(decoded_frequency, frequency.astype(np.float32))
+    assert series == []
+    assert encoder.grid_frame(12345) == ""
+
+
+def test_length_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        CurveEncoder().encode(np.arange(1, 11), np.zeros(9))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from eq_response import FILTER_TYPES, ResponseEngine, biquad_coefficients, log_grid, response_db
+
+FS = 48000
+
+
+def reference_peaking(fc, gain, q, frequency):
+    """Biquad peaking RBJ évalué directement en H(e^jw)"""
+    A = 10 ** (gain / 40)
+    w0 = 2 * np.pi * fc / FS
+    alpha = np.sin(w0) / (2 * q)
+    b = [1 + alpha * A, -2 * np.cos(w0), 1 - alpha * A]
+    a = [1 + alpha / A, -2 * np.cos(w0), 1 - alpha / A]
+    z = np.exp(-1j * 2 * np.pi * np.asarray(frequency) / FS)
+    h = (b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)
+    return 20 * np.log10(np.abs(h))
+
+
+def transfer_db(b, a, frequency):
+    z = np.exp(-1j * 2 * np.pi * np.asarray(frequency) / FS)
+    h = np.polyval(b[::-1], z) / np.polyval(a[::-1], z)
+    return 20 * np.log10(np.abs(h))
+
+
+def test_peaking_matches_reference():
+    frequency = log_grid().frequency
+    for fc, gain, q in [(100, 6.0, 1.41), (1000, -9.0, 4.0), (12000, 3.0, 0.5)]:
+        ours = response_db([('PK', fc, gain, q)], frequency)
+        assert np.allclose(ours, reference_peaking(fc, gain, q, frequency), atol=1e-6)
+
+
+@pytest.mark.parametrize("filter_type", FILTER_TYPES)
+def test_every_type_matches_its_coefficients(filter_type):
+    frequency = log_grid().frequency
+    b, a, stages = biquad_coefficients([filter_type], [1000], [6.0], [0.9])
+    expected = transfer_db(b[0], a[0], frequency) * stages[0]
+    assert np.allclose(response_db([(filter_type, 1000, 6.0, 0.9)], frequency), expected, atol=1e-6)
+
+
+def test_shelf_and_linkwitz_riley_levels():
+    frequency = np.array([20.0, 20000.0])
+    low_shelf = response_db([('LS', 1000, 6.0, 0.707)], frequency)
+    assert low_shelf[0] == pytest.approx(6.0, abs=0.05)
+    assert low_shelf[1] == pytest.approx(0.0, abs=0.05)
+    # LR = deux Butterworth : -6 dB à la coupure au lieu de -3 dB
+    assert response_db([('LRLP', 1000, 0, 1)], [1000.0])[0] == pytest.approx(-6.02, abs=0.01)
+    assert response_db([('BWLP', 1000, 0, 1)], [1000.0])[0] == pytest.approx(-3.01, abs=0.01)
+
+
+def test_engine_recomputes_only_changed_rows():
+    engine = ResponseEngine()
+    filters = [('PK', 100, 3, 1), ('PK', 1000, -3, 1), ('HS', 8000, 2, 0.7)]
+    engine.update(filters, preamp_db=-2)
+    filters[1] = ('PK', 1000, -6, 1)
+    total = engine.update(filters, preamp_db=-2)
+    assert engine.stats()["rows_computed"] == 4
+    assert np.allclose(total, response_db(filters, engine.frequency) - 2)
@@ -0,0 +1,67 @@
+import json, os
+
+from preset_store import PresetStore
+
+
+def open_store(tmp_path, **kwargs):
+    store = PresetStore(str(tmp_path), **kwargs)
+    store.load()
+    return store
+
+
+def test_journal_replay_without_compaction(tmp_path):
+    store = open_store(tmp_path)
+    store["A"] = {"gains": [1]}
+    store["B"] = {"gains": [2]}
+    store.rename("B", "C")
+    store.set_tag("C", "fav")
+    del store["A"]
+    # Pas de close() : l'état n'est que dans index.journal
+    reloaded = open_store(tmp_path)
+    assert list(reloaded) == ["C"]
+    assert reloaded["C"] == {"gains": [2]}
+    assert reloaded.tags == {"C": "fav"}
+
+
+def test_torn_journal_line_is_folded(tmp_path):
+    store = open_store(tmp_path)
+    store["A"] = {"gains": [1]}
+    store._journal.write('{"op":"put","name":"B"')  # crash au milieu d'un ajout
+    store._journal.close()
+    store._journal = None
+
+    reloaded = open_store(tmp_path)
+    assert list(reloaded) == ["A"]
+    assert not os.path.exists(reloaded.journal_path)  # journal abîmé replié dans index.json
+    reloaded["D"] = {"gains": [4]}
+    assert sorted(open_store(tmp_path)) == ["A", "D"]
+
+
+def test_orphaned_preset_file_is_reindexed(tmp_path):
+    store = open_store(tmp_path)
+    store["A"] = {"gains": [1]}
+    store.close()
+    # Crash entre l'écriture du fichier et l'entrée de journal
+    store._write_preset("B", {"gains": [2]})
+    reloaded = open_store(tmp_path)
+    assert sorted(reloaded) == ["A", "B"]
+    assert reloaded["B"] == {"gains": [2]}
+
+
+def test_compaction_rewrites_index(tmp_path):
+    store = open_store(tmp_path, compact_bytes=10 ** 9)
+    store.put_many({f"P{i}": {"gains": [i]} for i in range(5)}, {"P1": "tag"})
+    store.close()
+    assert not os.path.exists(store.journal_path)
+    with open(store.index_path, encoding='utf-8') as f:
+        index = json.load(f)
+    assert sorted(index["presets"]) == [f"P{i}" for i in range(5)]
+    assert index["tags"] == {"P1": "tag"}
+    assert open_store(tmp_path)["P3"] == {"gains": [3]}
+
+
+def test_legacy_presets_are_migrated(tmp_path):
+    (tmp_path / "presets.json").write_text(json.dumps({"Old": {"gains": [0]}}), encoding='utf-8')
+    store = open_store(tmp_path)
+    assert store["Old"] == {"gains": [0]}
+    assert os.path.exists(str(tmp_path / "presets.json.migrated"))
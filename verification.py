@@ -670,23 +670,68 @@ class VerificationThread(QThread):
         except:
             return False, "Unknown"
 
+    def _author_signature(self, author_folder: Path) -> Dict[str, object]:
+        """Signature peu coûteuse d'un dossier auteur : name_index.tsv + mtimes de data/ et de ses catégories (sans parcours)"""
+        index_path = author_folder / "name_index.tsv"
+        index_stat = index_path.stat() if index_path.is_file() else None
+        data_path = author_folder / "data"
+        dirs = {}
+        if data_path.is_dir():
+            dirs["."] = data_path.stat().st_mtime_ns
+            for entry in os.scandir(data_path):
+                if entry.is_dir():
+                    dirs[entry.name] = entry.stat().st_mtime_ns
+        return {
+            "index": [index_stat.st_mtime_ns, index_stat.st_size] if index_stat else None,
+            "dirs": dirs,
+        }
+
+    def _list_author_csvs(self, author_folder: Path) -> set:
+        """Noms (sans extension, minuscules) des CSV de measurements/<author>/data, parcours récursif"""
+        stems = set()
+        data_path = author_folder / "data"
+        pending = [str(data_path)] if data_path.is_dir() else []
+        while pending:
+            current = pending.pop()
+            for entry in os.scandir(current):
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith(".csv"):
+                    stems.add(os.path.splitext(entry.name)[0].lower())
+        return stems
+
+    def _read_author_models(self, author_folder: Path) -> List[str]:
+        index_path = author_folder / "name_index.tsv"
+        models = []
+        if not index_path.is_file():
+            return models
+        try:
+            with open(index_path, newline='', encoding='utf-8') as tsvfile:
+                reader = csv.DictReader(tsvfile, delimiter='\t')
+                for row in reader:
+                    model_name = (row.get('model') or row.get('Model') or
+                                row.get('name') or row.get('Name'))
+                    if model_name:
+                        models.append(model_name.strip())
+        except Exception as e:
+            print(f"Erreur lecture {index_path} : {e}")
+        return models
+
     def build_autoeq_index(self):
-            """Construction de l'index avec progression RÉELLE (basée sur les dossiers auteurs) et filtrage CSV."""
+            """Construction incrémentale de l'index : seuls les dossiers auteurs dont la signature (stats, sans parcours) a changé sont re-scannés."""
             
             cache_dir = self.base_path / "configs" / "autoeq_profiles" / "autoeq_cache"
             cache_path = cache_dir / "index.json"
             measurements_root = self.base_path / "measurements" 
-            
+
+            previous_authors = {}
+            previous_duration = None
             if cache_path.exists():
                 try:
                     with open(cache_path, 'r', encoding='utf-8') as f:
                         cache_data = json.load(f)
-                        cached_models = cache_data.get('data', [])
-                        if cached_models:
-                            print(f"Index: {len(cached_models)} modèles chargés depuis le cache.")
-                            self.progress_update.emit(f"Indexed {len(cached_models)} models (cached)", 95)
-                            self.task_progress_update.emit(100, 100)
-                            return
+                    previous_authors = cache_data.get('authors', {}) or {}
+                    previous_duration = cache_data.get('build_seconds')
                 except Exception as e:
                     print(f"Erreur lecture cache AutoEQ : {e}. Reconstruction nécessaire.")
 
@@ -695,78 +740,67 @@ class VerificationThread(QThread):
                 return
 
             try:
+                start = time.perf_counter()
                 cache_dir.mkdir(parents=True, exist_ok=True)
                 self.task_progress_update.emit(0, 100)
                 
                 author_folders = [d for d in measurements_root.iterdir() if d.is_dir()]
                 total_authors = len(author_folders)
                 
-                models_to_filter = {}
+                authors = {}
+                rescanned = 0
+                invalid_count = 0
                 self.progress_update.emit(f"Scanning {total_authors} databases...", 92)
                 
                 for i, author_folder in enumerate(author_folders):
-                    percent_scan = int(((i + 1) / total_authors) * 50)
-                    self.task_progress_update.emit(percent_scan, 100)
-                    
-                    index_path = author_folder / "name_index.tsv"
-                    if not index_path.is_file():
-                        continue
-
-                    try:
-                        with open(index_path, newline='', encoding='utf-8') as tsvfile:
-                            reader = csv.DictReader(tsvfile, delimiter='\t')
-                            for row in reader:
-                                model_name = (row.get('model') or row.get('Model') or 
-                                            row.get('name') or row.get('Name'))
-                                if model_name:
-                                    models_to_filter[model_name.strip()] = author_folder
-                    except Exception as e:
-                        print(f"Erreur lecture {index_path} : {e}")
-                        
-                
-                valid_models = []
-                invalid_models = []
-                total_models = len(models_to_filter)
-                
-                self.progress_update.emit(f"Filtering {total_models} models...", 94)
-                
-                for i, (model_name, author_folder) in enumerate(models_to_filter.items()):
-                    
-                    found_csv = False
-                    data_path = author_folder / "data"
-                    
-                    if data_path.exists():
-                        csv_name_base = model_name.strip()
-                        
-                        expected_csv_path = data_path / f"{csv_name_base}.csv"
-                        if expected_csv_path.is_file():
-                            found_csv = True
-                        else:
-                            for file in data_path.rglob('*.csv'):
-                                if file.stem.lower() == csv_name_base.lower():
-                                    found_csv = True
-                                    break
-                    
-                    if found_csv:
-                        valid_models.append(model_name)
+                    signature = self._author_signature(author_folder)
+                    previous = previous_authors.get(author_folder.name)
+
+                    if previous and previous.get('signature') == signature:
+                        authors[author_folder.name] = previous
                     else:
-                        invalid_models.append(model_name)
+                        rescanned += 1
+                        stems = self._list_author_csvs(author_folder)
+                        valid = []
+                        invalid = 0
+                        for model_name in self._read_author_models(author_folder):
+                            if model_name.lower() in stems:
+                                valid.append(model_name)
+                            else:
+                                invalid += 1
+                        authors[author_folder.name] = {'signature': signature, 'models': valid, 'invalid': invalid}
+
+                    invalid_count += authors[author_folder.name].get('invalid', 0)
 
-                    if total_models > 0:
-                        percent_filter = 50 + int(((i + 1) / total_models) * 50)
-                        if (i + 1) % 50 == 0 or (i + 1) == total_models:
-                            self.task_progress_update.emit(percent_filter, 100)
-                            self.progress_update.emit(f"Filtering: {i+1}/{total_models} models...", 94)
+                    if total_authors > 0:
+                        self.task_progress_update.emit(int(((i + 1) / total_authors) * 100), 100)
 
+                valid_models = set()
+                for entry in authors.values():
+                    valid_models.update(entry.get('models', []))
                 self.autoeq_index = sorted(valid_models)
 
-                print(f"Index: {len(valid_models)} modèles valides chargés. {len(invalid_models)} ignorés.")
+                elapsed = time.perf_counter() - start
+                print(f"Index: {len(self.autoeq_index)} modèles valides chargés. {invalid_count} ignorés. "
+                      f"{rescanned}/{total_authors} dossiers re-scannés en {elapsed:.2f}s.")
 
-                with open(cache_path, 'w', encoding='utf-8') as f:
-                    json.dump({'data': self.autoeq_index}, f, indent=2, ensure_ascii=False)
+                if rescanned or set(previous_authors) != set(authors):
+                    with open(cache_path, 'w', encoding='utf-8') as f:
+                        json.dump({
+                            'data': self.autoeq_index,
+                            'authors': authors,
+                            'build_seconds': round(elapsed, 3),
+                        }, f, indent=2, ensure_ascii=False)
                 
                 self.task_progress_update.emit(100, 100)
-                self.progress_update.emit(f"Indexed {len(valid_models)} models", 95)
+                timing = f"{elapsed:.2f}s"
+                if previous_duration is not None:
+                    timing += f", previous build {previous_duration:.2f}s"
+                self.progress_update.emit(
+                    f"Indexed {len(self.autoeq_index)} models ({rescanned}/{total_authors} databases rescanned, {timing})", 95
+                )
+
+                self.build_autoeq_catalog()
                 
             except Exception as e:
                 print(f"Error building AutoEQ index: {e}")
@@ -774,6 +808,30 @@ class VerificationThread(QThread):
                 traceback.print_exc()
                 self.task_progress_update.emit(0, 100)
 
+    def build_autoeq_catalog(self):
+        """Construit (une seule fois par version AutoEQ) le catalogue des mesures utilisé par l'application"""
+        from autoeq_catalog import AutoEQCatalog, read_autoeq_version
+
+        catalog = AutoEQCatalog(
+            measurements_root=self.base_path / "measurements",
+            catalog_path=self.base_path / "configs" / "autoeq_profiles" / "autoeq_cache" / "catalog.json",
+            autoeq_version=read_autoeq_version(self.base_path),
+        )
+        if catalog.load():
+            return
+
+        self.progress_update.emit("Building AutoEQ catalog...", 96)
+        start = time.perf_counter()
+        catalog.build()
+        catalog.save()
+        elapsed = time.perf_counter() - start
+        print(f"Catalog: {len(catalog)} modèles indexés en {elapsed:.2f}s.")
+        self.progress_update.emit(f"Catalog: {len(catalog)} models ({elapsed:.1f}s)", 97)
+
+        from model_search import ModelSearchIndex
+        index = ModelSearchIndex(catalog.model_names(), autoeq_version=catalog.autoeq_version)
+        index.save(str(self.base_path / "configs" / "autoeq_profiles" / "autoeq_cache" / "search_index.npz"))
+
 class VerificationDialog(QDialog):
     """Dialogue de vérification au démarrage"""
     def __init__(self, parent=None):